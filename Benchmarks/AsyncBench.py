@@ -0,0 +1,108 @@
+"""AsyncPlaybackEngine: throughput, control latency and timing with many macros.
+
+    python -m Benchmarks.AsyncBench [actions]
+
+Throughput plays `actions` split over N tasks at infinite speed into
+NullBackend, next to MacroPlayer and PlaybackManager over the same actions.
+Control latency is how long pause() and cancel() take to come back while a
+task waits for its next action (a 100 Hz macro) and while it is running behind
+(at very high speed). The real-time part runs N copies of a 2 s, 50 Hz mouse
+macro at once, each starting a little later than the one before, and reports
+the lateness of every action, once more for one macro with a 1.5 ms spin.
+"""
+import asyncio
+import sys
+import time
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.AsyncPlayback import AsyncPlaybackEngine
+from Scripts.Macro.OutputBackend import NullBackend
+from Scripts.Macro.PlaybackManager import PlaybackManager
+from Scripts.Macro.Player import MacroPlayer
+from Scripts.Macro.Scheduler import PlaybackScheduler
+from Scripts.Macro.Trace import summary
+
+FAST = float('inf')
+
+
+def player_rate(actions):
+    player = MacroPlayer(NullBackend(), PlaybackScheduler(speed=FAST))
+    start = time.perf_counter()
+    player.play(actions)
+    return len(actions) / (time.perf_counter() - start)
+
+
+def manager_rate(actions, macros):
+    manager = PlaybackManager(NullBackend(), PlaybackScheduler(speed=FAST))
+    share = len(actions) // macros
+    for n in range(macros):
+        manager.add(actions[n * share:(n + 1) * share])
+    start = time.perf_counter()
+    manager.run()
+    return manager.stats()['played'] / (time.perf_counter() - start)
+
+
+async def engine_rate(actions, macros):
+    engine = AsyncPlaybackEngine(NullBackend(), speed=FAST)
+    share = len(actions) // macros
+    start = time.perf_counter()
+    tasks = [engine.start(actions[n * share:(n + 1) * share]) for n in range(macros)]
+    await asyncio.gather(*(task.wait() for task in tasks))
+    return engine.stats()['played'] / (time.perf_counter() - start)
+
+
+async def control_latency(speed):
+    engine = AsyncPlaybackEngine(NullBackend(), speed=speed)
+    moves = [('mouse', k % 100, k % 100, k / 100) for k in range(100_000)]
+    pauses, cancels = [], []
+    for _ in range(20):
+        task = engine.start(moves)
+        await asyncio.sleep(0.02)
+        start = time.perf_counter_ns()
+        await task.pause()
+        pauses.append(time.perf_counter_ns() - start)
+        await task.resume()
+        await asyncio.sleep(0.005)
+        start = time.perf_counter_ns()
+        await task.cancel()
+        cancels.append(time.perf_counter_ns() - start)
+    return summary(pauses), summary(cancels)
+
+
+async def realtime(macros, spin_ns=0):
+    engine = AsyncPlaybackEngine(NullBackend(), spin_ns=spin_ns)
+    tasks = []
+    for n in range(macros):
+        shift = n * 0.02 / macros  # Spread the copies over one 50 Hz period
+        tasks.append(engine.start([('mouse', k, n, shift + k / 50) for k in range(101)],
+                                  timeline=(0.0, shift + 2.0)))
+    await asyncio.gather(*(task.wait() for task in tasks))
+    lateness = summary([late for task in tasks for late in task.lateness])
+    label = f"{macros} macros" + (f", spin {spin_ns / 1e6:g} ms" if spin_ns else "")
+    print(f"  {label:>20}: {sum(task.played for task in tasks)} actions, lateness p50 "
+          f"{lateness['p50']:.3f} ms, p99 {lateness['p99']:.3f} ms, max {lateness['max']:.3f} ms")
+
+
+def main(count=200_000):
+    actions = [action for action in macro_actions(count) if action[0] != 'window_focus']
+    print(f"{len(actions)} actions on NullBackend, infinite speed")
+    print(f"  {'MacroPlayer':>18}: {player_rate(actions) / 1e3:8.1f}k actions/s")
+    for macros in (1, 16, 256):
+        print(f"  {f'manager x{macros}':>18}: {manager_rate(actions, macros) / 1e3:8.1f}k actions/s")
+        rate = asyncio.run(engine_rate(actions, macros))
+        print(f"  {f'async engine x{macros}':>18}: {rate / 1e3:8.1f}k actions/s")
+
+    print("Control latency, 20 runs")
+    for label, speed in (("waiting", 1.0), ("behind", 1e6)):
+        pause, cancel = asyncio.run(control_latency(speed))
+        print(f"  {label:>8}: pause p50 {pause['p50'] * 1e3:.1f} us max {pause['max'] * 1e3:.1f} us, "
+              f"cancel p50 {cancel['p50'] * 1e3:.1f} us max {cancel['max'] * 1e3:.1f} us")
+
+    print("Real time, 2 s at 50 Hz per macro")
+    for macros in (1, 10, 100, 500):
+        asyncio.run(realtime(macros))
+    asyncio.run(realtime(1, spin_ns=1_500_000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,135 @@
+"""Compare the old 10 ms polling recorder with the hook-driven EventRecorder.
+
+Both recorders consume the same synthetic input session. The polling path is a
+replica of the removed MacroRecorder.record_step, ticking against a simulated
+device state; the event path feeds the raw events through SyntheticInputSource.
+
+    python -m Benchmarks.CaptureBench [seconds]
+"""
+import sys
+import time
+
+from Benchmarks.Synthetic import input_events
+from Scripts.Macro.EventCapture import EventRecorder, SyntheticInputSource
+
+
+class SimulatedDevice:
+    """Replays the input session as state that can be polled like the OS"""
+
+    def __init__(self, events):
+        self.events = events
+        self.next = 0
+        self.pos = (0, 0)
+        self.pressed = set()
+        self.window = None
+        self.title = ""
+        self.seen_clicks = set()  # Index of each button down observed while pressed
+        self.down_index = {}
+
+    def advance(self, now):
+        events = self.events
+        while self.next < len(events) and events[self.next][3] <= now:
+            kind, a, b, _ = events[self.next]
+            if kind == 'move':
+                self.pos = (a, b)
+            elif kind == 'button':
+                if b == 'down':
+                    self.pressed.add(a)
+                    self.down_index[a] = self.next
+                else:
+                    self.pressed.discard(a)
+            elif kind == 'window':
+                self.window, self.title = a, b
+            self.next += 1
+
+    def is_pressed(self, button):
+        if button in self.pressed:
+            self.seen_clicks.add(self.down_index[button])
+            return True
+        return False
+
+
+def run_polling(events, interval=0.01):
+    device = SimulatedDevice(events)
+    macro = []
+    last_window = None
+    start, end = events[0][3], events[-1][3]
+    ticks = int((end - start) / interval) + 1
+    cpu = time.process_time()
+    for tick in range(ticks):
+        now = start + tick * interval
+        device.advance(now)
+        # Same work as the old record_step
+        current_window = device.window
+        current_title = device.title
+        if "Macro Recorder" in current_title:
+            continue
+        if last_window != current_window:
+            last_window = current_window
+            macro.append(('window_focus', current_title, None, now))
+        x, y = device.pos
+        left_pressed = device.is_pressed('left')
+        right_pressed = device.is_pressed('right')
+        middle_pressed = device.is_pressed('middle')
+        if not macro or (macro[-1][1], macro[-1][2]) != (x, y) or left_pressed or right_pressed or middle_pressed:
+            action_type = 'mouse'
+            if left_pressed:
+                action_type = 'left_click'
+            elif right_pressed:
+                action_type = 'right_click'
+            elif middle_pressed:
+                action_type = 'middle_click'
+            macro.append((action_type, x, y, now))
+    cpu = time.process_time() - cpu
+
+    clicks = [i for i, event in enumerate(events) if event[0] == 'button' and event[2] == 'down']
+    windows = {event[1] for event in events if event[0] == 'window'}
+    dropped_clicks = sum(1 for i in clicks if i not in device.seen_clicks)
+    recorded_windows = {action[1] for action in macro if action[0] == 'window_focus'}
+    moves = sum(1 for event in events if event[0] == 'move')
+    recorded_moves = sum(1 for action in macro if action[0] == 'mouse')
+    return {
+        'cpu': cpu,
+        'actions': len(macro),
+        'dropped_clicks': dropped_clicks,
+        'dropped_windows': len(windows) - len(recorded_windows),
+        'collapsed_moves': max(0, moves - recorded_moves),
+    }
+
+
+def run_events(events):
+    macro = []
+    source = SyntheticInputSource(events)
+    recorder = EventRecorder(source, macro)
+    recorder.start()
+    cpu = time.process_time()
+    source.feed()
+    cpu = time.process_time() - cpu
+    recorder.stop()
+
+    clicks = sum(1 for event in events if event[0] == 'button' and event[2] == 'down')
+    recorded_clicks = sum(1 for action in macro if action[0].endswith('_click'))
+    return {
+        'cpu': cpu,
+        'actions': len(macro),
+        'dropped_clicks': clicks - recorded_clicks,
+        'dropped_windows': 0,
+        'collapsed_moves': 0,
+    }
+
+
+def main(seconds=600):
+    events = input_events(seconds)
+    duration = events[-1][3] - events[0][3]
+    print(f"Synthetic session: {duration:.0f}s, {len(events)} raw input events")
+    for name, run in (("polling (10 ms)", run_polling), ("event-driven", run_events)):
+        result = run(events)
+        print(f"{name:>16}: {result['cpu'] / duration * 1e6:8.1f} us CPU per recorded second, "
+              f"{result['actions']} actions, dropped clicks {result['dropped_clicks']}, "
+              f"missed windows {result['dropped_windows']}, collapsed moves {result['collapsed_moves']}")
+    print("Note: the polling figures exclude the real cost of GetForegroundWindow, "
+          "pyautogui.position and mouse.is_pressed, so they are a lower bound.")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 600)
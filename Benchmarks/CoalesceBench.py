@@ -0,0 +1,79 @@
+"""Output calls saved by MoveCoalescer, against a mocked pyautogui backend.
+
+    python -m Benchmarks.CoalesceBench [actions]
+"""
+import bisect
+import math
+import sys
+import time
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.Coalescer import MoveCoalescer
+
+
+class MockPyAutoGui:
+    """Stands in for pyautogui: records calls and burns a fixed cost per call"""
+
+    def __init__(self, call_cost=50e-6):
+        self.call_cost = call_cost
+        self.calls = 0
+
+    def _work(self):
+        self.calls += 1
+        end = time.perf_counter() + self.call_cost
+        while time.perf_counter() < end:
+            pass
+
+    def moveTo(self, x, y):
+        self._work()
+
+    def click(self, button):
+        self._work()
+
+
+def dispatch(actions, backend):
+    start = time.perf_counter()
+    for action in actions:
+        if action[0] in ('mouse', 'left_click', 'right_click', 'middle_click'):
+            backend.moveTo(action[1], action[2])
+            if action[0] != 'mouse':
+                backend.click(button=action[0].split('_')[0])
+    return time.perf_counter() - start
+
+
+def max_error(original, played):
+    """Largest distance between the recorded cursor and the played cursor at any recorded sample"""
+    played_moves = [a for a in played if a[0] != 'key' and a[0] != 'window_focus']
+    times = [a[3] for a in played_moves]
+    worst = 0.0
+    for action in original:
+        if action[0] != 'mouse':
+            continue
+        i = bisect.bisect_right(times, action[3]) - 1
+        if i >= 0:
+            worst = max(worst, math.hypot(action[1] - played_moves[i][1], action[2] - played_moves[i][2]))
+    return worst
+
+
+def main(count=20_000):
+    for interval, label in ((0.01, "100 Hz"), (0.002, "500 Hz")):
+        macro = macro_actions(count, sample_interval=interval)
+        plain = MockPyAutoGui()
+        plain_time = dispatch(macro, plain)
+        print(f"{count} actions recorded at {label}: {plain.calls} calls, {plain_time * 1e3:.0f} ms uncoalesced")
+        for frame_rate, distance in ((125, 0), (125, 2), (60, 3)):
+            coalescer = MoveCoalescer(frame_rate=frame_rate, min_distance=distance)
+            start = time.perf_counter()
+            actions = coalescer.coalesce(macro)
+            coalesce_time = time.perf_counter() - start
+            mock = MockPyAutoGui()
+            mock_time = dispatch(actions, mock)
+            stats = coalescer.stats
+            print(f"  {frame_rate:>3} fps, {distance} px: {mock.calls} calls "
+                  f"({stats['saved_calls']} moves saved, {stats['saved_calls'] / max(stats['moves_in'], 1):.0%}), "
+                  f"{mock_time * 1e3:.0f} ms + {coalesce_time * 1e3:.1f} ms to coalesce, "
+                  f"max error {max_error(macro, actions):.1f} px")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,61 @@
+"""Size and speed of the compressed v3 format against v1 JSON and v2 binary.
+
+    python -m Benchmarks.CodecBench [actions]
+
+Encode is MacroScript.save (json.dump for v1), decode is MacroScript.load, both
+through a file in a temporary folder. Throughput is in MB of v2 records (20
+bytes per action) per second, so every format is measured against the same
+amount of information. Ratios are against the v1 JSON file.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.FileHandler import MacroScript
+from Scripts.Macro.MacroTrack import MacroTrack
+
+
+def best(function, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(count=1_000_000):
+    track = MacroTrack(macro_actions(count, start_time=1_700_000_000.0))
+    actions = track.to_list()
+    megabytes = count * MacroScript.RECORD.size / 1e6
+
+    def save_json(path):
+        with open(path, "w") as f:
+            json.dump({'version': 1, 'timestamp': time.time(), 'actions': actions}, f)
+
+    formats = [("v1 JSON", save_json, MacroScript.load_json)]
+    formats.append(("v2 binary", lambda path: MacroScript.save(path, track), None))
+    for compression in ('none', 'zlib', 'lzma'):
+        formats.append((f"v3 {compression}",
+                        lambda path, compression=compression: MacroScript.save(path, track, compression=compression),
+                        None))
+
+    print(f"{count} actions ({megabytes:.1f} MB as v2 records)")
+    with tempfile.TemporaryDirectory() as folder:
+        json_size = None
+        for name, save, load in formats:
+            path = os.path.join(folder, name.replace(" ", "_"))
+            encode = best(lambda: save(path))
+            size = os.path.getsize(path)
+            json_size = json_size or size
+            decode = best(lambda: load(path) if load else MacroScript.load(path))
+            print(f"  {name:>10}: {size / 1e6:7.2f} MB, {json_size / size:5.1f}x smaller than JSON, "
+                  f"{size / count:5.2f} B/action, encode {megabytes / encode:6.1f} MB/s, "
+                  f"decode {megabytes / decode:6.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,59 @@
+"""Per-action dispatch cost: the if/elif chain over action[0] versus a compiled macro.
+
+    python -m Benchmarks.DispatchBench [actions]
+"""
+import sys
+import time
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.Compiler import compile_macro
+from Scripts.Macro.OutputBackend import NullBackend
+from Scripts.Macro.Player import MacroPlayer
+from Scripts.Macro.Scheduler import PlaybackScheduler
+
+LOOPS = 5
+
+
+def interpreted(actions, backend):
+    """The dispatch the playback loop used before compiling: one if/elif chain per action"""
+    player = MacroPlayer(backend)
+    perform = player.perform
+    start = time.perf_counter()
+    for _ in range(LOOPS):
+        for action in actions:
+            perform(action)
+    return time.perf_counter() - start
+
+
+def compiled(actions, backend):
+    start = time.perf_counter()
+    program = compile_macro(actions, backend)
+    compile_time = time.perf_counter() - start
+    steps = list(zip(program.calls, program.args))
+    start = time.perf_counter()
+    for _ in range(LOOPS):
+        for call, args in steps:
+            call(*args)
+    return time.perf_counter() - start, compile_time
+
+
+def main(count=100_000):
+    actions = macro_actions(count)
+    backend = NullBackend()
+    total = count * LOOPS
+    before = interpreted(actions, backend)
+    after, compile_time = compiled(actions, backend)
+    print(f"{count} actions x {LOOPS} loops, NullBackend")
+    print(f"  if/elif dispatch:  {before / total * 1e9:6.0f} ns/action")
+    print(f"  compiled dispatch: {after / total * 1e9:6.0f} ns/action "
+          f"(+ {compile_time * 1e3:.1f} ms compile, once per playback)")
+
+    player = MacroPlayer(backend, PlaybackScheduler(speed=float('inf')))
+    start = time.perf_counter()
+    player.play(actions, LOOPS, keep_playing=lambda: True)
+    full = time.perf_counter() - start
+    print(f"  full MacroPlayer loop incl. scheduler: {full / total * 1e9:6.0f} ns/action")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
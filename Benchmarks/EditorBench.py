@@ -0,0 +1,104 @@
+"""Visual editor render time: the old build-everything render against VisualEditor.
+
+    python -m Benchmarks.EditorBench
+
+Runs Qt offscreen. Full is the old render_macro that made items for every action,
+viewport is VisualEditor.reset() at normal zoom, lod is the same zoomed out, and
+scroll is one page scroll after the first render.
+"""
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsTextItem
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor, QPen, QBrush
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.MacroTrack import MacroTrack
+from Scripts.Ui.Ui import Ui
+from Scripts.Ui.VisualEditor import DraggableEllipseItem, COLOR_MAP, ROW_HEIGHT
+
+
+class Recorder:
+    def __init__(self, macro):
+        self.macro = macro
+
+
+def full_render(ui, scene, macro):
+    """The render_macro loop from before VisualEditor, minus the text log"""
+    scene.clear()
+    last_pos = None
+    current_y = 0
+    for i, action in enumerate(macro):
+        if action[0] in ('window_focus', 'key'):
+            rect = QGraphicsEllipseItem(50, current_y - 15, 30, 30)
+            rect.setBrush(QBrush(QColor("#9B59B6")))
+            rect.setPen(QPen(QColor("white"), 2))
+            scene.addItem(rect)
+            text = QGraphicsTextItem(f"{i+1}: {action[0]} {action[1]}")
+            text.setDefaultTextColor(QColor("white"))
+            text.setPos(90, current_y - 10)
+            scene.addItem(text)
+        else:
+            if last_pos:
+                line = QGraphicsLineItem(last_pos[0], last_pos[1], action[1], current_y)
+                line.setPen(QPen(QColor("#4A90E2"), 2, Qt.SolidLine))
+                scene.addItem(line)
+            oval = DraggableEllipseItem(ui, action[1] - 10, current_y - 10, 20, 20)
+            oval.setBrush(QBrush(QColor(COLOR_MAP.get(action[0], "#4A90E2"))))
+            scene.addItem(oval)
+            label = QGraphicsTextItem(f"{i+1}: {action[0]}")
+            label.setPos(action[1] + 15, current_y - 10)
+            scene.addItem(label)
+            if i > 0:
+                timing = QGraphicsTextItem(f"{action[3] - macro[i-1][3]:.2f}s")
+                timing.setPos(action[1] - 50, current_y - 25)
+                scene.addItem(timing)
+            last_pos = (action[1], current_y)
+        current_y += ROW_HEIGHT
+    return len(scene.items())
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1e3, result
+
+
+def main():
+    app = QApplication([])
+    ui = Ui(None)
+    ui.resize(900, 700)
+    ui.show()
+    app.processEvents()
+    view, scene, editor = ui.visual_editor_view, ui.visual_editor_scene, ui.visual_editor
+    for count in (1_000, 5_000, 20_000):
+        ui.macro_recorder = Recorder(MacroTrack.from_actions(macro_actions(count)))
+        macro = ui.macro_recorder.macro
+
+        full_ms, full_items = timed(lambda: full_render(ui, scene, macro))
+        scene.clear()
+        editor.rows = {}
+        editor.paths = []
+
+        view.resetTransform()
+        view.verticalScrollBar().setValue(0)
+        viewport_ms, _ = timed(editor.reset)
+        viewport_items = len(scene.items())
+        bar = view.verticalScrollBar()
+        scroll_ms, _ = timed(lambda: bar.setValue(bar.value() + bar.pageStep()))
+
+        view.scale(0.2, 0.2)
+        lod_ms, _ = timed(editor.reset)
+        lod_items = len(scene.items())
+        print(f"{count:>6} actions: full {full_ms:8.1f} ms ({full_items} items), "
+              f"viewport {viewport_ms:6.2f} ms ({viewport_items} items), scroll {scroll_ms:5.2f} ms, "
+              f"lod {lod_ms:6.2f} ms ({lod_items} items)")
+    view.verticalScrollBar().valueChanged.disconnect()
+    view.horizontalScrollBar().valueChanged.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Load time and size of the v2 binary format against v1 JSON and legacy CSV.
+
+    python -m Benchmarks.FormatBench [actions]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.FileHandler import MacroScript
+
+
+def timed(func):
+    start = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - start
+
+
+def main(count=1_000_000):
+    actions = macro_actions(count)
+    with tempfile.TemporaryDirectory() as folder:
+        v1_path = os.path.join(folder, "v1.MacroScript")
+        csv_path = os.path.join(folder, "legacy.MacroScript")
+        v2_path = os.path.join(folder, "v2.MacroScript")
+
+        with open(v1_path, "w") as f:
+            json.dump({'version': 1, 'timestamp': time.time(), 'actions': actions}, f)
+        with open(csv_path, "w") as f:
+            for action in actions:
+                f.write(f"{action[0]},{action[1]},{'' if action[2] is None else action[2]},{action[3]}\n")
+        _, save_time = timed(lambda: MacroScript.save(v2_path, actions))
+
+        print(f"{count} actions")
+        print(f"  v2 save: {save_time * 1e3:8.1f} ms")
+        for name, path, load in (
+                ("v1 JSON", v1_path, MacroScript.load_json),
+                ("legacy CSV", csv_path, MacroScript.load_legacy),
+                ("v2 binary", v2_path, lambda p: MacroScript.load(p)[0])):
+            track, seconds = timed(lambda: load(path))
+            print(f"  {name:>10}: {os.path.getsize(path) / 1e6:7.1f} MB on disk, "
+                  f"full load {seconds * 1e3:8.1f} ms ({len(track)} actions)")
+
+        mapped, seconds = timed(lambda: MacroScript.open_mapped(v2_path))
+        with mapped:
+            _, seek = timed(lambda: [mapped[i] for i in range(0, len(mapped), len(mapped) // 1000)])
+            print(f"  v2 mmap open: {seconds * 1e3:.2f} ms, 1000 random records {seek * 1e3:.2f} ms, "
+                  f"duration {mapped.duration:.0f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,64 @@
+"""File size against playback fidelity for optimized macros, with and without humanized moves.
+
+    python -m Benchmarks.HumanizeBench [rows]
+
+A dense 125 Hz recording is optimized at several tolerances and saved as v2.
+Fidelity is how far the cursor is from the recorded position at every recorded
+sample time, when the played moves hold their position until the next one (as
+they do on screen). 'sparse' plays only the kept samples, the others fill the
+gaps with MoveHumanizer at 125 Hz.
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from Benchmarks.OptimizeBench import recording
+from Scripts.FileHandler import MacroScript
+from Scripts.Macro.Humanizer import MoveHumanizer, POSITION_ACTIONS
+from Scripts.Macro.Optimizer import MacroOptimizer
+
+
+def positions(actions):
+    rows = [(action[3], action[1], action[2]) for action in actions if action[0] in POSITION_ACTIONS]
+    return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+
+def error(reference, played):
+    """Mean and p95 distance in px between the recorded cursor and the played one"""
+    held = np.searchsorted(played[:, 0], reference[:, 0] + 1e-9, side='right') - 1
+    held = np.maximum(held, 0)
+    distance = np.hypot(reference[:, 1] - played[held, 1], reference[:, 2] - played[held, 2])
+    return distance.mean(), np.percentile(distance, 95)
+
+
+def file_size(actions, directory):
+    path = os.path.join(directory, "bench.MacroScript")
+    MacroScript.save(path, actions)
+    return os.path.getsize(path)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    macro = recording(rows)
+    reference = positions(macro)
+    humanizers = (("linear", MoveHumanizer('tween', 'linear')),
+                  ("ease_in_out", MoveHumanizer('tween', 'ease_in_out')),
+                  ("wind", MoveHumanizer('wind', seed=0)))
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'recorded':>10}: {file_size(macro, directory) / 1024:8.0f} KiB, {len(macro)} rows")
+        for tolerance in (1.0, 3.0, 8.0, 20.0):
+            optimized = MacroOptimizer(tolerance).optimize(macro)
+            size = file_size(optimized, directory)
+            mean, p95 = error(reference, positions(optimized))
+            line = [f"{tolerance:>7.0f} px: {size / 1024:8.0f} KiB, {len(optimized)} rows | "
+                    f"sparse {mean:5.1f}/{p95:5.1f}"]
+            for label, humanizer in humanizers:
+                mean, p95 = error(reference, positions(humanizer.humanize(optimized)))
+                line.append(f"{label} {mean:5.1f}/{p95:5.1f}")
+            print("  ".join(line) + "  (mean/p95 px)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Per-edit autosave cost: full macro_cache.json rewrite versus the append-only journal.
+
+    python -m Benchmarks.JournalBench
+"""
+import json
+import os
+import tempfile
+import time
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.FileHandler.Journal import MacroJournal
+from Scripts.Macro.MacroTrack import MacroTrack
+
+EDITS = 200
+REWRITE_EDITS = 10  # Full rewrites are slow enough that a few samples are plenty
+
+
+def rewrite_cost(folder, track):
+    path = os.path.join(folder, "rewrite.json")
+    start = time.perf_counter()
+    for i in range(REWRITE_EDITS):
+        action = track[i]
+        track[i] = (action[0], action[1], action[2], action[3])
+        with open(path, "w") as f:  # What Ui.save_cache used to do
+            json.dump(track.to_list(), f)
+    return (time.perf_counter() - start) / REWRITE_EDITS
+
+
+def journal_cost(folder, track):
+    journal = MacroJournal(os.path.join(folder, "journal.json"))
+    journal.attach(track)
+    start = time.perf_counter()
+    for i in range(EDITS):
+        action = track[i]
+        track[i] = (action[0], action[1], action[2], action[3])
+        journal.sync()
+    elapsed = time.perf_counter() - start
+    journal.wait()
+    recovered = MacroJournal(journal.cache_file).recover()
+    assert recovered == track, "journal replay diverged"
+    return elapsed / EDITS
+
+
+def main():
+    print("Mean cost of one edit + autosave")
+    for size in (1_000, 10_000, 100_000):
+        track = MacroTrack(macro_actions(size))
+        with tempfile.TemporaryDirectory() as folder:
+            full = rewrite_cost(folder, track)
+            journaled = journal_cost(folder, track)
+        print(f"  {size:>7} actions: rewrite {full * 1e3:9.3f} ms, journal {journaled * 1e3:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Cost per recorded sample of keeping the action log up to date.
+
+    python -m Benchmarks.LogBench
+
+Runs Qt offscreen. The old log cleared a QTextEdit and re-appended every action
+after each sample, so its cost grows with the recording and it is only measured
+up to a few thousand actions. The Ui's MacroLogModel gets a flag per sample and
+one row insert per 60 Hz frame (every other sample at 125 Hz input), with the view
+repainting each frame.
+"""
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QTextEdit
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.MacroTrack import MacroTrack
+from Scripts.Ui.MacroLog import describe
+from Scripts.Ui.Ui import Ui
+
+SAMPLES_PER_FRAME = 2
+WINDOW = 500  # Samples averaged per reported point
+
+
+def old_display(display, macro):
+    """update_macro_display before the model: full repopulation, fed a copied list"""
+    macro = list(macro)
+    display.setPlainText("")
+    for action in macro:
+        display.append(describe(action))
+
+
+def old_cost(app, actions, checkpoints, samples=5):
+    display = QTextEdit()
+    display.setReadOnly(True)
+    display.show()
+    results = []
+    for count in checkpoints:
+        macro = MacroTrack.from_actions(actions[:count])
+        start = time.perf_counter()
+        for action in actions[count:count + samples]:
+            macro.append(action)
+            old_display(display, macro)
+            app.processEvents()
+        results.append((count, (time.perf_counter() - start) / samples))
+    return results
+
+
+class Recorder:
+    def __init__(self, macro):
+        self.macro = macro
+
+
+def new_cost(app, actions, checkpoints):
+    ui = Ui(None)
+    ui.log_timer.stop()  # Frames are driven by hand below
+    ui.show()
+    macro = MacroTrack()
+    ui.macro_recorder = Recorder(macro)
+    ui.update_macro_display(macro)
+    model = ui.macro_log
+    results = []
+    checkpoints = set(checkpoints)
+    start = time.perf_counter()
+    for i, action in enumerate(actions, 1):
+        macro.append(action)
+        model.mark_dirty()
+        if i % SAMPLES_PER_FRAME == 0:
+            ui.refresh_macro_log()
+            app.processEvents()
+        if i % WINDOW == 0:
+            now = time.perf_counter()
+            if i in checkpoints:
+                results.append((i, (now - start) / WINDOW))
+            start = now
+    return results
+
+
+def main():
+    app = QApplication([])
+    actions = list(macro_actions(50_000))
+    for count, seconds in old_cost(app, actions, (250, 500, 1_000, 2_000)):
+        print(f"old  log at {count:>6} actions: {seconds * 1e3:8.3f} ms per sample")
+    for count, seconds in new_cost(app, actions, (1_000, 5_000, 10_000, 25_000, 50_000)):
+        print(f"model log at {count:>6} actions: {seconds * 1e3:8.3f} ms per sample")
+
+
+if __name__ == "__main__":
+    main()
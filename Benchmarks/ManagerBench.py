@@ -0,0 +1,74 @@
+"""Throughput of PlaybackManager on the null backend, and how it keeps time.
+
+    python -m Benchmarks.ManagerBench [actions]
+
+Throughput runs N macros sharing `actions` between them at infinite speed, so
+only the heap, the arbiter and the backend call are left per action; a single
+MacroPlayer over the same actions is the reference. The real-time part plays a
+mouse-only and a keyboard-only macro side by side for two seconds (no
+conflicts expected), then two mouse macros (the second one loses the mouse).
+"""
+import sys
+import time
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.OutputBackend import NullBackend
+from Scripts.Macro.PlaybackManager import PlaybackManager
+from Scripts.Macro.Player import MacroPlayer
+from Scripts.Macro.Scheduler import PlaybackScheduler
+
+FAST = float('inf')
+
+
+def single(actions):
+    player = MacroPlayer(NullBackend(), PlaybackScheduler(speed=FAST))
+    start = time.perf_counter()
+    player.play(actions, 1, keep_playing=lambda: True)
+    return len(actions) / (time.perf_counter() - start)
+
+
+def managed(actions, macros):
+    manager = PlaybackManager(NullBackend(), PlaybackScheduler(speed=FAST))
+    share = len(actions) // macros
+    for n in range(macros):
+        manager.add(actions[n * share:(n + 1) * share])
+    start = time.perf_counter()
+    manager.run()
+    elapsed = time.perf_counter() - start
+    return manager.stats()['played'] / elapsed
+
+
+def moves(seconds, rate, x=0):
+    return [('mouse', x + k % 100, k % 100, k / rate) for k in range(int(seconds * rate) + 1)]
+
+
+def keys(seconds, rate):
+    return [('key', 'a', 'down' if k % 2 == 0 else 'up', k / rate) for k in range(int(seconds * rate) + 1)]
+
+
+def realtime(label, *macros):
+    manager = PlaybackManager(NullBackend())
+    for actions in macros:
+        manager.add(actions)
+    manager.start()
+    manager.wait()
+    stats = manager.stats()
+    lateness = stats['lateness']
+    print(f"  {label:>16}: {stats['played']} actions, conflicts {stats['conflicts']}, lateness p50 "
+          f"{lateness['p50']:.3f} ms, p99 {lateness['p99']:.3f} ms, max {lateness['max']:.3f} ms")
+
+
+def main(count=200_000):
+    actions = [action for action in macro_actions(count) if action[0] != 'window_focus']
+    print(f"{len(actions)} actions on NullBackend, infinite speed")
+    print(f"  {'MacroPlayer':>16}: {single(actions) / 1e3:8.1f}k actions/s")
+    for macros in (1, 4, 16, 64):
+        print(f"  {f'manager x{macros}':>16}: {managed(actions, macros) / 1e3:8.1f}k actions/s")
+
+    print("Real time, 2 s")
+    realtime("mouse + keyboard", moves(2, 500), keys(2, 50))
+    realtime("mouse + mouse", moves(2, 500), moves(2, 500, x=1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,109 @@
+"""Old optimize_macro against MacroOptimizer on a one-million-row recording.
+
+    python -m Benchmarks.OptimizeBench [rows]
+
+The recording is bursts of 125 Hz mouse samples along curved, slightly jittery
+paths, each followed by a click or a key press and an idle pause (some of them
+several seconds long).
+"""
+import sys
+import time
+
+import numpy as np
+
+from Scripts.Macro.MacroTrack import MacroTrack, ACTION_CODES
+from Scripts.Macro.Optimizer import MacroOptimizer
+
+CLICKS = ('left_click', 'right_click', 'middle_click')
+
+
+def recording(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    track = MacroTrack()
+    key_down, key_up, key_a = track.intern('down'), track.intern('up'), track.intern('a')
+    codes, xs, ys, times = [], [], [], []
+    t, x, y = 0.0, 960.0, 540.0
+    total = 0
+    while total < rows:
+        steps = int(rng.integers(50, 400))
+        tx, ty = rng.uniform(0, 1919), rng.uniform(0, 1079)
+        cx, cy = rng.uniform(0, 1919), rng.uniform(0, 1079)  # Bezier control point bends the path
+        k = np.linspace(0, 1, steps)
+        px = (1 - k) ** 2 * x + 2 * (1 - k) * k * cx + k ** 2 * tx + rng.normal(0, 0.7, steps)
+        py = (1 - k) ** 2 * y + 2 * (1 - k) * k * cy + k ** 2 * ty + rng.normal(0, 0.7, steps)
+        codes.append(np.full(steps, ACTION_CODES['mouse'], np.uint8))
+        xs.append(np.clip(np.rint(px), 0, 1919))
+        ys.append(np.clip(np.rint(py), 0, 1079))
+        times.append(t + np.arange(1, steps + 1) * 0.008)
+        t += steps * 0.008
+        x, y = tx, ty
+        roll = rng.random()
+        if roll < 0.6:
+            codes.append(np.array([ACTION_CODES[CLICKS[int(rng.integers(3))]]], np.uint8))
+            xs.append(np.array([round(x)]))
+            ys.append(np.array([round(y)]))
+            times.append(np.array([t + 0.01]))
+        elif roll < 0.8:
+            codes.append(np.full(2, ACTION_CODES['key'], np.uint8))
+            xs.append(np.array([key_a, key_a]))
+            ys.append(np.array([key_down, key_up]))
+            times.append(np.array([t + 0.01, t + 0.09]))
+        t += 0.1 + (rng.uniform(2, 8) if rng.random() < 0.1 else rng.uniform(0.05, 0.8))
+        total += steps + (1 if roll < 0.6 else 2 if roll < 0.8 else 0)
+    return MacroTrack.from_numpy(np.concatenate(codes)[:rows], np.concatenate(xs)[:rows],
+                                 np.concatenate(ys)[:rows], np.concatenate(times)[:rows], track.strings)
+
+
+def old_optimize(macro):
+    """MacroRecorder.optimize_macro before MacroOptimizer"""
+    optimized = []
+    base_time = macro[0][3]
+    last_pos = None
+    last_window = None
+    for action in macro:
+        if action[0] == 'window_focus':
+            if last_window != action[1]:
+                optimized.append(('window_focus', action[1], None, action[3] - base_time))
+                last_window = action[1]
+        elif action[0] == 'mouse':
+            if last_pos != (action[1], action[2]):
+                optimized.append(('mouse', action[1], action[2], action[3] - base_time))
+                last_pos = (action[1], action[2])
+        elif action[0] == 'key':
+            optimized.append(('key', action[1], action[2], action[3] - base_time))
+    return optimized
+
+
+def count_clicks(macro):
+    return sum(1 for action in macro if action[0] in CLICKS)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    macro = recording(rows)
+    clicks = count_clicks(macro)
+    print(f"{len(macro)} rows, {clicks} clicks, {macro.times[-1] - macro.times[0]:.0f} s recorded")
+
+    start = time.perf_counter()
+    old = old_optimize(macro)
+    elapsed = time.perf_counter() - start
+    print(f"{'old optimize_macro':>26}: {elapsed * 1e3:7.0f} ms, ratio {len(macro) / len(old):5.2f}, "
+          f"clicks kept {count_clicks(old)}/{clicks}")
+
+    for label, optimizer in (("rdp 1 px", MacroOptimizer(1.0, 'rdp')),
+                             ("rdp 3 px", MacroOptimizer(3.0, 'rdp')),
+                             ("visvalingam 3 px", MacroOptimizer(3.0, 'visvalingam')),
+                             ("rdp 3 px, idle > 1 s", MacroOptimizer(3.0, 'rdp', max_idle=1.0))):
+        start = time.perf_counter()
+        result = optimizer.optimize(macro, relative=True)
+        elapsed = time.perf_counter() - start
+        stats = optimizer.stats
+        print(f"{label:>26}: {elapsed * 1e3:7.0f} ms, ratio {stats['ratio']:5.2f}, "
+              f"clicks kept {count_clicks(result)}/{clicks}, "
+              f"max path error {stats['max_path_error']:.2f} px, "
+              f"max temporal error {stats['max_temporal_error'] * 1e6:.3f} us, "
+              f"idle removed {stats['idle_removed']:.0f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Dispatch throughput of the playback engine with no OS calls in the loop.
+
+The scheduler runs at infinite speed so every deadline is already due, which
+leaves only the per-action cost of MacroPlayer and the backend call.
+
+    python -m Benchmarks.PlaybackBench [actions]
+"""
+import sys
+import time
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.MacroTrack import MacroTrack
+from Scripts.Macro.OutputBackend import NullBackend, RecordingBackend
+from Scripts.Macro.Player import MacroPlayer
+from Scripts.Macro.Scheduler import PlaybackScheduler
+
+
+def throughput(actions, backend, loops=3):
+    player = MacroPlayer(backend, PlaybackScheduler(speed=float('inf')))
+    start = time.perf_counter()
+    player.play(actions, loops, keep_playing=lambda: True)
+    elapsed = time.perf_counter() - start
+    return len(actions) * loops / elapsed
+
+
+def main(count=100_000):
+    actions = macro_actions(count)
+    track = MacroTrack(actions)
+    print(f"{count} actions x 3 loops")
+    for label, macro in (("list of tuples", actions), ("MacroTrack", track)):
+        for backend in (NullBackend(), RecordingBackend()):
+            rate = throughput(macro, backend)
+            print(f"  {label:>14}, {type(backend).__name__:>16}: {rate / 1e3:8.1f}k actions/s "
+                  f"({1e9 / rate:6.0f} ns/action)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
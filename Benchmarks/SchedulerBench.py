@@ -0,0 +1,99 @@
+"""Playback drift: relative time.sleep per action versus PlaybackScheduler deadlines.
+
+The fake clock oversleeps every sleep by 0.5-2 ms like a desktop OS timer and
+charges a small cost per clock read and per output call, so both playback paths
+can be compared on a 10,000-action macro without waiting for it in real time.
+Exits with status 1 if the scheduler drifts more than MAX_DRIFT_MS.
+
+    python -m Benchmarks.SchedulerBench [actions]
+"""
+import random
+import sys
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.Scheduler import PlaybackScheduler
+
+MAX_DRIFT_MS = 2.0  # One worst-case oversleep; deadlines from one origin must not add up more
+
+
+class FakeClock:
+    def __init__(self, seed=0):
+        self.now = 0
+        self.rng = random.Random(seed)
+
+    def clock(self):
+        self.now += 50  # Reading the clock is not free
+        return self.now
+
+    def sleep(self, seconds):
+        overshoot = self.rng.uniform(0.5e6, 2e6)
+        self.now += int(max(seconds, 0) * 1e9 + overshoot)
+
+
+class FakeBackend:
+    """Counts output calls and charges each one a fixed 20 us"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    def perform(self, action):
+        self.clock.now += 20_000
+        self.calls.append((self.clock.now, action))
+
+
+def play_relative(macro, clock, backend):
+    """The previous _play_macro_thread timing: sleep the recorded delta before each action"""
+    last = macro[0][3]
+    for i, action in enumerate(macro):
+        if i > 0:
+            clock.sleep(max(0, action[3] - last))
+        last = action[3]
+        backend.perform(action)
+
+
+def play_scheduled(macro, clock, backend, speed=1.0, spin_ns=1_500_000):
+    """spin_ns is the scheduler's busy-wait budget, spun on the fake clock one 50 ns read at a time"""
+    scheduler = PlaybackScheduler(speed=speed, spin_ns=spin_ns, clock=clock.clock, sleep=clock.sleep)
+    scheduler.start()
+    first = macro[0][3]
+    for action in macro:
+        scheduler.wait_until(scheduler.deadline(action[3] - first))
+        backend.perform(action)
+    return scheduler.stats()
+
+
+def drift(macro, backend, origin, speed=1.0):
+    """How far the last action landed from where it was recorded, in ms"""
+    expected = (macro[-1][3] - macro[0][3]) / speed * 1e9
+    return (backend.calls[-1][0] - origin - expected) / 1e6
+
+
+def main(count=10_000):
+    macro = macro_actions(count)
+    duration = macro[-1][3] - macro[0][3]
+    print(f"{count} actions over {duration:.1f}s of recorded time (fake clock)")
+
+    clock = FakeClock()
+    backend = FakeBackend(clock)
+    origin = clock.now
+    play_relative(macro, clock, backend)
+    print(f"  relative sleeps:  total drift {drift(macro, backend, origin):9.1f} ms")
+
+    failed = False
+    for speed in (1.0, 2.0):
+        clock = FakeClock()
+        backend = FakeBackend(clock)
+        origin = clock.now
+        stats = play_scheduled(macro, clock, backend, speed)
+        total = drift(macro, backend, origin, speed)
+        print(f"  scheduler x{speed:.0f}:     total drift {total:9.1f} ms, "
+              f"lateness p50 {stats['p50']:.3f} ms, p99 {stats['p99']:.3f} ms, max {stats['max']:.3f} ms")
+        if abs(total) > MAX_DRIFT_MS:
+            print(f"  FAILED: drift over {MAX_DRIFT_MS} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
@@ -0,0 +1,107 @@
+"""Screen conditions: matcher cost and the latency from a screen change to the action it releases.
+
+    python -m Benchmarks.ScreenBench [trials]
+
+Everything runs on a 1920x1080 SyntheticScreen, so it needs no display. The
+matcher part times one grab + compare of a region against its image when every
+pixel differs (the thumbnail rejects it), when one pixel off the thumbnail grid
+differs (the worst case: a full compare that fails) and when it matches, next
+to grabbing the whole screen and cropping. With mss installed the grab of a real
+screen is timed as well. The latency part plays a wait_region followed by a
+click at the same timestamp while a thread draws the awaited image at a random
+moment, and measures from the draw to the click for several poll rates.
+"""
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+from Scripts.Macro.OutputBackend import NullBackend
+from Scripts.Macro.Player import MacroPlayer
+from Scripts.Macro.ScreenMatch import RegionMatch, ScreenWatcher, SyntheticScreen, within
+from Scripts.Macro.Trace import summary
+
+SIZES = ((16, 16), (64, 64), (256, 256), (800, 600))
+
+
+class ClickClock(NullBackend):
+    """Keeps the clock time of every click"""
+
+    def __init__(self):
+        super().__init__()
+        self.clicks = []
+
+    def click(self, button):
+        self.clicks.append(time.perf_counter_ns())
+
+
+def per_call(function, repeat=200):
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter_ns() - start) / repeat / 1e3
+
+
+def matcher_costs():
+    screen = SyntheticScreen()
+    rng = np.random.default_rng(1)
+    print("Grab + compare per check, us")
+    for width, height in SIZES:
+        image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        match = RegionMatch(100, 100, image)
+        region = match.region()
+        screen.paste(100, 100, 255 - image)
+        rejected = per_call(lambda: match.matches(screen.grab(*region)))
+        almost = image.copy()
+        almost[1, 1] ^= 0x80  # Off the stride-8 grid, so only the full compare can see it
+        screen.paste(100, 100, almost)
+        full = per_call(lambda: match.matches(screen.grab(*region)))
+        screen.paste(100, 100, image)
+        matched = per_call(lambda: match.matches(screen.grab(*region)))
+        whole = per_call(lambda: within(screen.grab(0, 0, 1920, 1080)[100:100 + height, 100:100 + width],
+                                        image, match.tolerance), repeat=20)
+        print(f"  {f'{width}x{height}':>9}: rejected {rejected:8.1f}, full compare {full:8.1f}, "
+              f"match {matched:8.1f}, whole-screen grab {whole:8.1f}")
+    try:
+        from Scripts.Macro.ScreenMatch import MssScreen
+        real = MssScreen()
+        for width, height in SIZES:
+            cost = per_call(lambda: real.grab(0, 0, width, height), repeat=50)
+            print(f"  mss grab {width}x{height}: {cost:.1f} us")
+    except Exception as e:
+        print(f"  (no real screen grab: {e})")
+
+
+def latency(poll_hz, trials):
+    screen = SyntheticScreen()
+    image = np.full((48, 96, 3), (40, 160, 90), dtype=np.uint8)
+    match = RegionMatch(300, 200, image, timeout=5)
+    actions = [match.action(0.0), ('left_click', 1, 1, 0.0)]
+    backend = ClickClock()
+    watcher = ScreenWatcher(screen, poll_hz=poll_hz)
+    player = MacroPlayer(backend, watcher=watcher)
+    delays = []
+    for _ in range(trials):
+        screen.fill(0, 0, 1920, 1080, 0)
+        timer = threading.Timer(random.uniform(0.02, 0.06), screen.paste, (300, 200, image))
+        timer.start()
+        player.play(actions)
+        timer.join()
+        delays.append(backend.clicks[-1] - screen.changed_at)
+    delay = summary(delays)
+    label = f"{poll_hz:g} Hz" if poll_hz else "no limit"
+    print(f"  {label:>8}: p50 {delay['p50']:6.2f} ms, p99 {delay['p99']:6.2f} ms, max {delay['max']:6.2f} ms, "
+          f"{watcher.polls / trials:.0f} grabs per wait")
+
+
+def main(trials=50):
+    matcher_costs()
+    print(f"Screen change to click, {trials} waits each")
+    for poll_hz in (30, 60, 120, 500, 0):
+        latency(poll_hz, trials)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
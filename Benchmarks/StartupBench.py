@@ -0,0 +1,71 @@
+"""Cold-start cost of the GUI entry point against the headless CLI player.
+
+    python -m Benchmarks.StartupBench [runs]
+
+Each case runs in a fresh interpreter with -X importtime. Imports is the sum of
+the top-level imports it reports, wall is the whole process including the work.
+gui is what main.py does before showing the window (offscreen Qt), play is
+`python -m Scripts.Cli play` of a small file on the null backend. The hook and
+automation modules the GUI used to import eagerly are timed on their own when
+they are installed.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUI = ("import sys; from PyQt5.QtWidgets import QApplication; from Scripts.Ui.Ui import Ui; "
+       "from Scripts.Macro.MacroRecorder import MacroRecorder; "
+       "app = QApplication(sys.argv); ui = Ui(None); ui.macro_recorder = MacroRecorder(ui)")
+EAGER = ["pyautogui", "keyboard", "mouse", "win32gui"]
+
+
+def measure(args, cwd, runs):
+    env = dict(os.environ, PYTHONPATH=ROOT, QT_QPA_PLATFORM="offscreen")
+    best_imports, best_wall = None, None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd, env=env,
+                                capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        imports = 0
+        for line in result.stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package", top level has no indent
+            if line.startswith("import time:") and "|" in line:
+                fields = line.split("|")
+                if fields[1].strip().isdigit() and not fields[2].startswith("  "):
+                    imports += int(fields[1])
+        best_imports = imports if best_imports is None else min(best_imports, imports)
+        best_wall = wall if best_wall is None else min(best_wall, wall)
+    return best_imports / 1e3, best_wall * 1e3
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as cwd:
+        macro = os.path.join(cwd, "bench.MacroScript")
+        sys.path.insert(0, ROOT)
+        from Benchmarks.Synthetic import macro_actions
+        from Scripts.FileHandler import MacroScript
+        MacroScript.save(macro, [action for action in macro_actions(200) if action[0] != 'window_focus'])
+
+        cases = [("gui", ["-c", GUI]),
+                 ("play", ["-m", "Scripts.Cli", "play", macro, "--backend", "null", "--speed", "inf"]),
+                 ("stats", ["-m", "Scripts.Cli", "stats", macro])]
+        for name in EAGER:
+            cases.append((f"import {name}", ["-c", f"import {name}"]))
+        for label, args in cases:
+            imports, wall = measure(args, cwd, runs)
+            if imports is None:
+                print(f"{label:>18}: not run ({wall})")
+            else:
+                print(f"{label:>18}: imports {imports:7.1f} ms, wall {wall:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
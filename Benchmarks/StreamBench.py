@@ -0,0 +1,89 @@
+"""Recording and playing through a MacroStream file against keeping the macro in memory.
+
+    python -m Benchmarks.StreamBench [actions]
+
+Recording feeds the actions in batches of 64, the way the ring's consumer thread
+appends them. In memory is a MacroTrack saved as v2 at the end; streamed is a
+StreamWriter. Playback loads the v2 file and plays it, or plays the stream with
+play_stream; both at infinite speed into NullBackend so only the work is timed.
+Peak memory is what tracemalloc saw allocated on top of the input.
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.FileHandler import MacroScript
+from Scripts.FileHandler.MacroStream import StreamWriter, open_stream
+from Scripts.Macro.MacroTrack import MacroTrack
+from Scripts.Macro.OutputBackend import NullBackend
+from Scripts.Macro.Player import MacroPlayer
+from Scripts.Macro.Scheduler import PlaybackScheduler
+
+BATCH = 64
+
+
+def run(function):
+    """(seconds, peak bytes) of function; timed and traced in separate runs"""
+    gc.collect()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def show(label, count, result):
+    elapsed, peak = result
+    print(f"  {label:>22}: {elapsed * 1e3:8.0f} ms ({count / elapsed / 1e6:5.2f} M actions/s), peak {peak / 1e6:7.1f} MB")
+
+
+def main(count=2_000_000):
+    actions = macro_actions(count)
+    folder = tempfile.mkdtemp()
+    v2_path = os.path.join(folder, "macro.MacroScript")
+    stream_path = os.path.join(folder, "macro.ezmc")
+
+    def record_memory():
+        track = MacroTrack()
+        for i in range(0, count, BATCH):
+            track.extend(actions[i:i + BATCH])
+        MacroScript.save(v2_path, track)
+
+    def record_stream():
+        with StreamWriter(stream_path) as writer:
+            for i in range(0, count, BATCH):
+                writer.extend(actions[i:i + BATCH])
+
+    def player():
+        return MacroPlayer(NullBackend(), PlaybackScheduler(speed=float('inf')))
+
+    def play_memory():
+        player().play(MacroScript.load(v2_path)[0])
+
+    def play_stream():
+        with open_stream(stream_path) as reader:
+            player().play_stream(reader)
+
+    print(f"{count} actions")
+    print("Record")
+    show("in memory + save", count, run(record_memory))
+    show("streamed", count, run(record_stream))
+    print(f"  {'':>22}  v2 {os.path.getsize(v2_path) / 1e6:.1f} MB, stream {os.path.getsize(stream_path) / 1e6:.1f} MB")
+    print("Play")
+    show("load + play", count, run(play_memory))
+    show("play_stream", count, run(play_stream))
+    for path in (v2_path, stream_path):
+        os.remove(path)
+    os.rmdir(folder)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,72 @@
+"""Stand-ins for the Windows-only and hook modules, so benchmarks run on headless Linux.
+
+install() only adds a stub for a module that cannot be imported, so on a machine
+with the real packages nothing changes. The stubs do nothing and return neutral
+values; benchmarks must not rely on them for output (use NullBackend for that).
+"""
+import importlib
+import sys
+import types
+
+STUBBED = []  # Names of the modules install() replaced
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    module.__stub__ = True
+    return module
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+def _keyboard():
+    return _module("keyboard", hook=_noop, unhook=_noop, unhook_all=_noop, on_press_key=_noop,
+                   unhook_key=_noop, press=_noop, release=_noop, is_pressed=lambda key: False)
+
+
+def _mouse():
+    return _module("mouse", hook=_noop, unhook=_noop, unhook_all=_noop, get_position=lambda: (0, 0))
+
+
+def _pyautogui():
+    class FailSafeException(Exception):
+        pass
+
+    return _module("pyautogui", FailSafeException=FailSafeException, FAILSAFE=True, PAUSE=0.0,
+                   moveTo=_noop, click=_noop, keyDown=_noop, keyUp=_noop, position=lambda: (0, 0),
+                   size=lambda: (1920, 1080))
+
+
+def _win32gui():
+    return _module("win32gui", GetWindowText=lambda handle: "", GetForegroundWindow=lambda: 0,
+                   FindWindow=lambda cls, title: 0, EnumWindows=_noop, IsWindow=lambda handle: False,
+                   IsWindowVisible=lambda handle: False, SetForegroundWindow=_noop)
+
+
+def _win32con():
+    return _module("win32con", WINEVENT_OUTOFCONTEXT=0, WM_QUIT=0x0012)
+
+
+FACTORIES = {
+    'keyboard': _keyboard,
+    'mouse': _mouse,
+    'pyautogui': _pyautogui,
+    'win32gui': _win32gui,
+    'win32con': _win32con,
+}
+
+
+def install():
+    """Stub every module in FACTORIES that is missing; returns the stubbed names"""
+    for name, factory in FACTORIES.items():
+        if name in sys.modules:
+            continue
+        try:
+            importlib.import_module(name)
+        except Exception:  # ImportError, or e.g. pyautogui failing without a display
+            sys.modules[name] = factory()
+            STUBBED.append(name)
+    return list(STUBBED)
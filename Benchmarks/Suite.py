@@ -0,0 +1,289 @@
+"""Benchmark suite for the record, save/load, optimize, render and playback hot paths.
+
+    python -m Benchmarks.Suite [--size N] [--mix mouse=0.9,click=0.04,key=0.055,window=0.005]
+                               [--repeat R] [--only CASE,...] [--baseline FILE] [--save-baseline]
+                               [--tolerance 0.3] [--min-delta MS]
+
+Every case drives the real entry point the GUI uses, through a Ui that runs on
+offscreen Qt with its dialogs answered in code, from a temporary working
+directory so macro_cache.json is never touched. Windows-only and hook modules
+that are missing are stubbed (see Benchmarks/Stubs.py) and playback goes through
+the PlaybackBridge to NullBackend, so the suite runs on headless Linux.
+
+Each case runs once to warm up, then --repeat times. The median is compared
+against the stored baseline for the same size and mix, along with the spread of
+the runs (the median absolute deviation). A case is reported as a regression,
+and the exit status is 1, only if its median is more than --tolerance slower
+and also slower by more than both --min-delta and three times the larger
+spread of the two. One slow run or a noisy machine therefore does not fail the
+suite. --save-baseline records this run as the new baseline instead (for the
+cases run); record it with a high --repeat, e.g. 15.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from Benchmarks import Stubs
+
+Stubs.install()
+
+from PyQt5.QtCore import QEventLoop
+from PyQt5.QtWidgets import QApplication
+
+from Benchmarks.Synthetic import DEFAULT_MIX, macro_actions
+from Scripts.FileHandler import MacroScript
+from Scripts.Macro.EventCapture import SyntheticInputSource
+from Scripts.Macro.MacroRecorder import MacroRecorder
+from Scripts.Macro.OutputBackend import NullBackend
+from Scripts.Ui.Ui import Ui
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+class HeadlessUi(Ui):
+    """Ui whose file dialogs return prepared paths and whose message boxes are collected"""
+
+    def __init__(self):
+        self.open_path = None
+        self.save_path = None
+        self.messages = []
+        super().__init__(None)
+
+    def ask_open_file(self):
+        return self.open_path
+
+    def ask_save_file(self):
+        return self.save_path
+
+    def show_info(self, message):
+        pass
+
+    def show_warning(self, message):
+        self.messages.append(f"warning: {message}")
+
+    def show_error(self, message):
+        self.messages.append(f"error: {message}")
+
+
+def input_events(actions):
+    """The raw hook events that would have been recorded as actions"""
+    events = []
+    handle = 0
+    for action_type, a, b, t in actions:
+        if action_type == 'mouse':
+            events.append(('move', a, b, t))
+        elif action_type == 'key':
+            events.append(('key', a, b, t))
+        elif action_type == 'window_focus':
+            handle += 1
+            events.append(('window', handle, a, t))
+        else:
+            events.append(('move', a, b, t))
+            events.append(('button', action_type.split('_')[0], 'down', t))
+    return events
+
+
+class Suite:
+    """Prepares the GUI objects and input files once; each case_ method returns its setup and timed parts"""
+
+    CASES = ('record', 'optimize_macro', 'save_macro', 'load_macro', 'load_legacy_format',
+             'save_cache', 'load_cache', 'render_macro', 'play_macro')
+
+    def __init__(self, folder, actions):
+        self.folder = folder
+        self.actions = actions
+        self.app = QApplication.instance() or QApplication([])
+        self.ui = HeadlessUi()
+        self.recorder = MacroRecorder(self.ui)
+        self.ui.macro_recorder = self.recorder
+        self.ui.resize(900, 700)
+        self.ui.show()
+        self.app.processEvents()
+
+        self.v2_path = os.path.join(folder, "v2.MacroScript")
+        self.legacy_path = os.path.join(folder, "legacy.MacroScript")
+        MacroScript.save(self.v2_path, actions)
+        with open(self.legacy_path, "w") as f:
+            for action in actions:
+                f.write(f"{action[0]},{action[1]},{'' if action[2] is None else action[2]},{action[3]}\n")
+
+    def use_macro(self):
+        self.recorder.macro = self.actions
+        self.ui.save_cache()
+
+    def case_record(self):
+        events = input_events(self.actions)
+
+        def run():
+            self.recorder.input_source = SyntheticInputSource(events)
+            self.recorder.start_recording()
+            self.recorder.input_source.feed()
+            self.recorder.stop_recording()
+        return None, run
+
+    def case_optimize_macro(self):
+        return self.use_macro, self.recorder.optimize_macro
+
+    def case_save_macro(self):
+        def setup():
+            self.use_macro()
+            self.ui.save_path = os.path.join(self.folder, "saved.MacroScript")
+        return setup, self.recorder.save_macro
+
+    def case_load_macro(self):
+        def setup():
+            self.ui.open_path = self.v2_path
+        return setup, self.recorder.load_macro
+
+    def case_load_legacy_format(self):
+        return None, lambda: self.recorder.load_legacy_format(self.legacy_path)
+
+    def case_save_cache(self):
+        def setup():
+            self.recorder.macro = self.actions  # A new macro, so the cache is rewritten as a snapshot
+        return setup, self.ui.save_cache
+
+    def case_load_cache(self):
+        return self.use_macro, self.ui.load_cache
+
+    def case_render_macro(self):
+        def run():
+            self.ui.render_macro()
+            self.app.processEvents()
+        return self.use_macro, run
+
+    def case_play_macro(self):
+        def setup():
+            self.recorder.macro = self.actions
+            self.recorder.backend = NullBackend()
+            self.recorder.playback_speed = float('inf')  # Every deadline is due, only dispatch is timed
+
+        def run():
+            self.recorder.play_macro()  # Through the PlaybackBridge, as the GUI plays it
+            while self.recorder.playing:  # Until the 'finished' event has reached the GUI thread
+                self.app.processEvents(QEventLoop.WaitForMoreEvents)
+        return setup, run
+
+    def measure(self, name, repeat):
+        """Times in seconds of repeat runs after one warm-up run, or an error message"""
+        times = []
+        for _ in range(repeat + 1):
+            setup, run = getattr(self, "case_" + name)()
+            if setup is not None:
+                setup()
+            self.ui.messages.clear()
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            if self.ui.messages:
+                return self.ui.messages[0]
+            times.append(elapsed)
+        return times[1:]
+
+
+def spread(times):
+    """Median absolute deviation, a spread that one outlier cannot move"""
+    middle = statistics.median(times)
+    return statistics.median(abs(t - middle) for t in times)
+
+
+def parse_mix(text):
+    mix = dict(DEFAULT_MIX)
+    if text:
+        mix = {kind: 0.0 for kind in DEFAULT_MIX}
+        for part in text.split(","):
+            kind, weight = part.split("=")
+            if kind not in mix:
+                raise argparse.ArgumentTypeError(f"unknown action kind {kind!r}")
+            mix[kind] = float(weight)
+    return mix
+
+
+def config_key(size, mix):
+    return f"{size}:" + ",".join(f"{kind}={mix[kind]:g}" for kind in sorted(mix))
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {'runs': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Benchmarks.Suite")
+    parser.add_argument("--size", type=int, default=20_000, help="actions per synthetic macro")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX), help="relative weights per action kind")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--only", help="comma separated case names")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed slowdown, 0.3 is 30%%")
+    parser.add_argument("--min-delta", type=float, default=2.0, help="ms a case must slow down by to count")
+    args = parser.parse_args(argv)
+
+    actions = macro_actions(args.size, seed=args.seed, mix=args.mix)
+    key = config_key(args.size, args.mix)
+    baseline = load_baseline(args.baseline)
+    reference = baseline['runs'].get(key, {}).get('results', {})
+    reference_spread = baseline['runs'].get(key, {}).get('spread', {})
+    cwd = os.getcwd()
+    regressions = []
+    results, spreads = {}, {}
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            suite = Suite(folder, actions)
+            names = args.only.split(",") if args.only else Suite.CASES
+            print(f"{args.size} actions ({key}), median of {args.repeat}"
+                  + (f", stubbed: {', '.join(Stubs.STUBBED)}" if Stubs.STUBBED else ""))
+            for name in names:
+                result = suite.measure(name, args.repeat)
+                if isinstance(result, str):
+                    print(f"  {name:>18}: FAILED {result}")
+                    regressions.append(name)
+                    continue
+                median, noise = statistics.median(result), spread(result)
+                results[name], spreads[name] = median, noise
+                line = f"  {name:>18}: {median * 1e3:9.2f} ms +-{noise * 1e3:6.2f}"
+                if name in reference:
+                    ratio = median / reference[name]
+                    line += f"  baseline {reference[name] * 1e3:9.2f} ms  x{ratio:.2f}"
+                    allowed = max(args.min_delta / 1e3, 3 * max(noise, reference_spread.get(name, 0.0)))
+                    if ratio > 1 + args.tolerance and median - reference[name] > allowed:
+                        line += "  REGRESSION"
+                        regressions.append(name)
+                print(line)
+        finally:
+            os.chdir(cwd)
+
+    if args.save_baseline:
+        run = baseline['runs'].setdefault(key, {})
+        run.setdefault('results', {}).update(results)  # --only keeps the other cases' entries
+        run.setdefault('spread', {}).update(spreads)
+        run['repeat'] = args.repeat
+        run['machine'] = f"{platform.system()} {platform.machine()}, Python {platform.python_version()}"
+        run['recorded'] = time.strftime("%Y-%m-%d")
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not reference:
+        print("No baseline for this size and mix yet, run with --save-baseline to record one")
+    elif regressions:
+        print(f"Regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
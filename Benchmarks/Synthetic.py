@@ -0,0 +1,91 @@
+import math
+import random
+
+WINDOW_TITLES = ["Untitled - Notepad", "Inbox - Mail", "Calculator", "Document1 - Word"]
+KEY_NAMES = ["a", "s", "d", "w", "space", "enter", "shift", "ctrl"]
+
+
+def input_events(seconds=60, seed=0, move_hz=125, start_time=1_700_000_000.0):
+    """Generate a sorted list of raw (kind, a, b, timestamp) input events.
+
+    Mouse moves arrive at move_hz in bursts separated by idle gaps, clicks are held
+    for 2-120 ms, and there are occasional key presses and window switches."""
+    rng = random.Random(seed)
+    events = []
+    t = start_time
+    end = start_time + seconds
+    x, y = 500.0, 400.0
+    window = 0
+    events.append(('window', window, WINDOW_TITLES[window], t))
+    while t < end:
+        # A burst of movement towards a random target
+        tx, ty = rng.uniform(0, 1920), rng.uniform(0, 1080)
+        steps = rng.randint(10, 80)
+        for i in range(1, steps + 1):
+            t += 1.0 / move_hz
+            k = i / steps
+            events.append(('move', int(x + (tx - x) * k), int(y + (ty - y) * k), t))
+        x, y = tx, ty
+
+        roll = rng.random()
+        if roll < 0.5:
+            button = rng.choice(('left', 'left', 'left', 'right', 'middle'))
+            held = rng.uniform(0.002, 0.120)
+            events.append(('button', button, 'down', t + 0.001))
+            events.append(('button', button, 'up', t + 0.001 + held))
+            t += held + 0.002
+        elif roll < 0.7:
+            key = rng.choice(KEY_NAMES)
+            held = rng.uniform(0.03, 0.15)
+            events.append(('key', key, 'down', t + 0.001))
+            events.append(('key', key, 'up', t + 0.001 + held))
+            t += held + 0.002
+        elif roll < 0.75:
+            window = (window + 1) % len(WINDOW_TITLES)
+            events.append(('window', window, WINDOW_TITLES[window], t + 0.001))
+            t += 0.002
+
+        t += rng.expovariate(1 / 0.4)  # Idle gap before the next burst
+    return [event for event in events if event[3] < end]
+
+
+DEFAULT_MIX = {'mouse': 0.9, 'click': 0.04, 'key': 0.055, 'window': 0.005}
+
+
+def macro_actions(count=10000, seed=0, start_time=0.0, sample_interval=0.01, mix=None):
+    """Generate a recorded-style macro: mostly mouse samples with clicks, keys and focus changes.
+
+    mix gives the relative weights of 'mouse', 'click', 'key' (a down/up pair)
+    and 'window' rows; missing kinds default to 0 and DEFAULT_MIX is used if None."""
+    mix = DEFAULT_MIX if mix is None else mix
+    total = sum(mix.values())
+    thresholds = []
+    running = 0.0
+    for kind in ('mouse', 'click', 'key'):
+        running += mix.get(kind, 0.0)
+        thresholds.append(running / total)
+    mouse_below, click_below, key_below = thresholds
+    rng = random.Random(seed)
+    actions = []
+    t = start_time
+    angle = 0.0
+    x, y = 960.0, 540.0
+    actions.append(('window_focus', WINDOW_TITLES[0], None, t))
+    while len(actions) < count:
+        roll = rng.random()
+        t += sample_interval
+        if roll < mouse_below:
+            angle += rng.uniform(-0.3, 0.3)
+            x = min(max(x + math.cos(angle) * rng.uniform(0, 8), 0), 1919)
+            y = min(max(y + math.sin(angle) * rng.uniform(0, 8), 0), 1079)
+            actions.append(('mouse', int(x), int(y), t))
+        elif roll < click_below:
+            actions.append((rng.choice(('left_click', 'right_click', 'middle_click')), int(x), int(y), t))
+        elif roll < key_below:
+            key = rng.choice(KEY_NAMES)
+            actions.append(('key', key, 'down', t))
+            t += rng.uniform(0.03, 0.15)
+            actions.append(('key', key, 'up', t))
+        else:
+            actions.append(('window_focus', rng.choice(WINDOW_TITLES), None, t))
+    return actions[:count]
@@ -0,0 +1,98 @@
+"""Editor lookups and range edits with MacroTimeline against linear scans.
+
+    python -m Benchmarks.TimelineBench [actions]
+
+Scan is what finding a row costs without an index (a pass over the columns),
+per-row is deleting/inserting one action at a time the way remove_rows did.
+Times are per operation, averaged over many random positions.
+"""
+import bisect
+import math
+import random
+import sys
+import time
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.MacroTrack import MacroTrack
+from Scripts.Macro.Timeline import MacroTimeline, POSITION_CODES
+
+
+def per_op(function, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def show(label, scan, indexed):
+    print(f"  {label:>22}: scan {scan * 1e6:10.1f} us, timeline {indexed * 1e6:8.2f} us ({scan / indexed:,.0f}x)")
+
+
+def main(count=1_000_000):
+    rng = random.Random(0)
+    track = MacroTrack(macro_actions(count))
+    start = time.perf_counter()
+    timeline = MacroTimeline.of(track)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    timeline.in_order()
+    counted = time.perf_counter() - start
+    start = time.perf_counter()
+    timeline.build_grid()
+    print(f"{count} actions, index attached in {built * 1e3:.1f} ms, order check (first seek) "
+          f"{counted * 1e3:.0f} ms, spatial grid (first hit test) {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    times = track.times
+    stamps = [rng.uniform(times[0], times[-1]) for _ in range(20)]
+    scan = per_op(lambda t: next(i for i, value in enumerate(times) if value >= t), stamps)
+    show("seek timestamp", scan, per_op(timeline.seek, stamps * 500))
+
+    ids = [timeline.id_at(rng.randrange(count)) for _ in range(20)]
+    id_list = [timeline.id_at(row) for row in range(count)]
+    scan = per_op(id_list.index, ids)
+    show("row of id", scan, per_op(timeline.row_of, ids * 500))
+
+    points = [(rng.randrange(1920), rng.randrange(1080)) for _ in range(5)]
+
+    def hit_scan(point):
+        x, y = point
+        return sorted((math.hypot(px - x, py - y), row) for row, (code, px, py)
+                      in enumerate(zip(track.codes, track.xs, track.ys))
+                      if code in POSITION_CODES and math.hypot(px - x, py - y) <= 10)
+    scan = per_op(hit_scan, points)
+    show("hit test r=10", scan, per_op(lambda point: timeline.hit(point[0], point[1], 10), points * 20))
+    hits = sum(len(timeline.hit(x, y, 10)) for x, y in points) / len(points)
+    print(f"  {'':>22}  ({hits:.0f} nodes within 10 px on average)")
+
+    print("Range edits of 100 rows")
+    for label in ("delete", "insert"):
+        spots = [rng.randrange(count // 4, count // 2) for _ in range(5)]
+        block = [('mouse', k, k, 0.0) for k in range(100)]
+        if label == "delete":
+            def per_row(row):
+                for r in range(row + 99, row - 1, -1):
+                    del track[r]
+
+            def ranged(row):
+                timeline.delete_ids([timeline.id_at(r) for r in range(row, row + 100)])
+        else:
+            def per_row(row):
+                for k, action in enumerate(block):
+                    track.insert(row + k, action)
+
+            def ranged(row):
+                timeline.insert(row, block)
+        show(label, per_op(per_row, spots), per_op(ranged, spots))
+    spots = [rng.randrange(count // 2) for _ in range(20)]
+    retime = per_op(lambda row: timeline.retime(row, row + 100, times[row], times[row] + 1.0), spots)
+    print(f"  {'retime':>22}: timeline {retime * 1e6:8.2f} us")
+    print(f"  relabels {timeline.relabels}, out-of-order rows {timeline.inversions}")
+
+    offsets = [int((t - times[0]) * 1e9) for t in times]
+    targets = [int(t * 1e9) for t in stamps]
+    scan = per_op(lambda target: next(i for i, offset in enumerate(offsets) if offset >= target), targets)
+    show("play from timestamp", scan, per_op(lambda target: bisect.bisect_left(offsets, target), targets * 500))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
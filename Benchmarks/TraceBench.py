@@ -0,0 +1,69 @@
+"""Cost of playback instrumentation, and what it reports.
+
+    python -m Benchmarks.TraceBench [actions]
+
+Plays the same actions on NullBackend at infinite speed without a trace (the
+normal path), with a PlaybackTrace, and with a trace and a retry policy. Then
+plays them on a backend whose calls fail now and then, with retries, and
+prints the metrics and histograms the trace collected.
+"""
+import random
+import sys
+import time
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.OutputBackend import NullBackend
+from Scripts.Macro.Player import ActionRetry, MacroPlayer
+from Scripts.Macro.Scheduler import PlaybackScheduler
+from Scripts.Macro.Trace import PlaybackTrace
+
+
+class FlakyBackend(NullBackend):
+    """NullBackend whose moves raise once in every few hundred calls"""
+
+    def __init__(self, failure_rate=0.005, seed=0):
+        super().__init__()
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+
+    def move(self, x, y):
+        if self.rng.random() < self.failure_rate:
+            raise OSError("move failed")
+        super().move(x, y)
+
+
+retry = ActionRetry(3, delay=0)  # What MacroRecorder uses, without the pause between attempts
+
+
+def throughput(actions, trace=None, retry=None, runs=3):
+    best = 0
+    for _ in range(runs):
+        player = MacroPlayer(NullBackend(), PlaybackScheduler(speed=float('inf')), trace, retry)
+        start = time.perf_counter()
+        player.play(actions, 1, keep_playing=lambda: True)
+        best = max(best, len(actions) / (time.perf_counter() - start))
+    return best
+
+
+def main(count=200_000):
+    actions = [action for action in macro_actions(count) if action[0] != 'window_focus']
+    print(f"{len(actions)} actions on NullBackend, infinite speed")
+    plain = throughput(actions)
+    print(f"  {'no trace':>15}: {plain / 1e3:7.1f}k actions/s")
+    for label, trace, policy in (("trace", PlaybackTrace(), None), ("trace + retry", PlaybackTrace(), retry)):
+        rate = throughput(actions, trace, policy)
+        print(f"  {label:>15}: {rate / 1e3:7.1f}k actions/s ({1e9 / rate - 1e9 / plain:+.0f} ns/action)")
+
+    trace = PlaybackTrace()
+    player = MacroPlayer(FlakyBackend(), PlaybackScheduler(speed=float('inf')), trace, retry)
+    player.play(actions, 1, keep_playing=lambda: True)
+    metrics = trace.metrics()
+    print(f"Flaky backend: {metrics['retries']} retries, {metrics['failed']} failed")
+    for name, entry in metrics['by_call'].items():
+        print(f"  {name:>12}: call p50 {entry['call']['p50'] * 1e3:.2f} us, p99 {entry['call']['p99'] * 1e3:.2f} us, "
+              f"retries {entry['retries']}")
+    print(trace.format_histogram('call'))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,55 @@
+"""Memory and iteration cost of a list of action tuples versus MacroTrack.
+
+    python -m Benchmarks.TrackBench [minutes]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from Benchmarks.Synthetic import macro_actions
+from Scripts.Macro.MacroTrack import MacroTrack
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def iterate(macro):
+    start = time.perf_counter()
+    moves = 0
+    for action in macro:
+        if action[0] == 'mouse':
+            moves += action[1]
+    return time.perf_counter() - start
+
+
+def main(minutes=60):
+    count = minutes * 60 * 100  # 100 Hz samples
+    # Build each shape inside the measurement so every boxed value is counted
+    tuples, tuple_bytes = measure(lambda: macro_actions(count))
+    encoded = json.dumps(tuples)
+    lists, list_bytes = measure(lambda: json.loads(encoded))  # How macro_cache.json comes back
+    track, track_bytes = measure(lambda: MacroTrack(macro_actions(count)))
+    print(f"{count} actions ({minutes} min at 100 Hz)")
+    print(f"  list of tuples: {tuple_bytes / 1e6:8.1f} MB, iterate {iterate(tuples) * 1e3:7.1f} ms")
+    print(f"  list of lists:  {list_bytes / 1e6:8.1f} MB, iterate {iterate(lists) * 1e3:7.1f} ms")
+    print(f"  MacroTrack:     {track_bytes / 1e6:8.1f} MB, iterate {iterate(track) * 1e3:7.1f} ms")
+
+    start = time.perf_counter()
+    try:
+        codes, xs, ys, times = track.as_numpy()
+    except ImportError:  # The column views need NumPy
+        return
+    total = int(xs[codes == 0].sum())
+    print(f"  MacroTrack columns via NumPy: {(time.perf_counter() - start) * 1e3:7.1f} ms (sum {total})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 60)
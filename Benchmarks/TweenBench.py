@@ -0,0 +1,86 @@
+"""Tween points per second: the old stateful Tween.ease against tween_points.
+
+    python -m Benchmarks.TweenBench
+
+Old evaluates one point per call through the string if/elif chain, as the
+Tween class did. Batched evaluates 1000 (start, end) pairs at 1000 progress
+values per call.
+"""
+import time
+
+import numpy as np
+
+from Scripts.Macro.Utils.Tween import tween_points, cubic_bezier
+
+
+class OldTween:
+    """Tween.ease and its curves as they were before the easing registry"""
+
+    def __init__(self, tween, start_value, end_value):
+        self.tween = tween
+        self.start_value = start_value
+        self.end_value = end_value
+
+    def ease(self, t):
+        if self.tween == "linear":
+            return self.ease_linear(t)
+        elif self.tween == "ease_in":
+            return self.ease_in(t)
+        elif self.tween == "ease_out":
+            return self.ease_out(t)
+        elif self.tween == "ease_in_out":
+            return self.ease_in_out(t)
+
+    def ease_linear(self, t):
+        return (self.start_value[0] + (self.end_value[0] - self.start_value[0]) * t,
+                self.start_value[1] + (self.end_value[1] - self.start_value[1]) * t)
+
+    def ease_in(self, t):
+        return (self.start_value[0] + (self.end_value[0] - self.start_value[0]) * t * t,
+                self.start_value[1] + (self.end_value[1] - self.start_value[1]) * t * t)
+
+    def ease_out(self, t):
+        return (self.start_value[0] + (self.end_value[0] - self.start_value[0]) * (1 - (1 - t) * (1 - t)),
+                self.start_value[1] + (self.end_value[1] - self.start_value[1]) * (1 - (1 - t) * (1 - t)))
+
+    def ease_in_out(self, t):
+        if t < 0.5:
+            return (self.start_value[0] + (self.end_value[0] - self.start_value[0]) * 2 * t * t,
+                    self.start_value[1] + (self.end_value[1] - self.start_value[1]) * 2 * t * t)
+        else:
+            return (self.start_value[0] + (self.end_value[0] - self.start_value[0]) * (1 - 2 * (1 - t) * (1 - t)),
+                    self.start_value[1] + (self.end_value[1] - self.start_value[1]) * (1 - 2 * (1 - t) * (1 - t)))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    pairs, samples = 1000, 1000
+    starts = rng.uniform(0, 1920, (pairs, 2))
+    ends = rng.uniform(0, 1920, (pairs, 2))
+    progress = np.linspace(0, 1, samples)
+    progress_list = progress.tolist()
+
+    for name in ("linear", "ease_in", "ease_out", "ease_in_out"):
+        count = 0
+        start = time.perf_counter()
+        for a, b in zip(starts[:100].tolist(), ends[:100].tolist()):
+            tween = OldTween(name, a, b)
+            for t in progress_list:
+                tween.ease(t)
+                count += 1
+        old = count / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        points = tween_points(starts, ends, progress, name)
+        new = points.shape[0] * points.shape[1] / (time.perf_counter() - start)
+        print(f"{name:>12}: old {old / 1e6:6.2f} M points/s, batched {new / 1e6:7.1f} M points/s ({new / old:.0f}x)")
+
+    ease = cubic_bezier(0.25, 0.1, 0.25, 1.0)
+    start = time.perf_counter()
+    points = tween_points(starts, ends, progress, ease)
+    new = points.shape[0] * points.shape[1] / (time.perf_counter() - start)
+    print(f"{'cubic-bezier':>12}: batched {new / 1e6:7.1f} M points/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""WindMouse paths per second: the old per-step NumPy loop against wind_path.
+
+    python -m Benchmarks.WindMouseBench [paths]
+
+Old is WindMouse.wind_mouse as it was, with a move_mouse that only collects the
+points. Fresh generates a new random path each time, cached repeats a working
+set of 50 seeded segments, as a macro replaying the same moves every loop does.
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from Scripts.Macro.Utils.WindMouse import wind_path
+
+
+def old_wind_mouse(start_x, start_y, dest_x, dest_y, move_mouse, G_0=9, W_0=3, M_0=15, D_0=12):
+    sqrt3 = np.sqrt(3)
+    sqrt5 = np.sqrt(5)
+    current_x, current_y = start_x, start_y
+    v_x = v_y = W_x = W_y = 0
+    while (dist := np.hypot(dest_x - start_x, dest_y - start_y)) >= 1:
+        W_mag = min(W_0, dist)
+        if dist >= D_0:
+            W_x = W_x / sqrt3 + (2 * np.random.random() - 1) * W_mag / sqrt5
+            W_y = W_y / sqrt3 + (2 * np.random.random() - 1) * W_mag / sqrt5
+        else:
+            W_x /= sqrt3
+            W_y /= sqrt3
+            if M_0 < 3:
+                M_0 = np.random.random() * 3 + 3
+            else:
+                M_0 /= sqrt5
+        v_x += W_x + G_0 * (dest_x - start_x) / dist
+        v_y += W_y + G_0 * (dest_y - start_y) / dist
+        v_mag = np.hypot(v_x, v_y)
+        if v_mag > M_0:
+            v_clip = M_0 / 2 + np.random.random() * M_0 / 2
+            v_x = (v_x / v_mag) * v_clip
+            v_y = (v_y / v_mag) * v_clip
+        start_x += v_x
+        start_y += v_y
+        move_x = int(np.round(start_x))
+        move_y = int(np.round(start_y))
+        if current_x != move_x or current_y != move_y:
+            move_mouse(current_x := move_x, current_y := move_y)
+
+
+def segments(count, seed=0):
+    rng = random.Random(seed)
+    return [((rng.randint(0, 1919), rng.randint(0, 1079)), (rng.randint(0, 1919), rng.randint(0, 1079)))
+            for _ in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    pairs = segments(count)
+
+    points = []
+    start = time.perf_counter()
+    for (sx, sy), (dx, dy) in pairs:
+        old_wind_mouse(sx, sy, dx, dy, lambda x, y: points.append((x, y)))
+    old = time.perf_counter() - start
+    print(f"   old wind_mouse: {count / old:9.0f} paths/s, {len(points) / count:.0f} points per path")
+
+    rng = np.random.default_rng(0)
+    total = 0
+    start = time.perf_counter()
+    for a, b in pairs:
+        total += len(wind_path(a, b, rng=rng))
+    fresh = time.perf_counter() - start
+    print(f"fresh wind_path:   {count / fresh:9.0f} paths/s, {total / count:.0f} points per path, "
+          f"{old / fresh:.1f}x")
+
+    working_set = segments(50, seed=1)
+    start = time.perf_counter()
+    for i in range(count):
+        a, b = working_set[i % len(working_set)]
+        wind_path(a, b, seed=i % len(working_set))
+    cached = time.perf_counter() - start
+    print(f"cached wind_path:  {count / cached:9.0f} paths/s, {old / cached:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
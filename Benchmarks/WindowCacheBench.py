@@ -0,0 +1,61 @@
+"""Window lookups per playback loop with and without WindowCache, on a fake window list.
+
+    python -m Benchmarks.WindowCacheBench
+"""
+import time
+
+from Scripts.Macro.WindowCache import FakeWindowSystem, WindowCache
+
+
+class SlowWindowSystem(FakeWindowSystem):
+    """FakeWindowSystem with rough Win32 costs: FindWindow ~20 us, EnumWindows ~1 ms"""
+
+    def _cost(self, seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    def find_exact(self, title):
+        self._cost(20e-6)
+        return super().find_exact(title)
+
+    def windows(self):
+        self._cost(1e-3)
+        return super().windows()
+
+    def is_window(self, handle):
+        self._cost(0.5e-6)
+        return super().is_window(handle)
+
+
+RECORDED = ["notes.txt - Notepad", "Inbox - Mail", "Calculator", "Report.docx - Word"]
+OPEN_NOW = ["Untitled - Notepad", "Inbox - Mail", "Calculator", "Other.docx - Word", "Explorer"]
+
+
+def run(cached, loops=200):
+    system = SlowWindowSystem(OPEN_NOW)
+    cache = WindowCache(system, fuzzy=True)
+    start = time.perf_counter()
+    focused = 0
+    for loop in range(loops):
+        if loop == loops // 2:
+            system.create("Another - Notepad")  # Invalidates the fuzzy entries once
+        for title in RECORDED:
+            if cached:
+                focused += cache.focus(title)
+            else:
+                cache.invalidate()  # Resolve from scratch every time, like FindWindow per action
+                focused += cache.focus(title)
+    return time.perf_counter() - start, focused, cache.stats(), system.calls
+
+
+def main():
+    for cached in (False, True):
+        elapsed, focused, stats, calls = run(cached)
+        print(f"{'cached' if cached else 'uncached':>8}: {elapsed * 1e3:7.1f} ms for {focused} focus actions, "
+              f"hits {stats['hits']}, misses {stats['misses']}, enumerations {stats['enumerations']}, "
+              f"FindWindow calls {calls['find_exact']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Command line player/recorder, no Qt needed.
+
+    python -m Scripts.Cli play FILE [FILE ...] [--loops N] [--speed X] [--backend NAME] [--coalesce] [--humanize MODE] [--trace OUT] [--poll-hz N]
+    python -m Scripts.Cli record FILE [--seconds S] [--stream]
+    python -m Scripts.Cli convert SOURCE DEST [--compress zlib|lzma|none]
+    python -m Scripts.Cli optimize SOURCE DEST [--tolerance PX] [--method rdp|visvalingam] [--max-idle S] [--compress ...]
+    python -m Scripts.Cli stats FILE
+    python -m Scripts.Cli wait FILE X Y WIDTH HEIGHT --at T [--tolerance N] [--timeout S]
+    python -m Scripts.Cli branch FILE X Y --at T --skip S [--color RRGGBB] [--tolerance N]
+
+Every command imports only what it uses: play pulls in one output backend,
+record the input hooks, wait and branch the screen grabber, and the file
+commands nothing platform specific.
+"""
+import argparse
+import sys
+import time
+
+BACKENDS = ('auto', 'pyautogui', 'xdotool', 'null')
+COMPRESSIONS = ('zlib', 'lzma', 'none')  # DeltaCodec.COMPRESSORS, without importing it
+
+
+def make_backend(name):
+    from Scripts.Macro import OutputBackend
+    if name == 'pyautogui':
+        return OutputBackend.PyAutoGuiBackend()
+    if name == 'xdotool':
+        return OutputBackend.XdotoolBackend()
+    if name == 'null':
+        return OutputBackend.NullBackend()
+    return OutputBackend.default_backend()
+
+
+def prepare(macro, args):
+    actions = macro
+    if args.coalesce:
+        from Scripts.Macro.Coalescer import MoveCoalescer
+        actions = MoveCoalescer().coalesce(actions)
+    if args.humanize:
+        from Scripts.Macro.Humanizer import MoveHumanizer
+        actions = MoveHumanizer(args.humanize).humanize(actions)
+    return actions
+
+
+def play(args):
+    from Scripts.FileHandler import MacroScript
+    from Scripts.Macro.Scheduler import PlaybackScheduler
+
+    if (len(args.files) == 1 and not (args.coalesce or args.humanize or args.trace)
+            and MacroScript.detect_format(args.files[0]) == 'stream'):
+        return play_stream(args)
+    macros = [MacroScript.load(file)[0] for file in args.files]
+    macros = [macro for macro in macros if len(macro)]
+    if not macros:
+        print("Nothing to play")
+        return 1
+    scheduler = PlaybackScheduler(speed=args.speed)
+    backend = make_backend(args.backend)
+    status = 0
+    if len(macros) == 1:
+        from Scripts.Macro.Player import MacroPlayer
+        from Scripts.Macro.ScreenMatch import ConditionTimeout, ScreenWatcher
+        macro = macros[0]
+        trace = None
+        if args.trace:
+            from Scripts.Macro.Trace import PlaybackTrace
+            trace = PlaybackTrace()
+        player = MacroPlayer(backend, scheduler, trace, watcher=ScreenWatcher(poll_hz=args.poll_hz))
+        try:
+            player.play(prepare(macro, args), args.loops, timeline=(macro[0][3], macro[-1][3]))
+        except KeyboardInterrupt:
+            print("Stopped")
+        except ConditionTimeout as e:
+            print(f"Screen condition timed out: {e}")
+            status = 1
+        if trace is not None:
+            trace.save_chrome_trace(args.trace)
+            print(trace.format_histogram('lateness'))
+            print(trace.format_histogram('call'))
+            print(f"Trace written to {args.trace}")
+    else:
+        if args.trace:
+            print("--trace only applies to a single file")
+        from Scripts.Macro.ScreenMatch import has_conditions
+        if any(has_conditions(macro) for macro in macros):
+            print("Screen conditions only apply to a single file, these play on time alone")
+        # Several files play at the same time, each on its own timeline
+        from Scripts.Macro.PlaybackManager import PlaybackManager
+        manager = PlaybackManager(backend, scheduler)
+        for macro in macros:
+            manager.add(prepare(macro, args), args.loops, timeline=(macro[0][3], macro[-1][3]))
+        manager.start()
+        try:
+            while manager.thread.is_alive():
+                manager.wait(0.1)
+        except KeyboardInterrupt:
+            manager.stop()
+            print("Stopped")
+        if manager.arbiter.conflicts:
+            print(f"{manager.arbiter.conflicts} actions dropped where macros fought over a device")
+    stats = scheduler.stats()
+    print(f"Played {stats['count']} actions, lateness p50 {stats['p50']:.3f} ms, "
+          f"p99 {stats['p99']:.3f} ms, max {stats['max']:.3f} ms")
+    return status
+
+
+def play_stream(args):
+    """Play a stream file chunk by chunk instead of loading it"""
+    from Scripts.FileHandler.MacroStream import open_stream
+    from Scripts.Macro.Player import MacroPlayer
+    from Scripts.Macro.Scheduler import PlaybackScheduler
+
+    scheduler = PlaybackScheduler(speed=args.speed)
+    player = MacroPlayer(make_backend(args.backend), scheduler)
+    with open_stream(args.files[0]) as reader:
+        if reader.truncated:
+            print("The file ends in an incomplete chunk, playing what was written before it")
+        try:
+            player.play_stream(reader, args.loops)
+        except KeyboardInterrupt:
+            print("Stopped")
+    stats = scheduler.stats()
+    print(f"Played {stats['count']} actions, lateness p50 {stats['p50']:.3f} ms, "
+          f"p99 {stats['p99']:.3f} ms, max {stats['max']:.3f} ms")
+    return 0
+
+
+def record(args):
+    from array import array
+    from Scripts.FileHandler import MacroScript
+    from Scripts.Macro.EventCapture import BufferedEventRecorder, HookInputSource
+    from Scripts.Macro.MacroTrack import MacroTrack
+
+    if args.stream:
+        from Scripts.FileHandler.MacroStream import StreamWriter
+        macro = StreamWriter(args.file)  # Written out as it is recorded, absolute timestamps
+    else:
+        macro = MacroTrack()
+    recorder = BufferedEventRecorder(HookInputSource(), macro, ignore_title=None)
+    print("Recording, press Ctrl+C to stop" if args.seconds is None else f"Recording for {args.seconds} s")
+    recorder.start()
+    try:
+        end = None if args.seconds is None else time.monotonic() + args.seconds
+        while end is None or time.monotonic() < end:
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    recorder.stop()
+    stats = recorder.ring.stats()
+    if args.stream:
+        macro.close()
+        print(f"Streamed {len(macro)} actions to {args.file} ({stats['dropped']} events dropped)")
+        return 0
+    if len(macro):
+        # Saved relative to the first action, like the GUI's Save
+        base = macro.times[0]
+        macro.times = array('d', (t - base for t in macro.times))
+    MacroScript.save(args.file, macro)
+    print(f"Saved {len(macro)} actions to {args.file} ({stats['dropped']} events dropped)")
+    return 0
+
+
+def convert(args):
+    from Scripts.FileHandler import MacroScript
+    source_format, count = MacroScript.convert(args.source, args.dest, args.compress)
+    print(f"Converted {count} actions from {source_format} to {'v2' if args.compress is None else 'v3'}: {args.dest}")
+    return 0
+
+
+def optimize(args):
+    from Scripts.FileHandler import MacroScript
+    from Scripts.Macro.Optimizer import MacroOptimizer
+
+    macro, _ = MacroScript.load(args.source)
+    optimizer = MacroOptimizer(args.tolerance, args.method, args.max_idle)
+    MacroScript.save(args.dest, optimizer.optimize(macro, relative=True), compression=args.compress)
+    stats = optimizer.stats
+    print(f"{stats['rows_in']} -> {stats['rows_out']} actions (ratio {stats['ratio']:.2f}), "
+          f"max path error {stats['max_path_error']:.2f} px, idle removed {stats['idle_removed']:.2f} s")
+    return 0
+
+
+def stats(args):
+    from collections import Counter
+    from Scripts.FileHandler import MacroScript
+
+    macro, file_format = MacroScript.load(args.file)
+    print(f"{args.file}: {file_format}, {len(macro)} actions")
+    if not len(macro):
+        return 0
+    print(f"  duration {macro.times[-1] - macro.times[0]:.2f} s")
+    for action_type, count in Counter(action[0] for action in macro).most_common():
+        print(f"  {action_type:>12}: {count}")
+    positions = [(action[1], action[2]) for action in macro
+                 if action[0] in ('mouse', 'left_click', 'right_click', 'middle_click')]
+    if positions:
+        xs, ys = zip(*positions)
+        print(f"  cursor range x {min(xs)}..{max(xs)}, y {min(ys)}..{max(ys)}")
+    windows = sorted({action[1] for action in macro if action[0] == 'window_focus' and action[1]})
+    if windows:
+        print(f"  windows: {', '.join(windows)}")
+    return 0
+
+
+def add_condition(args):
+    """Insert a screen wait or pixel branch captured from the screen as it is now"""
+    import bisect
+    from Scripts.FileHandler import MacroScript
+    from Scripts.Macro import ScreenMatch
+
+    macro, file_format = MacroScript.load(args.file)
+    if args.command == 'wait':
+        match = ScreenMatch.capture_region(ScreenMatch.default_screen(), args.x, args.y, args.width, args.height,
+                                           tolerance=args.tolerance, timeout=args.timeout)
+    elif args.color:
+        match = ScreenMatch.PixelMatch(args.x, args.y, list(bytes.fromhex(args.color)), args.tolerance, args.skip)
+    else:
+        match = ScreenMatch.capture_pixel(ScreenMatch.default_screen(), args.x, args.y,
+                                          tolerance=args.tolerance, skip=args.skip)
+    index = bisect.bisect_right(macro.times, args.at)
+    macro.insert(index, match.action(args.at))
+    MacroScript.save(args.file, macro, compression='zlib' if file_format == 'v3' else None)
+    print(f"Inserted {args.command} as action {index} of {len(macro)}: {' '.join(match.spec().split()[:2])}")
+    return 0
+
+
+def parser():
+    root = argparse.ArgumentParser(prog="python -m Scripts.Cli", description="Play, record and edit macros without the GUI")
+    commands = root.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("play", help="play macro files, several at once if given more than one")
+    command.add_argument("files", nargs="+")
+    command.add_argument("--loops", type=int, default=1)
+    command.add_argument("--speed", type=float, default=1.0, help="2 plays twice as fast")
+    command.add_argument("--backend", choices=BACKENDS, default='auto')
+    command.add_argument("--coalesce", action="store_true", help="at most one move per output frame")
+    command.add_argument("--humanize", choices=('tween', 'wind'), help="generate motion between sparse moves")
+    command.add_argument("--trace", metavar="OUT", help="write a Chrome trace of the playback and print histograms")
+    command.add_argument("--poll-hz", type=float, default=60, help="how often a screen wait grabs its region")
+    command.set_defaults(run=play)
+
+    command = commands.add_parser("record", help="record input to a macro file")
+    command.add_argument("file")
+    command.add_argument("--seconds", type=float, help="stop after this long instead of on Ctrl+C")
+    command.add_argument("--stream", action="store_true",
+                         help="write chunks to the file while recording, for sessions too long to keep in memory")
+    command.set_defaults(run=record)
+
+    command = commands.add_parser("convert",
+                                  help="rewrite a v1 JSON, legacy or stream file as v2, or v3 with --compress")
+    command.add_argument("source")
+    command.add_argument("dest")
+    command.add_argument("--compress", choices=COMPRESSIONS, help="write a delta-encoded v3 file with this compressor")
+    command.set_defaults(run=convert)
+
+    command = commands.add_parser("optimize", help="simplify mouse paths and drop redundant actions")
+    command.add_argument("source")
+    command.add_argument("dest")
+    command.add_argument("--tolerance", type=float, default=2.0, help="pixels")
+    command.add_argument("--method", choices=('rdp', 'visvalingam'), default='rdp')
+    command.add_argument("--max-idle", type=float, help="shorten pauses longer than this many seconds")
+    command.add_argument("--compress", choices=COMPRESSIONS, help="write a delta-encoded v3 file with this compressor")
+    command.set_defaults(run=optimize)
+
+    command = commands.add_parser("stats", help="summarize a macro file")
+    command.add_argument("file")
+    command.set_defaults(run=stats)
+
+    command = commands.add_parser("wait", help="insert a step that waits until a screen region looks as it does now")
+    command.add_argument("file")
+    for name in ("x", "y", "width", "height"):
+        command.add_argument(name, type=int)
+    command.add_argument("--at", type=float, required=True, help="timestamp of the step, in seconds")
+    command.add_argument("--tolerance", type=int, default=8, help="largest difference per colour channel")
+    command.add_argument("--timeout", type=float, default=10.0, help="stop playback after waiting this long")
+    command.set_defaults(run=add_condition)
+
+    command = commands.add_parser("branch", help="insert a step that skips ahead unless a pixel has a colour")
+    command.add_argument("file")
+    command.add_argument("x", type=int)
+    command.add_argument("y", type=int)
+    command.add_argument("--at", type=float, required=True, help="timestamp of the step, in seconds")
+    command.add_argument("--skip", type=float, required=True, help="seconds of actions to skip when it differs")
+    command.add_argument("--color", help="RRGGBB to expect instead of the pixel's colour now")
+    command.add_argument("--tolerance", type=int, default=8, help="largest difference per colour channel")
+    command.set_defaults(run=add_condition)
+    return root
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
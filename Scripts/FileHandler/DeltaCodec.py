@@ -0,0 +1,160 @@
+"""Delta + zigzag varint encoding of macro columns, with an optional zlib/lzma stage.
+
+Used by MacroScript for v3 files. Rows are encoded in chunks; each chunk holds
+the raw type codes and five varint streams:
+
+    dx, dy   change in x/y from the previous mouse or click row of the chunk
+    sx, sy   string table ids of key and window_focus rows (-1 for None)
+    dt       change in timestamp from the previous row, in whole microseconds
+
+Values are zigzag mapped (0, -1, 1, -2, ... -> 0, 1, 2, 3, ...) so the small
+negative steps of a mouse path and of edited timestamps stay one byte. The
+sections are concatenated and passed through the chunk's compressor.
+
+Chunk layout (little endian):
+
+    header   row count u32, section byte lengths 6 x u32 (codes, dx, dy, sx, sy, dt),
+             stored length u32, compressor u8, 7 pad bytes, first timestamp i64 (us)
+    data     the sections, compressed as a whole by the compressor
+
+Timestamps are rounded to a microsecond, far below what the input hooks
+resolve. Encoding and decoding are vectorized with NumPy.
+"""
+import lzma
+import struct
+import zlib
+
+CHUNK_HEADER = struct.Struct("<7IIB7xq")
+CHUNK_ROWS = 65536
+COMPRESSORS = {'none': 0, 'zlib': 1, 'lzma': 2}
+ZLIB_LEVEL = 1  # Within ~15% of level 6 on varint columns at about 3x the speed
+LZMA_PRESET = 6
+POSITION_CODES = (0, 1, 2, 3)  # MacroTrack codes of mouse, left/right/middle click
+
+
+def zigzag_varints(values):
+    """Encode an int64 array as zigzag LEB128 varints; returns bytes"""
+    import numpy as np
+    values = np.asarray(values, dtype=np.int64)
+    if not len(values):
+        return b""
+    zigzag = (values.astype(np.uint64) << np.uint64(1)) ^ (values >> 63).astype(np.uint64)
+    lengths = np.ones(len(zigzag), dtype=np.int64)
+    for bits in range(7, 64, 7):
+        lengths += zigzag >= np.uint64(1 << bits)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    out = np.empty(int(ends[-1]), dtype=np.uint8)
+    for k in range(int(lengths.max())):
+        rows = np.nonzero(lengths > k)[0]
+        group = (zigzag[rows] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (lengths[rows] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[rows] + k] = (group | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def read_zigzag_varints(data, count):
+    """Decode count zigzag varints from bytes; returns an int64 array"""
+    import numpy as np
+    if not count:
+        return np.zeros(0, dtype=np.int64)
+    raw = np.frombuffer(data, dtype=np.uint8)
+    last = raw < 0x80  # The final byte of every value
+    if int(last.sum()) != count or not last[-1]:
+        raise ValueError("Corrupt varint section")
+    starts = np.empty(count, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = np.nonzero(last)[0][:-1] + 1
+    value_of = np.cumsum(last) - last  # Which value each byte belongs to
+    shifts = (np.arange(len(raw)) - starts[value_of]) * 7
+    groups = (raw & 0x7F).astype(np.uint64) << shifts.astype(np.uint64)
+    zigzag = np.add.reduceat(groups, starts)  # The 7-bit groups never overlap, so adding is or-ing
+    return (zigzag >> np.uint64(1)).astype(np.int64) ^ -(zigzag & np.uint64(1)).astype(np.int64)
+
+
+def positional_rows(codes):
+    """Boolean mask of the mouse and click rows (a table lookup, much cheaper than np.isin)"""
+    import numpy as np
+    table = np.zeros(256, dtype=bool)
+    table[list(POSITION_CODES)] = True
+    return table[codes]
+
+
+def encode_chunk(codes, xs, ys, times, compressor='zlib', level=None):
+    """Encode NumPy columns of one chunk (times in seconds); returns the chunk bytes"""
+    import numpy as np
+    micros = np.rint(np.asarray(times, dtype=np.float64) * 1e6).astype(np.int64)
+    positional = positional_rows(codes)
+    px, py = xs[positional].astype(np.int64), ys[positional].astype(np.int64)
+    sections = [
+        np.asarray(codes, dtype=np.uint8).tobytes(),
+        zigzag_varints(np.diff(px, prepend=0)),
+        zigzag_varints(np.diff(py, prepend=0)),
+        zigzag_varints(xs[~positional]),
+        zigzag_varints(ys[~positional]),
+        zigzag_varints(np.diff(micros, prepend=micros[0] if len(micros) else 0)),
+    ]
+    data = b"".join(sections)
+    method = COMPRESSORS[compressor]
+    if method == 1:
+        data = zlib.compress(data, ZLIB_LEVEL if level is None else level)
+    elif method == 2:
+        data = lzma.compress(data, preset=LZMA_PRESET if level is None else level)
+    first = int(micros[0]) if len(micros) else 0
+    return CHUNK_HEADER.pack(len(codes), *map(len, sections), len(data), method, first) + data
+
+
+def decode_chunk(header, data):
+    """Columns (codes, xs, ys, times) of a chunk from its unpacked header and stored bytes"""
+    import numpy as np
+    count, *lengths, stored, method, first = header
+    try:
+        if method == 1:
+            data = zlib.decompress(data)
+        elif method == 2:
+            data = lzma.decompress(data)
+    except (zlib.error, lzma.LZMAError) as e:
+        raise ValueError(f"Corrupt chunk: {e}") from e
+    if len(data) != sum(lengths) or lengths[0] != count:
+        raise ValueError("Corrupt chunk")
+    sections = []
+    offset = 0
+    for length in lengths:
+        sections.append(data[offset:offset + length])
+        offset += length
+    codes = np.frombuffer(sections[0], dtype=np.uint8)
+    positional = positional_rows(codes)
+    position_count = int(positional.sum())
+    xs = np.empty(count, dtype=np.int32)
+    ys = np.empty(count, dtype=np.int32)
+    xs[positional] = np.cumsum(read_zigzag_varints(sections[1], position_count))
+    ys[positional] = np.cumsum(read_zigzag_varints(sections[2], position_count))
+    xs[~positional] = read_zigzag_varints(sections[3], count - position_count)
+    ys[~positional] = read_zigzag_varints(sections[4], count - position_count)
+    times = (np.cumsum(read_zigzag_varints(sections[5], count)) + first) / 1e6
+    return codes, xs, ys, times
+
+
+def write_chunks(f, track, compressor='zlib', level=None, chunk_rows=CHUNK_ROWS):
+    """Write a MacroTrack as encoded chunks to an open binary file; returns the chunk count"""
+    codes, xs, ys, times = track.as_numpy()
+    chunks = 0
+    for start in range(0, len(track), chunk_rows):
+        stop = start + chunk_rows
+        f.write(encode_chunk(codes[start:stop], xs[start:stop], ys[start:stop], times[start:stop],
+                             compressor, level))
+        chunks += 1
+    return chunks
+
+
+def read_chunks(f, end):
+    """Decode the chunks from the file position up to offset end one at a time, yielding their columns"""
+    while f.tell() < end:
+        head = f.read(CHUNK_HEADER.size)
+        if len(head) < CHUNK_HEADER.size:
+            raise ValueError("Corrupt chunk: cut short")
+        header = CHUNK_HEADER.unpack(head)
+        data = f.read(header[7])
+        if len(data) < header[7] or f.tell() > end:
+            raise ValueError("Corrupt chunk: cut short")
+        yield decode_chunk(header, data)
@@ -0,0 +1,148 @@
+"""Append-only autosave journal for the macro cache.
+
+Instead of rewriting the whole cache after every change, each mutation of the
+attached MacroTrack is queued as one JSON line and sync() appends the queued
+lines to the journal file. When the journal grows past the size of the last
+snapshot it is rotated and a background thread writes a fresh snapshot.
+
+Every journal entry carries a sequence number and the snapshot stores the last
+sequence it contains, so recovery is: load the snapshot, then replay the rotated
+and current journals skipping anything the snapshot already covers.
+"""
+import collections
+import itertools
+import json
+import os
+import threading
+
+from Scripts.Macro.MacroTrack import MacroTrack
+
+
+class MacroJournal:
+    def __init__(self, cache_file, min_compact_bytes=1 << 20):
+        self.cache_file = cache_file
+        self.journal_file = os.path.splitext(cache_file)[0] + ".journal"
+        self.rotated_file = self.journal_file + ".old"
+        self.min_compact_bytes = min_compact_bytes
+        self.track = None
+        self.pending = collections.deque()  # Appended from hook threads while recording
+        self.seq = itertools.count(1)
+        self.last_seq = 0
+        self.journal_bytes = 0
+        self.snapshot_bytes = 0
+        self.compactor = None
+        self.lock = threading.Lock()  # Journal files
+        # Held by the attached track around each mutation and its record() call, and here while
+        # the snapshot is copied, so the copy and last_seq always describe the same state
+        self.track_lock = threading.RLock()
+
+    def record(self, op, *args):
+        """Queue one mutation; called by the attached MacroTrack"""
+        seq = next(self.seq)
+        self.pending.append([seq, op, *args])
+        self.last_seq = seq
+
+    def attach(self, track):
+        """Start journaling a (new) track, snapshotting its current contents"""
+        if self.track is not None and self.track is not track:
+            self.track.journal = None
+        self.pending.clear()
+        self.track = track
+        track.journal = self
+        self.wait()
+        if os.path.exists(self.rotated_file):
+            os.remove(self.rotated_file)
+        with self.track_lock:
+            actions, seq = track.to_list(), self.last_seq
+        self._write_snapshot(actions, seq)
+        with open(self.journal_file, "w"):
+            pass
+        self.journal_bytes = 0
+
+    def sync(self):
+        """Append queued mutations to the journal; compacts in the background when it grows"""
+        if not self.pending:
+            return
+        lines = []
+        while self.pending:
+            lines.append(json.dumps(self.pending.popleft()) + "\n")
+        data = "".join(lines)
+        with self.lock:
+            with open(self.journal_file, "a") as f:
+                f.write(data)
+            self.journal_bytes += len(data)
+        if self.journal_bytes > max(self.min_compact_bytes, self.snapshot_bytes):
+            self.compact()
+
+    def compact(self):
+        if self.track is None or (self.compactor and self.compactor.is_alive()):
+            return
+        self.sync()
+        with self.lock:
+            # Rotate so new entries land in a fresh journal while the snapshot is written
+            os.replace(self.journal_file, self.rotated_file)
+            open(self.journal_file, "w").close()
+            self.journal_bytes = 0
+        with self.track_lock:
+            snapshot, seq = self.track.copy(), self.last_seq
+        self.compactor = threading.Thread(target=self._compact_thread, args=(snapshot, seq), daemon=True)
+        self.compactor.start()
+
+    def _compact_thread(self, snapshot, seq):
+        self._write_snapshot(snapshot.to_list(), seq)
+        with self.lock:
+            if os.path.exists(self.rotated_file):
+                os.remove(self.rotated_file)
+
+    def wait(self):
+        """Block until a running compaction has finished"""
+        if self.compactor:
+            self.compactor.join()
+            self.compactor = None
+
+    def _write_snapshot(self, actions, seq):
+        temp_file = self.cache_file + ".tmp"
+        with open(temp_file, "w") as f:
+            json.dump({'seq': seq, 'actions': actions}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.cache_file)
+        self.snapshot_bytes = os.path.getsize(self.cache_file)
+
+    def recover(self):
+        """Rebuild the cached macro from the snapshot and any journal entries after it"""
+        actions, seq = [], 0
+        if os.path.exists(self.cache_file):
+            with open(self.cache_file, "r") as f:
+                data = json.load(f)
+            if isinstance(data, list):  # Cache written before the journal existed
+                actions = data
+            else:
+                actions, seq = data['actions'], data['seq']
+        track = MacroTrack(actions)
+        for path in (self.rotated_file, self.journal_file):
+            if os.path.exists(path):
+                seq = self._replay(path, track, seq)
+        self.seq = itertools.count(seq + 1)
+        self.last_seq = seq
+        return track
+
+    def _replay(self, path, track, seq):
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Torn write at the end of the file
+                if entry[0] <= seq:
+                    continue
+                seq, op, args = entry[0], entry[1], entry[2:]
+                if op == 'append':
+                    track.append(args[0])
+                elif op == 'insert':
+                    track.insert(args[0], args[1])
+                elif op == 'set':
+                    track[args[0]] = args[1]
+                elif op == 'delete':
+                    del track[args[0]:args[1]]
+        return seq
@@ -0,0 +1,330 @@
+"""Reading and writing .MacroScript files.
+
+Four formats are understood (plus the chunked stream files that recordings
+can be written to directly, see MacroStream):
+
+* v2 binary: a fixed header, a section of fixed-width records and a string
+  table. The file can be memory-mapped and records decoded on demand, so large
+  recordings open without parsing everything up front. save() writes it when
+  given no compression, and so do `Cli record` and `Cli convert` by default.
+* v3 compressed: the v2 header and string table around chunks of delta-encoded
+  varint columns, optionally zlib or lzma compressed (see DeltaCodec). save()
+  writes it when given a compression; the GUI's Save uses zlib (see
+  MacroRecorder.save_compression). Decoded a chunk at a time.
+* v1 JSON: {"version": 1, "timestamp": ..., "actions": [[type, a, b, t], ...]}
+* legacy CSV: one "type,a,b,t" line per action.
+
+v2 layout (little endian):
+
+    header   magic "EZMS", version u16, flags u16, record count u64,
+             string count u64, duration f64, saved-at f64,
+             records offset u64, strings offset u64
+    records  code u8, 3 pad bytes, x i32, y i32, timestamp f64   (20 bytes each)
+    strings  length u32 + UTF-8 bytes, repeated
+
+Record codes are MacroTrack action codes. For key and window_focus records
+x/y are string table ids (-1 for None), exactly like MacroTrack's columns.
+
+v3 has the same header with version 3 and the compressor id in flags; the
+records section holds DeltaCodec chunks up to the strings offset.
+"""
+import json
+import mmap
+import struct
+import sys
+import time
+from array import array
+
+from Scripts.Macro.MacroTrack import MacroTrack, decode_action
+
+MAGIC = b"EZMS"
+STREAM_MAGIC = b"EZMC"  # MacroStream.MAGIC, kept here so detecting it needs no import
+VERSION = 2
+COMPRESSED_VERSION = 3
+HEADER = struct.Struct("<4sHHQQddQQ")
+RECORD = struct.Struct("<B3xiid")
+STRING_LENGTH = struct.Struct("<I")
+NUMPY_MIN_RECORDS = 100_000  # Smaller files are decoded without importing NumPy
+
+
+def _record_dtype():
+    import numpy as np
+    return np.dtype({'names': ['code', 'x', 'y', 't'],
+                     'formats': [np.uint8, '<i4', '<i4', '<f8'],
+                     'offsets': [0, 4, 8, 12],
+                     'itemsize': RECORD.size})
+
+
+def detect_format(file_path):
+    """Return 'v2', 'v3', 'stream', 'json' or 'legacy' from the first bytes of a file"""
+    with open(file_path, "rb") as f:
+        head = f.read(len(MAGIC))
+        if head == MAGIC:
+            version = f.read(2)
+            return 'v3' if version == struct.pack("<H", COMPRESSED_VERSION) else 'v2'
+        if head == STREAM_MAGIC:
+            return 'stream'
+        while head[:1].isspace():
+            head = head[1:] + f.read(1)
+        return 'json' if head[:1] == b"{" else 'legacy'
+
+
+def save(file_path, actions, timestamp=None, compression=None):
+    """Write actions (any sequence of action tuples, or a MacroTrack) as v2.
+
+    compression 'none', 'zlib' or 'lzma' writes v3 instead: delta-encoded varint
+    chunks, passed through that compressor."""
+    track = MacroTrack.from_actions(actions)
+    count = len(track)
+    duration = track.times[-1] - track.times[0] if count else 0.0
+    version, flags = VERSION, 0
+    with open(file_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)  # Filled in once the offsets are known
+        records_offset = f.tell()
+        if compression is None:
+            _write_records(f, track)
+        else:
+            from Scripts.FileHandler import DeltaCodec
+            version, flags = COMPRESSED_VERSION, DeltaCodec.COMPRESSORS[compression]
+            DeltaCodec.write_chunks(f, track, compression)
+        strings_offset = f.tell()
+        for string in track.strings:
+            data = string.encode("utf-8")
+            f.write(STRING_LENGTH.pack(len(data)))
+            f.write(data)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, version, flags, count, len(track.strings), duration,
+                            time.time() if timestamp is None else timestamp,
+                            records_offset, strings_offset))
+
+
+def _write_records(f, track):
+    try:
+        import numpy as np
+    except ImportError:
+        pack = RECORD.pack
+        for code, x, y, t in zip(track.codes, track.xs, track.ys, track.times):
+            f.write(pack(code, x, y, t))
+        return
+    codes, xs, ys, times = track.as_numpy()
+    records = np.zeros(len(track), dtype=_record_dtype())
+    records['code'], records['x'], records['y'], records['t'] = codes, xs, ys, times
+    f.write(records.tobytes())
+
+
+class MappedMacro:
+    """A v2 file opened through mmap.
+
+    Only the header and string table are read on open; records are decoded when
+    they are indexed or iterated. Use to_track() to get an editable MacroTrack."""
+
+    def __init__(self, file_path):
+        self.file = open(file_path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self.file.close()
+            raise ValueError(f"Not a v2 macro file: {file_path}")
+        if len(self.map) < HEADER.size:
+            self.close()
+            raise ValueError(f"Not a v2 macro file: {file_path}")
+        (magic, self.version, self.flags, self.count, string_count, self.duration,
+         self.saved_at, self.records_offset, strings_offset) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or self.version != VERSION:
+            self.close()
+            raise ValueError(f"Not a v2 macro file: {file_path}")
+
+        self.strings = []
+        offset = strings_offset
+        try:
+            if self.records_offset + self.count * RECORD.size > strings_offset:
+                raise ValueError("records overrun the string table")
+            for _ in range(string_count):
+                (length,) = STRING_LENGTH.unpack_from(self.map, offset)
+                offset += STRING_LENGTH.size
+                if offset + length > len(self.map):
+                    raise ValueError("cut short")
+                self.strings.append(self.map[offset:offset + length].decode("utf-8"))
+                offset += length
+        except (ValueError, struct.error) as e:  # UnicodeDecodeError is a ValueError
+            self.close()
+            raise ValueError(f"Corrupt v2 macro file: {file_path} ({e})") from e
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        """Raw (code, x, y, timestamp) of one record"""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("MappedMacro index out of range")
+        return RECORD.unpack_from(self.map, self.records_offset + index * RECORD.size)
+
+    def __getitem__(self, index):
+        return self._decode(*self.record(index))
+
+    def __iter__(self):
+        end = self.records_offset + self.count * RECORD.size
+        view = memoryview(self.map)[self.records_offset:end]
+        try:
+            for record in RECORD.iter_unpack(view):
+                yield self._decode(*record)
+        finally:
+            view.release()
+
+    def _decode(self, code, x, y, t):
+        return decode_action(code, x, y, t, self.strings)
+
+    def to_track(self, base_time=0.0):
+        """Decode every record into a MacroTrack, shifting timestamps by base_time"""
+        track = MacroTrack()
+        track.strings = list(self.strings)
+        track.string_ids = {string: i for i, string in enumerate(track.strings)}
+        end = self.records_offset + self.count * RECORD.size
+        try:
+            # Importing NumPy costs ~100 ms, more than unpacking a small file record by record
+            if self.count < NUMPY_MIN_RECORDS and 'numpy' not in sys.modules:
+                raise ImportError
+            import numpy as np
+        except ImportError:
+            for code, x, y, t in RECORD.iter_unpack(self.map[self.records_offset:end]):
+                track.codes.append(code)
+                track.xs.append(x)
+                track.ys.append(y)
+                track.times.append(t + base_time)
+            return track
+        records = np.frombuffer(self.map, dtype=_record_dtype(), count=self.count, offset=self.records_offset)
+        track.codes = array('B', records['code'].tobytes())
+        track.xs = array('i', records['x'].astype(np.int32).tobytes())
+        track.ys = array('i', records['y'].astype(np.int32).tobytes())
+        track.times = array('d', (records['t'] + base_time).tobytes())
+        del records  # Release the buffer export before the map can be closed
+        return track
+
+
+def open_mapped(file_path):
+    return MappedMacro(file_path)
+
+
+def _read_exact(f, size, file_path):
+    data = f.read(size)
+    if len(data) < size:
+        raise ValueError(f"Corrupt v3 macro file: {file_path} (cut short)")
+    return data
+
+
+def load_compressed(file_path, base_time=0.0):
+    """Read a v3 file, decoding one chunk at a time into a MacroTrack"""
+    from Scripts.FileHandler import DeltaCodec
+    track = MacroTrack()
+    with open(file_path, "rb") as f:
+        head = f.read(HEADER.size)
+        if len(head) < HEADER.size:
+            raise ValueError(f"Not a v3 macro file: {file_path}")
+        (magic, version, _, count, string_count, _, _,
+         records_offset, strings_offset) = HEADER.unpack(head)
+        if magic != MAGIC or version != COMPRESSED_VERSION:
+            raise ValueError(f"Not a v3 macro file: {file_path}")
+        f.seek(strings_offset)
+        for _ in range(string_count):
+            (length,) = STRING_LENGTH.unpack(_read_exact(f, STRING_LENGTH.size, file_path))
+            track.intern(_read_exact(f, length, file_path).decode("utf-8"))
+        f.seek(records_offset)
+        try:
+            for codes, xs, ys, times in DeltaCodec.read_chunks(f, strings_offset):
+                track.codes.frombytes(codes.tobytes())
+                track.xs.frombytes(xs.tobytes())
+                track.ys.frombytes(ys.tobytes())
+                track.times.frombytes((times + base_time).tobytes())
+        except ValueError as e:
+            raise ValueError(f"Corrupt v3 macro file: {file_path} ({e})") from e
+    if len(track) != count:
+        raise ValueError(f"Corrupt v3 macro file: {file_path}")
+    return track
+
+
+def load_json(file_path, base_time=0.0):
+    """Read a v1 JSON file; returns None if it is not a v1 document"""
+    with open(file_path, "r") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get('version') != 1:
+        return None
+    track = MacroTrack()
+    for action in data['actions']:
+        if action[0] == 'window_focus':
+            track.append(('window_focus', action[1], None, base_time + float(action[3])))
+        elif action[0] in ('mouse', 'left_click', 'right_click', 'middle_click'):
+            track.append((action[0], int(action[1]), int(action[2]), base_time + float(action[3])))
+        elif action[0] == 'key':
+            track.append(('key', action[1], action[2], base_time + float(action[3])))
+    return track
+
+
+def load_legacy(file_path, base_time=0.0):
+    """Read the old one-action-per-line CSV format"""
+    track = MacroTrack()
+    with open(file_path, "r") as f:
+        for line in f:
+            parts = line.strip().split(',')
+            if parts[0] == 'window_focus':
+                # Titles may contain commas, the type and timestamp never do
+                track.append(('window_focus', ','.join(parts[1:-2]), None, base_time + float(parts[-1])))
+            elif parts[0] in ('mouse', 'left_click', 'right_click', 'middle_click'):
+                track.append((parts[0], int(parts[1]), int(parts[2]), base_time + float(parts[3])))
+            elif parts[0] == 'key':
+                track.append(('key', parts[1], parts[2], base_time + float(parts[3])))
+    return track
+
+
+def load(file_path, base_time=0.0):
+    """Load any supported format into a MacroTrack. Returns (track, format)."""
+    file_format = detect_format(file_path)
+    if file_format == 'v2':
+        with open_mapped(file_path) as mapped:
+            return mapped.to_track(base_time), file_format
+    if file_format == 'v3':
+        return load_compressed(file_path, base_time), file_format
+    if file_format == 'stream':
+        from Scripts.FileHandler.MacroStream import open_stream
+        with open_stream(file_path) as reader:
+            return reader.to_track(base_time), file_format
+    if file_format == 'json':
+        try:
+            track = load_json(file_path, base_time)
+        except json.JSONDecodeError:
+            track = None
+        if track is not None:
+            return track, file_format
+    return load_legacy(file_path, base_time), 'legacy'
+
+
+def convert(source_path, dest_path, compression=None):
+    """Rewrite a v1 JSON, legacy CSV or stream file (or a v2/v3 file) as v2, or v3 with compression"""
+    track, file_format = load(source_path)
+    if len(track):
+        base = track.times[0]
+        track.times = array('d', (t - base for t in track.times))
+    save(dest_path, track, compression=compression)
+    return file_format, len(track)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("usage: python -m Scripts.FileHandler.MacroScript SOURCE DEST [zlib|lzma|none]")
+        sys.exit(2)
+    compression = sys.argv[3] if len(sys.argv) == 4 else None
+    source_format, count = convert(sys.argv[1], sys.argv[2], compression)
+    print(f"Converted {count} actions from {source_format} to {'v2' if compression is None else 'v3'}: {sys.argv[2]}")
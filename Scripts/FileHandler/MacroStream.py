@@ -0,0 +1,278 @@
+"""Chunked macro files written while recording.
+
+A stream file is appended to chunk by chunk as the recording goes, so memory
+stays bounded by one chunk however long the session runs, and a crash loses at
+most the last sync interval. The records are the v2 records from MacroScript;
+string ids are global to the file and every chunk carries the strings that
+were first used in it.
+
+Layout (little endian):
+
+    header   magic "EZMC", version u16, flags u16, created-at f64
+    chunk    record count u32, new string count u32, payload bytes u32,
+             payload crc32 u32, first timestamp f64, last timestamp f64
+    payload  records (MacroScript.RECORD, 20 bytes each), then the new
+             strings as length u32 + UTF-8 bytes
+
+Chunks repeat until the end of the file. A reader stops at a chunk that is cut
+short or whose checksum does not match, which is what a crash mid-write leaves.
+"""
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from array import array
+
+from Scripts.FileHandler.MacroScript import RECORD, STREAM_MAGIC, STRING_LENGTH
+from Scripts.Macro.MacroTrack import MacroTrack, decode_action
+
+MAGIC = STREAM_MAGIC
+VERSION = 1
+HEADER = struct.Struct("<4sHHd")
+CHUNK = struct.Struct("<IIIIdd")
+CHUNK_RECORDS = 4096  # Records per chunk: 80 KB of payload
+
+
+class StreamWriter:
+    """Appends actions to a stream file a chunk at a time.
+
+    It takes the place of the macro list while recording (append and extend),
+    keeping only the chunk being filled in memory. A chunk is written once it is
+    full, and every sync_interval seconds whatever is pending is written and
+    fsynced, so a crash loses at most that much of the recording."""
+
+    def __init__(self, file_path, chunk_records=CHUNK_RECORDS, sync_interval=1.0, clock=time.monotonic):
+        self.file_path = file_path
+        self.chunk_records = chunk_records
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self.file = open(file_path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, time.time()))
+        self.pending = MacroTrack()  # The chunk being filled; its string table spans the whole file
+        self.strings_written = 0
+        self.count = 0  # Actions written to the file so far
+        self.chunks = 0
+        self.bytes_written = HEADER.size
+        self.last_sync = clock()
+
+    def __len__(self):
+        return self.count + len(self.pending)
+
+    def append(self, action):
+        self.pending.append(action)
+        self._after_append()
+
+    def extend(self, actions):
+        pending, size = self.pending, self.chunk_records
+        actions = list(actions)
+        start = 0
+        while len(actions) - start > size - len(pending):
+            stop = start + size - len(pending)
+            pending.extend(actions[start:stop])
+            self.write_chunk()
+            start = stop
+        pending.extend(actions[start:] if start else actions)
+        self._after_append()
+
+    def _after_append(self):
+        if len(self.pending) >= self.chunk_records:
+            self.write_chunk()
+        if self.clock() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def write_chunk(self):
+        """Write the pending actions as one chunk (buffered, not yet fsynced)"""
+        pending = self.pending
+        count = len(pending)
+        if not count:
+            return
+        strings = pending.strings[self.strings_written:]
+        parts = list(map(RECORD.pack, pending.codes, pending.xs, pending.ys, pending.times))
+        for string in strings:
+            data = string.encode("utf-8")
+            parts.append(STRING_LENGTH.pack(len(data)))
+            parts.append(data)
+        payload = b"".join(parts)
+        self.file.write(CHUNK.pack(count, len(strings), len(payload), zlib.crc32(payload),
+                                   pending.times[0], pending.times[-1]))
+        self.file.write(payload)
+        self.bytes_written += CHUNK.size + len(payload)
+        self.strings_written += len(strings)
+        self.count += count
+        self.chunks += 1
+        # Start the next chunk empty but keep interning into the same string table
+        pending.codes, pending.xs, pending.ys, pending.times = array('B'), array('i'), array('i'), array('d')
+
+    def sync(self):
+        """Write whatever is pending and fsync, so it survives a crash"""
+        self.write_chunk()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.last_sync = self.clock()
+
+    def close(self):
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamReader:
+    """Reads a stream file chunk by chunk.
+
+    Opening reads the chunk headers and string tables only; records are read
+    and decoded one chunk at a time by read_chunk(), chunks() or prefetched(),
+    so playing a file never holds more than a few chunks."""
+
+    def __init__(self, file_path):
+        self.file = open(file_path, "rb")
+        head = self.file.read(HEADER.size)
+        if len(head) < HEADER.size:
+            self.file.close()
+            raise ValueError(f"Not a macro stream file: {file_path}")
+        magic, self.version, self.flags, self.created_at = HEADER.unpack(head)
+        if magic != MAGIC or self.version != VERSION:
+            self.file.close()
+            raise ValueError(f"Not a macro stream file: {file_path}")
+        self.index = []  # (payload offset, record count, first timestamp, last timestamp) per chunk
+        self.strings = []
+        self.truncated = False  # True if the file ends in a torn chunk, which is ignored
+        self.lock = threading.Lock()  # The prefetch thread and read_chunk share the file position
+        self._scan(os.fstat(self.file.fileno()).st_size)
+        self.count = sum(entry[1] for entry in self.index)
+
+    def _scan(self, file_size):
+        f = self.file
+        offset = HEADER.size
+        while offset + CHUNK.size <= file_size:
+            f.seek(offset)
+            count, string_count, payload_bytes, crc, first, last = CHUNK.unpack(f.read(CHUNK.size))
+            payload_offset = offset + CHUNK.size
+            records_bytes = count * RECORD.size
+            if payload_offset + payload_bytes > file_size or records_bytes > payload_bytes:
+                break
+            f.seek(payload_offset + records_bytes)
+            strings = f.read(payload_bytes - records_bytes)
+            if payload_offset + payload_bytes + CHUNK.size > file_size:
+                # Only the last chunk can be torn, so only its records are checked here
+                f.seek(payload_offset)
+                if zlib.crc32(f.read(records_bytes) + strings) != crc:
+                    break
+            position = 0
+            for _ in range(string_count):
+                (length,) = STRING_LENGTH.unpack_from(strings, position)
+                position += STRING_LENGTH.size
+                self.strings.append(strings[position:position + length].decode("utf-8"))
+                position += length
+            self.index.append((payload_offset, count, first, last))
+            offset = payload_offset + payload_bytes
+        self.truncated = offset != file_size
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def timeline(self):
+        """(first, last) timestamp of the whole file, None if it is empty"""
+        if not self.index:
+            return None
+        return self.index[0][2], self.index[-1][3]
+
+    def read_chunk(self, number):
+        """Actions of one chunk as a list of tuples"""
+        payload_offset, count, _, _ = self.index[number]
+        with self.lock:
+            self.file.seek(payload_offset)
+            data = self.file.read(count * RECORD.size)
+        strings = self.strings
+        return [decode_action(code, x, y, t, strings) for code, x, y, t in RECORD.iter_unpack(data)]
+
+    def chunks(self):
+        for number in range(len(self.index)):
+            yield self.read_chunk(number)
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield from chunk
+
+    def prefetched(self, transform=None, depth=2):
+        """Chunks in order, read (and passed through transform) on a background thread.
+
+        At most depth chunks wait in the queue, so memory stays flat. Closing the
+        generator early stops the thread."""
+        chunks = queue.Queue(maxsize=depth)
+        stopped = threading.Event()
+        done = object()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def produce():
+            try:
+                for number in range(len(self.index)):
+                    if stopped.is_set():
+                        return
+                    chunk = self.read_chunk(number)
+                    put(transform(chunk) if transform is not None else chunk)
+            except Exception as e:
+                put(e)
+                return
+            put(done)
+
+        thread = threading.Thread(target=produce, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+            thread.join()
+
+    def to_track(self, base_time=0.0):
+        """Read the whole file into a MacroTrack.
+
+        Stream timestamps are the recording clock's, so they are made relative
+        to the first record, as a saved macro's are, before base_time is added."""
+        base_time -= self.index[0][2] if self.index else 0.0
+        track = MacroTrack()
+        track.strings = list(self.strings)
+        track.string_ids = {string: i for i, string in enumerate(track.strings)}
+        for payload_offset, count, _, _ in self.index:
+            with self.lock:
+                self.file.seek(payload_offset)
+                data = self.file.read(count * RECORD.size)
+            for code, x, y, t in RECORD.iter_unpack(data):
+                track.codes.append(code)
+                track.xs.append(x)
+                track.ys.append(y)
+                track.times.append(t + base_time)
+        return track
+
+
+def open_stream(file_path):
+    return StreamReader(file_path)
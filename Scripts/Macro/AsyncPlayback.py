@@ -0,0 +1,246 @@
+import asyncio
+import bisect
+import time
+from array import array
+
+from Scripts.Macro.Compiler import compile_macro
+from Scripts.Macro.PlaybackManager import OutputArbiter
+from Scripts.Macro.Trace import summary
+
+
+class PlaybackEvent:
+    """What an AsyncPlaybackEngine tells its listeners.
+
+    kind is 'started', 'progress', 'paused', 'resumed', 'finished',
+    'cancelled' or 'error'; played counts the actions run so far and total is
+    the number the task will play (None when it loops until cancelled). error
+    is the exception that ended the task for an 'error' event, None otherwise."""
+
+    __slots__ = ('kind', 'task', 'played', 'total', 'error')
+
+    def __init__(self, kind, task):
+        self.kind = kind
+        self.task = task
+        self.played = task.played
+        self.total = task.total
+        self.error = task.error
+
+    def __repr__(self):
+        return f"PlaybackEvent({self.kind!r}, {self.task.name!r}, {self.played}/{self.total})"
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class MacroTask:
+    """One macro playing on an AsyncPlaybackEngine. Await it for True (finished) or False (cancelled).
+
+    state is 'playing', 'paused', 'finished', 'cancelled' or 'failed'; a failed
+    task keeps the backend's exception in error and awaiting it raises that
+    exception. pause(), resume()
+    and cancel() are coroutines for the engine's loop; they take effect at once
+    because a waiting task is parked on a future they can resolve. cancel()
+    returns once the task has ended."""
+
+    def __init__(self, engine, name, loops, priority):
+        self.engine = engine
+        self.name = name
+        self.loops = loops
+        self.priority = priority  # For the OutputArbiter
+        self.state = 'playing'
+        self.steps = []
+        self.duration = 0
+        self.first = 0
+        self.origin = 0
+        self.paused_at = 0
+        self.played = 0
+        self.total = None
+        self.lateness = array('q')  # ns past the deadline, per action played
+        self.waiter = None  # Future of the deadline being waited for
+        self.resumed = None  # Future a paused task waits on
+        self.task = None  # The asyncio.Task running engine.run_task(self)
+        self.error = None
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    async def wait(self):
+        try:
+            return await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if self.task.cancelled():
+                return False  # Cancelled before its first step
+            raise
+
+    async def pause(self):
+        if self.state == 'playing':
+            self.state = 'paused'
+            self.paused_at = self.engine.clock()
+            self.resumed = asyncio.get_running_loop().create_future()
+            self.engine.arbiter.release(self)
+            if self.waiter is not None:
+                _wake(self.waiter)
+            self.engine.emit('paused', self)
+
+    async def resume(self):
+        if self.state == 'paused':
+            self.state = 'playing'
+            self.origin += self.engine.clock() - self.paused_at  # The timeline waits for us
+            _wake(self.resumed)
+            self.resumed = None
+            self.engine.emit('resumed', self)
+
+    async def cancel(self):
+        if not self.task.done():
+            self.task.cancel()
+        elif self.state == 'failed':
+            return False  # Already over; its error went to the listeners and to whoever awaits it
+        return await self.wait()
+
+    def stats(self):
+        """Lateness of the actions played so far, in milliseconds"""
+        return summary(self.lateness)
+
+
+class AsyncPlaybackEngine:
+    """Plays macros as asyncio tasks on one event loop.
+
+    Each macro is a MacroTask whose deadlines come from one origin like
+    MacroPlayer's. A task waits for its next action on a loop timer, so any
+    number of macros share the loop and cost nothing while they wait; spin_ns
+    ends each wait with a short spin for timing closer than the loop timer's
+    (which blocks the other tasks for that long). A task that is behind still
+    yields at least every tick_ns, so cancel() and pause() never wait longer
+    than that. Output goes through an OutputArbiter, as in PlaybackManager.
+
+    Listeners get a PlaybackEvent on the loop when a task starts, pauses,
+    resumes, finishes, is cancelled or fails, and a 'progress' event at most
+    every progress_interval seconds while it plays. A task fails when a
+    backend call raises; its held keys are let go as for a cancel."""
+
+    def __init__(self, backend, speed=1.0, spin_ns=0, tick_ns=1_000_000, progress_interval=0.1,
+                 clock=time.perf_counter_ns):
+        self.arbiter = OutputArbiter(backend)
+        self.speed = speed
+        self.spin_ns = spin_ns
+        self.tick_ns = tick_ns
+        self.progress_ns = int(progress_interval * 1e9)
+        self.clock = clock
+        self.tasks = []
+        self.listeners = []
+        self.played = 0  # Actions of tasks that have ended
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def emit(self, kind, task):
+        if self.listeners:
+            event = PlaybackEvent(kind, task)
+            for callback in self.listeners:
+                callback(event)
+
+    def start(self, actions, loops=1, name=None, timeline=None, start_time=None, speed=1.0, priority=0):
+        """Start playing actions on the running loop; returns their MacroTask.
+
+        loops=None repeats until cancelled. timeline and start_time work as in
+        MacroPlayer.play."""
+        task = MacroTask(self, name or f"macro {len(self.tasks) + 1}", loops, priority)
+        program = compile_macro(actions, self.arbiter.backend_for(task), timeline)
+        scale = speed * self.speed
+        offsets = program.offsets if scale == 1 else [int(offset / scale) for offset in program.offsets]
+        task.steps = list(zip(offsets, program.calls, program.args))
+        task.duration = int(program.duration_ns / scale)
+        if loops is None and not task.duration:
+            task.loops = 1  # Repeating a zero-length macro forever would never yield
+        if start_time is not None and len(actions):
+            first_action_time = timeline[0] if timeline else actions[0][3]
+            start_ns = max(0, int(round((start_time - first_action_time) * 1e9)))
+            task.first = bisect.bisect_left(program.offsets, start_ns)
+            task.origin = -int(start_ns / scale)  # Added to the clock when the task starts
+        if task.loops is not None:
+            task.total = len(task.steps) * task.loops - task.first
+        self.tasks.append(task)
+        task.task = asyncio.get_running_loop().create_task(self.run_task(task))
+        task.task.add_done_callback(lambda _: self.task_done(task))
+        return task
+
+    def task_done(self, task):
+        self.tasks.remove(task)
+        self.played += task.played
+        if task.task.cancelled():  # Cancelled before run_task got to its first step
+            task.state = 'cancelled'
+            self.arbiter.release(task)
+            self.emit('cancelled', task)
+        elif task.error is not None:
+            task.task.exception()  # Listeners got the 'error' event, so asyncio need not log it as unretrieved
+
+    async def play(self, actions, loops=1, **options):
+        """Play actions to the end; returns False if the task was cancelled, raises what a failed task raised"""
+        return await self.start(actions, loops, **options)
+
+    async def run_task(self, task):
+        clock, spin_ns, tick_ns = self.clock, self.spin_ns, self.tick_ns
+        loop = asyncio.get_running_loop()
+        record = task.lateness.append
+        steps, duration = task.steps, task.duration
+        task.origin += clock()
+        yielded = last_progress = clock()
+        self.emit('started', task)
+        try:
+            loop_index = 0
+            while task.loops is None or loop_index < task.loops:
+                for offset, call, args in (steps[task.first:] if loop_index == 0 and task.first else steps):
+                    while True:
+                        if task.resumed is not None:
+                            await task.resumed
+                            yielded = clock()
+                        deadline = task.origin + loop_index * duration + offset
+                        now = clock()
+                        if deadline - now > spin_ns:
+                            # Park on a future that the deadline timer, pause() or cancel() resolves
+                            waiter = task.waiter = loop.create_future()
+                            timer = loop.call_later((deadline - now - spin_ns) / 1e9, _wake, waiter)
+                            try:
+                                await waiter
+                            finally:
+                                timer.cancel()
+                                task.waiter = None
+                            yielded = clock()
+                        elif now - yielded >= tick_ns:
+                            await asyncio.sleep(0)  # Behind schedule: still let the loop run once per tick
+                            yielded = clock()
+                        else:
+                            break
+                    while clock() < deadline:
+                        pass
+                    record(clock() - deadline)
+                    call(*args)
+                    task.played += 1
+                    if now - last_progress >= self.progress_ns:
+                        last_progress = now
+                        self.emit('progress', task)
+                loop_index += 1
+        except asyncio.CancelledError:
+            task.state = 'cancelled'
+        except Exception as e:
+            task.state, task.error = 'failed', e
+        else:
+            task.state = 'finished'
+        finally:
+            self.arbiter.release(task)  # Lift held keys however the task ended
+        self.emit('error' if task.error is not None else task.state, task)
+        if task.error is not None:
+            raise task.error
+        return task.state == 'finished'
+
+    async def cancel_all(self):
+        for task in list(self.tasks):
+            await task.cancel()
+
+    def stats(self):
+        return {'tasks': len(self.tasks), 'played': self.played + sum(task.played for task in self.tasks)}
@@ -0,0 +1,56 @@
+class MoveCoalescer:
+    """Merges runs of mouse samples so playback issues at most one move per output frame.
+
+    Inside a run of 'mouse' actions only the last sample of each frame is kept,
+    and it is dropped as well if it is closer than min_distance pixels to the last
+    position sent. Any other action (clicks, keys, window focus) is a hard barrier:
+    the pending position is always flushed before it, so the cursor is exactly
+    where it was recorded when the barrier runs."""
+
+    def __init__(self, frame_rate=125, min_distance=2):
+        self.frame_rate = frame_rate
+        self.min_distance = min_distance
+        self.stats = {'moves_in': 0, 'moves_out': 0, 'saved_calls': 0}
+
+    def coalesce(self, macro):
+        out = []
+        moves_in = 0
+        pending = None
+        pending_frame = None
+        last_pos = None
+        min_distance_sq = self.min_distance * self.min_distance
+        frame_length = 1.0 / self.frame_rate if self.frame_rate else 0.0
+        first_time = macro[0][3] if len(macro) else 0.0
+
+        def far_enough(action):
+            if last_pos is None:
+                return True
+            dx, dy = action[1] - last_pos[0], action[2] - last_pos[1]
+            return dx * dx + dy * dy >= min_distance_sq
+
+        for action in macro:
+            if action[0] == 'mouse':
+                moves_in += 1
+                frame = int((action[3] - first_time) / frame_length) if frame_length else moves_in
+                if pending is not None and frame != pending_frame and far_enough(pending):
+                    out.append(pending)
+                    last_pos = (pending[1], pending[2])
+                pending, pending_frame = action, frame
+                continue
+
+            # Barrier: land exactly on the last recorded position first
+            if pending is not None:
+                if last_pos != (pending[1], pending[2]):
+                    out.append(pending)
+                    last_pos = (pending[1], pending[2])
+                pending = None
+            out.append(action)
+            if action[0] in ('left_click', 'right_click', 'middle_click'):
+                last_pos = (action[1], action[2])
+
+        if pending is not None and last_pos != (pending[1], pending[2]):
+            out.append(pending)
+
+        moves_out = sum(1 for action in out if action[0] == 'mouse')
+        self.stats = {'moves_in': moves_in, 'moves_out': moves_out, 'saved_calls': moves_in - moves_out}
+        return out
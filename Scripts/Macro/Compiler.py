@@ -0,0 +1,75 @@
+class CompiledMacro:
+    """A macro flattened into parallel lists ready for playback.
+
+    offsets are integer nanoseconds from the first action, calls are backend
+    methods (or small helpers) bound once, and args are the ready-made argument
+    tuples, so the playback loop does no string comparisons or lookups.
+    conditions maps the index of each screen condition step to the ns its
+    failure skips, None for a wait (see MacroPlayer.play_conditional)."""
+
+    def __init__(self, offsets, calls, args, duration_ns, conditions=None):
+        self.offsets = offsets
+        self.calls = calls
+        self.args = args
+        self.duration_ns = duration_ns
+        self.conditions = conditions or {}
+
+    def __len__(self):
+        return len(self.offsets)
+
+
+def compile_macro(actions, backend, timeline=None, watcher=None):
+    """Turn (type, a, b, timestamp) actions into a CompiledMacro for backend.
+
+    timeline is the (first, last) timestamp pair used for offsets and the loop
+    length; it defaults to the actions' own first and last timestamps. Screen
+    conditions become steps of watcher (a ScreenMatch.ScreenWatcher); without
+    one they are skipped and the macro plays on time alone."""
+    if not len(actions):
+        return CompiledMacro([], [], [], 0)
+    first_action_time, last_action_time = timeline or (actions[0][3], actions[-1][3])
+
+    move, click = backend.move, backend.click
+
+    def click_at(x, y, button):
+        move(x, y)
+        click(button)
+
+    # Resolve each action type to its bound call and argument builder once
+    handlers = {
+        'mouse': (move, lambda action: (action[1], action[2])),
+        'left_click': (click_at, lambda action: (action[1], action[2], 'left')),
+        'right_click': (click_at, lambda action: (action[1], action[2], 'right')),
+        'middle_click': (click_at, lambda action: (action[1], action[2], 'middle')),
+        'window_focus': (backend.focus_window, lambda action: (action[1],)),
+    }
+    key_down, key_up = backend.key_down, backend.key_up
+    matches = {}  # Parsed condition specs; a spec repeats when a macro waits for the same thing twice
+
+    offsets, calls, args, conditions = [], [], [], {}
+    for action in actions:
+        action_type = action[0]
+        if action_type == 'key':
+            call, arg = (key_down if action[2] == 'down' else key_up), (action[1],)
+        elif action_type in ('wait_region', 'if_pixel'):
+            if watcher is None:
+                continue
+            match = matches.get(action[1])
+            if match is None:
+                from Scripts.Macro.ScreenMatch import parse_condition
+                match = matches[action[1]] = parse_condition(action[1])
+            if action_type == 'wait_region':
+                call, conditions[len(calls)] = watcher.wait, None
+            else:
+                call, conditions[len(calls)] = watcher.check, int(round(match.skip * 1e9))
+            arg = (match,)
+        else:
+            handler = handlers.get(action_type)
+            if handler is None:
+                continue  # Unknown actions are skipped, as the old if/elif chain did
+            call, arg = handler[0], handler[1](action)
+        offsets.append(int(round((action[3] - first_action_time) * 1e9)))
+        calls.append(call)
+        args.append(arg)
+    return CompiledMacro(offsets, calls, args, int(round((last_action_time - first_action_time) * 1e9)),
+                         conditions)
@@ -0,0 +1,253 @@
+import time
+import threading
+from Scripts.Macro.EventRing import EventRing
+
+
+class InputSource:
+    """Base class for anything that can feed input events into an EventRecorder.
+
+    Events are delivered to the callback as (kind, a, b, timestamp) where kind is
+    one of 'move', 'button', 'key' or 'window'."""
+
+    def start(self, callback):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+
+class WinEventHook:
+    """Runs a SetWinEventHook for a range of WinEvents on its own message-loop thread.
+
+    callback(event, hwnd, id_object) is called from that thread."""
+
+    WINEVENT_OUTOFCONTEXT = 0x0000
+
+    def __init__(self, event_min, event_max, callback):
+        self.event_min = event_min
+        self.event_max = event_max
+        self.callback = callback
+        self.thread = None
+        self.thread_id = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread_id:
+            import ctypes
+            import win32con
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, win32con.WM_QUIT, 0, 0)
+        self.thread = None
+        self.thread_id = None
+
+    def _loop(self):
+        import ctypes
+        import ctypes.wintypes
+        user32 = ctypes.windll.user32
+        self.thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, ctypes.wintypes.HANDLE, ctypes.wintypes.DWORD, ctypes.wintypes.HWND,
+            ctypes.wintypes.LONG, ctypes.wintypes.LONG, ctypes.wintypes.DWORD, ctypes.wintypes.DWORD)
+
+        def on_event(hook, event, hwnd, id_object, id_child, thread, event_time):
+            self.callback(event, hwnd, id_object)
+
+        proc = WinEventProc(on_event)  # Keep a reference so it isn't collected
+        hook = user32.SetWinEventHook(self.event_min, self.event_max, 0, proc, 0, 0,
+                                      self.WINEVENT_OUTOFCONTEXT)
+        msg = ctypes.wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        user32.UnhookWinEvent(hook)
+
+
+class HookInputSource(InputSource):
+    """Live input from the mouse/keyboard hooks and foreground window changes"""
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+
+    def __init__(self, hook_keyboard=True):
+        self.hook_keyboard = hook_keyboard
+        self.callback = None
+        self.window_hook = None
+
+    def start(self, callback):
+        import mouse
+        import keyboard
+        import win32gui
+        self.callback = callback
+
+        # Report the window and cursor position at the moment recording starts
+        window = win32gui.GetForegroundWindow()
+        callback('window', window, win32gui.GetWindowText(window), time.time())
+        x, y = mouse.get_position()
+        callback('move', x, y, time.time())
+
+        mouse.hook(self.on_mouse)
+        if self.hook_keyboard:
+            keyboard.hook(self.on_key)
+        self.window_hook = WinEventHook(self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND,
+                                        self.on_foreground)
+        self.window_hook.start()
+
+    def stop(self):
+        import mouse
+        import keyboard
+        mouse.unhook(self.on_mouse)
+        if self.hook_keyboard:
+            keyboard.unhook(self.on_key)
+        if self.window_hook:
+            self.window_hook.stop()
+            self.window_hook = None
+        self.callback = None
+
+    def on_mouse(self, event):
+        callback = self.callback
+        if callback is None:
+            return
+        if hasattr(event, 'x'):
+            callback('move', event.x, event.y, event.time)
+        elif hasattr(event, 'button'):
+            callback('button', event.button, event.event_type, event.time)
+
+    def on_key(self, event):
+        callback = self.callback
+        if callback is not None:
+            callback('key', event.name, event.event_type, event.time)
+
+    def on_foreground(self, event, hwnd, id_object):
+        import win32gui
+        callback = self.callback
+        if callback is not None and hwnd:
+            callback('window', hwnd, win32gui.GetWindowText(hwnd), time.time())
+
+
+class SyntheticInputSource(InputSource):
+    """Replays a prepared list of (kind, a, b, timestamp) events, for headless runs"""
+
+    def __init__(self, events=()):
+        self.events = list(events)
+        self.callback = None
+
+    def start(self, callback):
+        self.callback = callback
+
+    def stop(self):
+        self.callback = None
+
+    def feed(self, events=None):
+        """Push events into the recorder; defaults to the events given at construction"""
+        for event in (self.events if events is None else events):
+            if self.callback is None:
+                break
+            self.callback(*event)
+
+
+class EventRecorder:
+    """Turns input events into macro actions, appending only when something changed"""
+
+    BUTTON_ACTIONS = {'left': 'left_click', 'right': 'right_click', 'middle': 'middle_click'}
+
+    def __init__(self, source, macro, on_append=None, ignore_title="Macro Recorder"):
+        self.source = source
+        self.macro = macro
+        self.on_append = on_append
+        self.ignore_title = ignore_title
+        self.last_window = None
+        self.ignoring = False
+        self.last_pos = None
+        self.lock = threading.Lock()  # Hooks call in from several threads
+
+    def start(self):
+        self.source.start(self.handle_event)
+
+    def stop(self):
+        self.source.stop()
+
+    def handle_event(self, kind, a, b, timestamp):
+        with self.lock:
+            action = self.to_action(kind, a, b, timestamp)
+            if action is None:
+                return
+            self.macro.append(action)
+        if self.on_append:
+            self.on_append(action)
+
+    def handle_batch(self, events):
+        """Append a batch of events at once; on_append gets the newest action only"""
+        with self.lock:
+            actions = [action for action in (self.to_action(*event) for event in events) if action is not None]
+            self.macro.extend(actions)
+        if actions and self.on_append:
+            self.on_append(actions[-1])
+
+    def to_action(self, kind, a, b, timestamp):
+        if kind == 'window':
+            if a == self.last_window:
+                return None
+            self.last_window = a
+            # Skip recording while our own UI is focused
+            self.ignoring = self.ignore_title is not None and self.ignore_title in b
+            if self.ignoring:
+                return None
+            return ('window_focus', b, None, timestamp)
+        if kind == 'move':
+            if self.last_pos == (a, b):
+                return None
+            self.last_pos = (a, b)  # Track the cursor even while ignoring, for later clicks
+            return None if self.ignoring else ('mouse', a, b, timestamp)
+        if self.ignoring:
+            return None
+        if kind == 'button':
+            action_type = self.BUTTON_ACTIONS.get(a)
+            if b != 'down' or action_type is None or self.last_pos is None:
+                return None
+            return (action_type, self.last_pos[0], self.last_pos[1], timestamp)
+        if kind == 'key':
+            return ('key', a, b, timestamp)
+        return None
+
+
+class BufferedEventRecorder(EventRecorder):
+    """EventRecorder whose hook callbacks only write into an EventRing.
+
+    A consumer thread drains the ring every interval seconds and appends each
+    batch to the macro, so the hook threads never wait on the macro, its journal
+    or the GUI. Drops and overflows are counted by the ring, see ring.stats()."""
+
+    def __init__(self, source, macro, on_append=None, ignore_title="Macro Recorder",
+                 capacity=65536, interval=0.005):
+        super().__init__(source, macro, on_append, ignore_title)
+        self.ring = EventRing(capacity)
+        self.interval = interval
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._drain_loop, daemon=True)
+        self.thread.start()
+        self.source.start(self.ring.push)
+
+    def stop(self):
+        self.source.stop()
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.drain()  # Whatever arrived after the last pass
+
+    def _drain_loop(self):
+        while self.running:
+            self.drain()
+            time.sleep(self.interval)
+
+    def drain(self):
+        events = self.ring.drain()
+        if events:
+            self.handle_batch(events)
+        return len(events)
@@ -0,0 +1,95 @@
+import itertools
+from array import array
+
+# Event kind codes stored in the kind column
+EVENT_KINDS = ['move', 'button', 'key', 'window']
+EVENT_CODES = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+MOVE = EVENT_CODES['move']
+
+
+class EventRing:
+    """Fixed-size ring of (kind, a, b, timestamp) input events, many producers, one consumer.
+
+    Producers (the hook threads) claim a ticket from an itertools.count, which is
+    atomic under the GIL, write the record into slot ticket % capacity and publish
+    it by storing the ticket in seqs last. The consumer reads tickets in order, so
+    events come out in the order they were claimed, and neither side takes a lock.
+    A producer whose ticket would overwrite an unread slot drops the event instead
+    and leaves its ticket in skipped so the consumer can step over it.
+
+    Moves are stored in the preallocated numeric columns; the (a, b) of other
+    events, which carry names and titles, go in the payload column."""
+
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.seqs = array('q', [-1]) * capacity  # Ticket last published in each slot
+        self.kinds = array('B', [0]) * capacity
+        self.xs = array('q', [0]) * capacity
+        self.ys = array('q', [0]) * capacity
+        self.times = array('d', [0.0]) * capacity
+        self.payloads = [None] * capacity
+        self.tickets = itertools.count()
+        self.skipped = set()  # Tickets whose event was dropped because the ring was full
+        self.tail = 0  # Next ticket to read; only the consumer writes it
+        # Counters, only the consumer writes these
+        self.consumed = 0
+        self.dropped = 0
+        self.overflows = 0  # Separate runs of dropped events
+        self.largest_batch = 0
+        self.overflowing = False
+
+    def push(self, kind, a, b, timestamp):
+        """Called from any thread; returns False if the event was dropped"""
+        ticket = next(self.tickets)
+        if ticket - self.tail >= self.capacity:
+            self.skipped.add(ticket)
+            return False
+        slot = ticket % self.capacity
+        if kind == 'move':
+            self.kinds[slot] = MOVE
+            self.xs[slot] = int(a)
+            self.ys[slot] = int(b)
+        else:
+            self.kinds[slot] = EVENT_CODES[kind]
+            self.payloads[slot] = (a, b)
+        self.times[slot] = timestamp
+        self.seqs[slot] = ticket  # Publish last, the consumer only reads published slots
+        return True
+
+    def drain(self, limit=None):
+        """Consumer side: published events after the last drain, in ticket order, at most limit"""
+        capacity, seqs, skipped = self.capacity, self.seqs, self.skipped
+        kinds, xs, ys, times, payloads = self.kinds, self.xs, self.ys, self.times, self.payloads
+        events = []
+        ticket = self.tail
+        limit = capacity if limit is None else limit
+        while True:
+            slot = ticket % capacity
+            if seqs[slot] == ticket:
+                if len(events) >= limit:
+                    break  # Only ever stop at a published event, so drops after a full batch count now
+                kind = kinds[slot]
+                if kind == MOVE:
+                    events.append(('move', xs[slot], ys[slot], times[slot]))
+                else:
+                    a, b = payloads[slot]
+                    payloads[slot] = None
+                    events.append((EVENT_KINDS[kind], a, b, times[slot]))
+                self.overflowing = False
+            elif ticket in skipped:
+                skipped.discard(ticket)
+                self.dropped += 1
+                if not self.overflowing:
+                    self.overflows += 1
+                    self.overflowing = True
+            else:
+                break  # Not claimed yet, or its producer is still writing it
+            ticket += 1
+        self.tail = ticket
+        self.consumed += len(events)
+        self.largest_batch = max(self.largest_batch, len(events))
+        return events
+
+    def stats(self):
+        return {'consumed': self.consumed, 'dropped': self.dropped, 'overflows': self.overflows,
+                'largest_batch': self.largest_batch, 'capacity': self.capacity}
@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+
+from Scripts.Macro.Utils.Tween import easing_function, tween_points
+from Scripts.Macro.Utils.WindMouse import wind_path
+
+POSITION_ACTIONS = ('mouse', 'left_click', 'right_click', 'middle_click')
+
+
+class MoveHumanizer:
+    """Fills the gaps between sparse recorded positions with generated motion.
+
+    Between two positional actions (moves and clicks) more than min_distance
+    pixels apart, cursor positions are generated on a fixed output clock of rate
+    Hz, ending on the second action's timestamp. They follow a Tween easing curve
+    (mode 'tween') or a WindMouse path (mode 'wind'). The motion takes up at most
+    the last max_duration seconds before the target, so a pause in the recording
+    is still a pause, and starts after any key, window or screen condition
+    action in between, so the output stays in timestamp order. The generated
+    moves are ordinary timestamped mouse actions that the scheduler plays like
+    recorded ones; recorded actions are untouched."""
+
+    MODES = ('tween', 'wind')
+
+    def __init__(self, mode='tween', easing='ease_in_out', rate=125, max_duration=0.5, min_distance=3, seed=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown humanize mode: {mode}")
+        self.mode = mode
+        self.easing = easing
+        self.rate = rate
+        self.max_duration = max_duration
+        self.min_distance = min_distance
+        self.seed = seed
+        self.stats = {'actions_in': 0, 'generated': 0}
+
+    def humanize(self, macro):
+        out = []
+        last = None  # (x, y, t) of the last positional action, t moved up to any action since
+        easing = easing_function(self.easing)
+        rng = np.random.default_rng(self.seed)
+        for action in macro:
+            if action[0] in POSITION_ACTIONS:
+                if last is not None:
+                    out.extend(self.segment(last, action, easing, rng))
+                last = (action[1], action[2], action[3])
+            elif last is not None:
+                last = (last[0], last[1], action[3])  # Motion may not start before this action
+            out.append(action)
+        self.stats = {'actions_in': len(macro), 'generated': len(out) - len(macro)}
+        return out
+
+    def segment(self, last, action, easing, rng):
+        """Generated mouse actions strictly between last and action"""
+        x0, y0, t0 = last
+        x1, y1, t1 = action[1], action[2], action[3]
+        if math.hypot(x1 - x0, y1 - y0) < self.min_distance:
+            return []
+        period = 1.0 / self.rate
+        steps = int(min(t1 - t0, self.max_duration) * self.rate)
+        if steps < 2:
+            return []
+        if self.mode == 'tween':
+            points = np.rint(tween_points((x0, y0), (x1, y1), np.arange(1, steps) / steps, easing)).tolist()
+        else:
+            path = wind_path((x0, y0), (x1, y1), rng=rng)
+            if len(path) < 2:
+                return []
+            # Spread the path over the ticks, whatever its own number of points
+            picks = np.rint(np.linspace(0, len(path) - 1, steps + 1)[1:-1]).astype(np.intp)
+            points = path[picks].tolist()
+        moves = []
+        previous = (x0, y0)
+        for k, (x, y) in enumerate(points, 1):
+            position = (int(round(x)), int(round(y)))
+            if position != previous:
+                moves.append(('mouse', position[0], position[1], t1 - (steps - k) * period))
+                previous = position
+        return moves
@@ -1,13 +1,15 @@
-import pyautogui
+import os
 import time
-import keyboard
-import mouse
 import threading
-import json
-from PyQt5.QtCore import QTimer, QMetaObject, Qt, Q_ARG, QVariant
-import win32gui  # Add this import
-import win32con
 from contextlib import contextmanager
+from Scripts.Macro.EventCapture import BufferedEventRecorder, HookInputSource
+from Scripts.Macro.MacroTrack import MacroTrack
+from Scripts.Macro.Scheduler import PlaybackScheduler
+from Scripts.Macro.Coalescer import MoveCoalescer
+from Scripts.Macro.OutputBackend import default_backend
+from Scripts.Macro.Player import ActionRetry, MacroPlayer
+from Scripts.Macro.ScreenMatch import ConditionTimeout
+from Scripts.FileHandler import MacroScript
 
 class MacroRecorder:
     def __init__(self, ui):
@@ -15,21 +17,45 @@ class MacroRecorder:
         self.recording = False
         self.macro = []
         self.playing = False
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.record_step)
-        pyautogui.MINIMUM_DURATION = 0  # Remove minimum sleep time
-        pyautogui.PAUSE = 0  # Remove delays between actions
-        self.last_window = None
+        self.input_source = HookInputSource()  # Swap for a SyntheticInputSource in headless runs
+        self.event_recorder = None
+        self.backend = None  # OutputBackend used for playback, picked per platform on first play
         self.action_retry_count = 3  # Number of retries for failed actions
         self.error_tolerance = 2  # Reduced for faster operation
-        pyautogui.FAILSAFE = True
-        # Only keep failsafe
-        pyautogui.FAILSAFE = True
-        pyautogui.MINIMUM_DURATION = 0
-        pyautogui.PAUSE = 0
+        self.playback_speed = 1.0  # 2.0 plays twice as fast
+        self.spin_budget_ns = 1_500_000  # Busy-wait this long before each deadline instead of sleeping
+        self.scheduler = None  # Scheduler of the current/last threaded playback, for lateness stats
+        self.playback = None  # PlaybackBridge running the async engine, created on first play
+        self.playback_task = None  # MacroTask of the current/last async playback
+        self.esc_hook = None  # keyboard hook that stops playback, removed again when it ends
+        self.coalesce_moves = False  # Merge mouse samples that fall in one output frame
+        self.move_coalescer = MoveCoalescer(frame_rate=125, min_distance=2)
+        self.optimizer = None  # MacroOptimizer applied on save, created on first use
+        self.simplify_on_save = None  # Pixels Save may simplify mouse paths by; None only drops repeats, losslessly
+        self.humanize_moves = False  # Generate motion between sparse moves, e.g. of an optimized macro
+        self.move_humanizer = None  # MoveHumanizer used when humanize_moves is set, created on first use
+        self.instrument_playback = False  # Record per-action timings into playback_trace
+        self.playback_trace = None  # PlaybackTrace of the last instrumented playback
+        self.retry_failed_actions = False  # Retry actions that raise, up to action_retry_count times
+        self.stream_file = None  # Record straight into this MacroStream file instead of self.macro
+        self.stream_writer = None  # StreamWriter of the recording in progress
+        self.save_compression = 'zlib'  # Saves delta-encoded v3 files; 'lzma', 'none', or None for plain v2
+        self.screen_watcher = None  # ScreenWatcher for wait_region/if_pixel steps, created on first play
+        self.screen_poll_hz = 60  # How often a screen wait grabs its region
+        # pyautogui, keyboard and Qt are imported where they are used, so importing this module stays cheap
+
+    @property
+    def macro(self):
+        return self._macro
+
+    @macro.setter
+    def macro(self, actions):
+        # Always store actions in columnar form, whatever sequence was assigned
+        self._macro = MacroTrack.from_actions(actions)
 
     @contextmanager
     def error_handler(self):
+        import pyautogui
         try:
             yield
         except pyautogui.FailSafeException:
@@ -40,20 +66,22 @@ class MacroRecorder:
 
     def verify_mouse_position(self, target_x, target_y):
         """Verify if mouse reached the target position within tolerance"""
-        current_x, current_y = pyautogui.position()
+        current_x, current_y = self.backend.position()
         return (abs(current_x - target_x) <= self.error_tolerance and 
                 abs(current_y - target_y) <= self.error_tolerance)
 
     def retry_action(self, action_func, verify_func=None, retries=None):
-        """Retry an action until it succeeds or runs out of retries"""
+        """Retry an action until it succeeds or runs out of retries.
+
+        Returns the attempt it succeeded on (so 1 means no retries), 0 if it never did"""
         retries = retries or self.action_retry_count
-        for _ in range(retries):
+        for attempt in range(1, retries + 1):
             with self.error_handler():
                 action_func()
                 if verify_func is None or verify_func():
-                    return True
+                    return attempt
                 time.sleep(0.1)  # Small delay between retries
-        return False
+        return 0
 
     def toggle_record(self):
         self.recording = not self.recording
@@ -62,169 +90,195 @@ class MacroRecorder:
             self.start_recording()
         else:
             self.ui.record_button.setText("Record")
-            keyboard.unhook_all()
+            self.stop_recording()
             self.ui.save_cache()
 
     def start_recording(self):
         self.macro = []
         self.update_macro_display_safe(self.macro)
-        keyboard.hook(self.record_key)
-        self.timer.start(10)  # Schedule record_step every 10 ms
+        sink = self.macro
+        if self.stream_file:
+            # Memory stays at one chunk; the macro and its log stay empty until the file is loaded
+            from Scripts.FileHandler.MacroStream import StreamWriter
+            sink = self.stream_writer = StreamWriter(self.stream_file)
+        # Hooks only write into a ring buffer; its consumer thread appends to the macro in batches
+        self.event_recorder = BufferedEventRecorder(self.input_source, sink, on_append=self.record_appended)
+        self.event_recorder.start()
 
-    def record_step(self):
-        if self.recording:
-            # Get current window info
-            current_window = win32gui.GetForegroundWindow()
-            current_title = win32gui.GetWindowText(current_window)
-            
-            # Skip recording if it's our own UI
-            if "Macro Recorder" in current_title:
-                return
-                
-            # Record window focus change
-            if self.last_window != current_window:
-                self.last_window = current_window
-                self.macro.append(('window_focus', current_title, None, time.time()))
-                self.update_macro_display_safe(self.macro)
-            
-            # Record mouse position and clicks
-            x, y = pyautogui.position()
-            left_pressed = mouse.is_pressed(button='left')
-            right_pressed = mouse.is_pressed(button='right')
-            middle_pressed = mouse.is_pressed(button='middle')
-            
-            # Always record position changes and clicks
-            should_record = (
-                not self.macro or
-                (self.macro[-1][1], self.macro[-1][2]) != (x, y) or
-                left_pressed or right_pressed or middle_pressed
-            )
-            
-            if should_record:
-                action_type = 'mouse'
-                if left_pressed:
-                    action_type = 'left_click'
-                elif right_pressed:
-                    action_type = 'right_click'
-                elif middle_pressed:
-                    action_type = 'middle_click'
-                
-                self.macro.append((action_type, x, y, time.time()))
-                self.update_macro_display_safe(self.macro)
+    def stop_recording(self):
+        if self.event_recorder:
+            self.event_recorder.stop()
+            self.event_recorder = None
+        if self.stream_writer:
+            self.stream_writer.close()
+            self.stream_writer = None
 
-    def record_key(self, event):
-        if self.recording:
-            self.macro.append(('key', event.name, event.event_type, time.time()))
-            self.update_macro_display_safe(self.macro)
+    def streamed(self):
+        """Whether there is a streamed recording to play instead of self.macro"""
+        return not self.macro and bool(self.stream_file) and os.path.exists(self.stream_file)
 
-    def play_macro(self, loops=1):
-        if not self.macro:
+    def record_appended(self, action):
+        self.ui.macro_log.mark_dirty()  # The log picks the new rows up on its next frame
+
+    def play_macro(self, loops=1, start_time=None):
+        if not self.macro and not self.streamed():
             self.ui.show_warning("No macro recorded!")
             return
+        import keyboard
         self.playing = True
-        keyboard.on_press_key("esc", self.stop_playback)
-        threading.Thread(target=self._play_macro_thread, args=(loops,)).start()
-
-    def _play_macro_thread(self, loops=1):
+        self.esc_hook = keyboard.on_press_key("esc", self.stop_playback)
+        from Scripts.Macro.ScreenMatch import has_conditions
+        if (self.streamed() or self.instrument_playback or self.retry_failed_actions
+                or has_conditions(self.macro)):
+            # Streams, traces, retries and screen conditions are MacroPlayer features, so these keep a player thread
+            threading.Thread(target=self._play_macro_thread, args=(loops, start_time)).start()
+            return
         try:
-            for loop in range(loops):
-                if not self.playing:
-                    break
-
-                # Store the start time of this loop iteration
-                start_time = time.time()
-                first_action_time = self.macro[0][3]
-                last_action_time = first_action_time
-
-                for i, action in enumerate(self.macro):
-                    if not self.playing:
-                        break
-
-                    # Calculate and wait for the exact recorded delay
-                    if i > 0:
-                        recorded_delay = action[3] - last_action_time
-                        time.sleep(max(0, recorded_delay))
-                    
-                    last_action_time = action[3]
-
-                    # Execute the action
-                    action_type = action[0]
-                    if action_type == 'window_focus':
-                        try:
-                            window = win32gui.FindWindow(None, action[1])
-                            if window:
-                                win32gui.SetForegroundWindow(window)
-                        except Exception:
-                            pass
+            bridge = self.playback_bridge()
+            self.scheduler = None
+            self.playback_task = bridge.start(self.playback_actions(), loops=loops, name="macro",
+                                              timeline=(self.macro[0][3], self.macro[-1][3]),
+                                              start_time=start_time)
+        except Exception as e:
+            self.end_playback()
+            self.ui.show_error(f"Macro playback error: {str(e)}")
 
-                    elif action_type in ('mouse', 'left_click', 'right_click', 'middle_click'):
-                        x, y = action[1], action[2]
-                        pyautogui.moveTo(x, y)
-                        if action_type != 'mouse':
-                            pyautogui.click(button=action_type.split('_')[0])
+    def playback_bridge(self):
+        if self.playback is None:
+            from Scripts.Ui.PlaybackBridge import PlaybackBridge
+            if self.backend is None:
+                self.backend = default_backend()
+            self.playback = PlaybackBridge(self.backend, speed=self.playback_speed, spin_ns=self.spin_budget_ns)
+            self.playback.event.connect(self.on_playback_event)
+        self.playback.engine.speed = self.playback_speed
+        return self.playback
 
-                    elif action_type == 'key':
-                        key, event_type = action[1], action[2]
-                        if event_type == 'down':
-                            keyboard.press(key)
-                        else:
-                            keyboard.release(key)
+    def on_playback_event(self, event):
+        """Engine events, delivered on the GUI thread"""
+        if event.task is not self.playback_task or event.kind not in ('finished', 'cancelled', 'error'):
+            return
+        self.end_playback()
+        self.ui.pause_button.setText("Pause")
+        if event.kind == 'finished':
+            self.ui.show_info(f"Macro playback completed ({event.task.loops} loops)")
+        elif event.kind == 'error':
+            if isinstance(event.error, self.backend.fatal_errors):
+                self.ui.show_error("Macro stopped - failsafe triggered (mouse to corner)")
+            else:
+                self.ui.show_error(f"Macro playback error: {str(event.error)}")
 
-                # Wait before starting next loop to maintain timing
-                if loop < loops - 1:
-                    total_macro_time = self.macro[-1][3] - first_action_time
-                    elapsed = time.time() - start_time
-                    if elapsed < total_macro_time:
-                        time.sleep(total_macro_time - elapsed)
+    def playback_actions(self):
+        """The macro as it should be played: coalesced and humanized if those are on"""
+        actions = self.move_coalescer.coalesce(self.macro) if self.coalesce_moves else self.macro
+        if self.humanize_moves:
+            if self.move_humanizer is None:
+                from Scripts.Macro.Humanizer import MoveHumanizer
+                self.move_humanizer = MoveHumanizer(rate=self.move_coalescer.frame_rate)
+            actions = self.move_humanizer.humanize(actions)
+        return actions
 
+    def _play_macro_thread(self, loops=1, start_time=None):
+        """Runs on its own thread, so everything it reports goes through the Ui's queued message signal"""
+        scheduler = PlaybackScheduler(speed=self.playback_speed, spin_ns=self.spin_budget_ns)
+        self.scheduler = scheduler
+        completed = False
+        retry = None
+        try:
+            if self.backend is None:
+                self.backend = default_backend()
+            trace = None
+            if self.instrument_playback:
+                from Scripts.Macro.Trace import PlaybackTrace
+                trace = self.playback_trace = PlaybackTrace()
+            if self.retry_failed_actions:
+                retry = ActionRetry(self.action_retry_count, fatal=self.backend.fatal_errors)
+            if self.screen_watcher is None:
+                from Scripts.Macro.ScreenMatch import ScreenWatcher
+                self.screen_watcher = ScreenWatcher()
+            self.screen_watcher.poll_hz = self.screen_poll_hz
+            player = MacroPlayer(self.backend, scheduler, trace, retry, self.screen_watcher)
+            if self.streamed():
+                from Scripts.FileHandler.MacroStream import open_stream
+                with open_stream(self.stream_file) as reader:
+                    completed = player.play_stream(reader, loops, keep_playing=lambda: self.playing)
+            else:
+                completed = player.play(self.playback_actions(), loops, keep_playing=lambda: self.playing,
+                                        timeline=(self.macro[0][3], self.macro[-1][3]), start_time=start_time)
+        except ConditionTimeout as e:
+            self.ui.message.emit('error', f"Screen condition timed out: {e}")
         except Exception as e:
-            self.ui.show_error(f"Macro playback error: {str(e)}")
+            if self.backend is not None and isinstance(e, self.backend.fatal_errors):
+                self.ui.message.emit('error', "Macro stopped - failsafe triggered (mouse to corner)")
+            else:
+                self.ui.message.emit('error', f"Macro playback error: {str(e)}")
         finally:
-            self.playing = False
-            keyboard.unhook_all()
-            if self.playing:
-                self.ui.show_info(f"Macro playback completed ({loops} loops)")
+            self.end_playback()
+            if retry is not None and retry.summary():
+                self.ui.message.emit('warning', retry.summary())
+            if completed:
+                self.ui.message.emit('info', f"Macro playback completed ({loops} loops)")
+
+    def end_playback(self):
+        """Playback is over: drop our Esc hook, and only ours"""
+        self.playing = False
+        hook, self.esc_hook = self.esc_hook, None
+        if hook is not None:
+            import keyboard
+            keyboard.unhook(hook)
 
     def stop_playback(self, event=None):
+        """Stop playback; called by the Esc hook from its own thread"""
+        task = self.playback_task
+        if task is not None and task.state in ('playing', 'paused'):
+            self.playback.cancel(task)  # The 'cancelled' event finishes up on the GUI thread
+        else:
+            self.end_playback()
         self.playing = False
-        keyboard.unhook_key("esc")
+
+    def toggle_pause(self):
+        """Pause or resume the current async playback; returns True if it is paused now"""
+        task = self.playback_task
+        if task is None or task.state not in ('playing', 'paused'):
+            return False
+        pausing = task.state == 'playing'
+        (self.playback.pause if pausing else self.playback.resume)(task)
+        return pausing
+
+    def playback_metrics(self):
+        """Timing summary of the last playback: the full trace metrics if it was instrumented"""
+        if self.playback_trace is not None and len(self.playback_trace):
+            return self.playback_trace.metrics()
+        if self.scheduler is None and self.playback_task is not None:
+            return {'lateness': self.playback_task.stats()}
+        if self.scheduler is not None:
+            return {'lateness': self.scheduler.stats()}
+        return None
+
+    def export_playback_trace(self, file_path):
+        """Write the last instrumented playback as a Chrome trace (chrome://tracing, Perfetto)"""
+        if self.playback_trace is None:
+            return False
+        self.playback_trace.save_chrome_trace(file_path)
+        return True
 
     def optimize_macro(self):
-        """Remove redundant mouse movements and convert to relative timestamps"""
+        """Drop repeated mouse samples and window switches and convert to relative timestamps.
+
+        Mouse paths are only simplified when simplify_on_save is set; `Cli optimize` does it explicitly."""
         if not self.macro:
             return []
-        
-        optimized = []
-        base_time = self.macro[0][3]
-        last_pos = None
-        last_window = None
-        
-        for action in self.macro:
-            if action[0] == 'window_focus':
-                if last_window != action[1]:  # Only record unique window changes
-                    optimized.append(('window_focus', action[1], None, action[3] - base_time))
-                    last_window = action[1]
-            elif action[0] == 'mouse':
-                # Only save position if it's different from last position
-                if last_pos != (action[1], action[2]):
-                    optimized.append(('mouse', action[1], action[2], action[3] - base_time))
-                    last_pos = (action[1], action[2])
-            elif action[0] == 'key':
-                optimized.append(('key', action[1], action[2], action[3] - base_time))
-        
-        return optimized
+        if self.optimizer is None:
+            from Scripts.Macro.Optimizer import MacroOptimizer
+            self.optimizer = MacroOptimizer(tolerance=None)
+        self.optimizer.tolerance = self.simplify_on_save
+        return self.optimizer.optimize(self.macro, relative=True)
 
     def save_macro(self):
         file_path = self.ui.ask_save_file()
         if file_path:
             optimized_macro = self.optimize_macro()
             try:
-                with open(file_path, "w") as f:
-                    json.dump({
-                        'version': 1,
-                        'timestamp': time.time(),
-                        'actions': optimized_macro
-                    }, f)
+                MacroScript.save(file_path, optimized_macro, compression=self.save_compression)
                 self.ui.show_info("Macro saved successfully!")
                 self.ui.save_cache()
             except Exception as e:
@@ -234,45 +288,21 @@ class MacroRecorder:
         file_path = self.ui.ask_open_file()
         if file_path:
             try:
-                with open(file_path, "r") as f:
-                    data = json.load(f)
-                    if data.get('version') == 1:
-                        actions = data['actions']
-                        # Convert relative timestamps back to absolute
-                        base_time = time.time()
-                        self.macro = []
-                        for action in actions:
-                            if action[0] == 'window_focus':
-                                self.macro.append(('window_focus', action[1], None, base_time + float(action[3])))
-                            elif action[0] == 'mouse':
-                                self.macro.append(('mouse', int(action[1]), int(action[2]), base_time + float(action[3])))
-                            elif action[0] == 'key':
-                                self.macro.append(('key', action[1], action[2], base_time + float(action[3])))
-                        self.update_macro_display_safe(self.macro)
-                        self.ui.show_info("Macro loaded successfully!")
-                        self.ui.save_cache()
-                    else:
-                        self.load_legacy_format(file_path)
-            except json.JSONDecodeError:
-                # Try loading as legacy format
-                self.load_legacy_format(file_path)
+                # Relative timestamps are converted back to absolute ones
+                self.macro, file_format = MacroScript.load(file_path, base_time=time.time())
+                self.update_macro_display_safe(self.macro)
+                if file_format == 'legacy':
+                    self.ui.show_info("Macro loaded successfully (legacy format)!")
+                else:
+                    self.ui.show_info("Macro loaded successfully!")
+                self.ui.save_cache()
             except Exception as e:
                 self.ui.show_error(f"Error loading macro: {str(e)}")
 
     def load_legacy_format(self, file_path):
         """Handle loading of old format files"""
         try:
-            with open(file_path, "r") as f:
-                self.macro = []
-                base_time = time.time()
-                for line in f:
-                    parts = line.strip().split(',')
-                    if parts[0] == 'window_focus':
-                        self.macro.append(('window_focus', parts[1], None, base_time + float(parts[3])))
-                    elif parts[0] == 'mouse':
-                        self.macro.append(('mouse', int(parts[1]), int(parts[2]), base_time + float(parts[3])))
-                    elif parts[0] == 'key':
-                        self.macro.append(('key', parts[1], parts[2], base_time + float(parts[3])))
+            self.macro = MacroScript.load_legacy(file_path, base_time=time.time())
             self.update_macro_display_safe(self.macro)
             self.ui.show_info("Macro loaded successfully (legacy format)!")
             self.ui.save_cache()
@@ -280,9 +310,6 @@ class MacroRecorder:
             self.ui.show_error(f"Error loading legacy format: {str(e)}")
 
     def update_macro_display_safe(self, macro):
-        QMetaObject.invokeMethod(
-            self.ui, 
-            "update_macro_display",
-            Qt.QueuedConnection,
-            Q_ARG(list, macro)
-        )
+        from PyQt5.QtCore import QMetaObject, Qt
+        # The GUI thread reads the macro itself instead of being sent a copy
+        QMetaObject.invokeMethod(self.ui, "reload_macro_display", Qt.QueuedConnection)
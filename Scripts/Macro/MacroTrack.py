@@ -0,0 +1,263 @@
+from array import array
+
+# Action type codes stored in the code column. New types are only ever appended.
+ACTION_TYPES = ['mouse', 'left_click', 'right_click', 'middle_click', 'key', 'window_focus',
+                'wait_region', 'if_pixel']
+ACTION_CODES = {name: code for code, name in enumerate(ACTION_TYPES)}
+
+# Types whose two payload fields are strings (stored as string table ids, -1 for None)
+STRING_ACTIONS = {'key', 'window_focus', 'wait_region', 'if_pixel'}  # The last two hold a ScreenMatch spec
+
+
+def decode_action(code, x, y, t, strings):
+    """Build an action tuple from raw column values and a string table"""
+    action_type = ACTION_TYPES[code]
+    if action_type in STRING_ACTIONS:
+        return (action_type, strings[x] if x >= 0 else None, strings[y] if y >= 0 else None, t)
+    return (action_type, x, y, t)
+
+
+class MacroTrack:
+    """Columnar macro storage.
+
+    Each action is kept as a type code, x, y and a float64 timestamp in parallel
+    arrays instead of a boxed tuple. Key names and window titles are interned in a
+    string table and their ids are stored in the x/y columns. Indexing, iteration
+    and slicing hand back the usual (type, a, b, timestamp) tuples, so code written
+    against a list of actions keeps working."""
+
+    def __init__(self, actions=()):
+        self.codes = array('B')
+        self.xs = array('i')
+        self.ys = array('i')
+        self.times = array('d')
+        self.strings = []
+        self.string_ids = {}
+        self.journal = None  # Set by MacroJournal.attach to log every mutation
+        self.timeline = None  # MacroTimeline kept in step with every mutation, see MacroTimeline.of
+        self.extend(actions)
+
+    @classmethod
+    def from_actions(cls, actions):
+        return actions if isinstance(actions, cls) else cls(actions)
+
+    @classmethod
+    def from_numpy(cls, codes, xs, ys, times, strings=()):
+        """Build a track from NumPy columns, the reverse of as_numpy()"""
+        import numpy as np
+        track = cls()
+        track.codes = array('B', np.ascontiguousarray(codes, dtype=np.uint8).tobytes())
+        track.xs = array('i', np.ascontiguousarray(xs, dtype=np.int32).tobytes())
+        track.ys = array('i', np.ascontiguousarray(ys, dtype=np.int32).tobytes())
+        track.times = array('d', np.ascontiguousarray(times, dtype=np.float64).tobytes())
+        track.strings = list(strings)
+        track.string_ids = {string: i for i, string in enumerate(track.strings)}
+        return track
+
+    def intern(self, value):
+        if value is None:
+            return -1
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def string(self, string_id):
+        return None if string_id < 0 else self.strings[string_id]
+
+    def encode(self, action):
+        """Turn an action tuple/list into its (code, x, y, timestamp) columns"""
+        action_type = action[0]
+        code = ACTION_CODES.get(action_type)
+        if code is None:
+            raise ValueError(f"Unknown action type: {action_type}")
+        if action_type in STRING_ACTIONS:
+            return code, self.intern(action[1]), self.intern(action[2]), float(action[3])
+        return code, int(action[1]), int(action[2]), float(action[3])
+
+    def decode(self, index):
+        return decode_action(self.codes[index], self.xs[index], self.ys[index], self.times[index], self.strings)
+
+    def append(self, action):
+        if self.journal is not None:
+            # Mutation and journal entry together, so a compaction never snapshots one without the other
+            with self.journal.track_lock:
+                self._append(action)
+                self.journal.record('append', list(action))
+        else:
+            self._append(action)
+
+    def _append(self, action):
+        code, x, y, t = self.encode(action)
+        self.codes.append(code)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.times.append(t)
+        if self.timeline is not None:
+            self.timeline.on_insert(len(self.codes) - 1)
+
+    def extend(self, actions):
+        if isinstance(actions, MacroTrack):
+            actions = iter(actions)
+        for action in actions:
+            self.append(action)
+
+    def insert(self, index, action):
+        if self.journal is not None:
+            with self.journal.track_lock:
+                self._insert(index, action)
+        else:
+            self._insert(index, action)
+
+    def _insert(self, index, action):
+        # Clamp like list.insert so the journaled index replays the same way
+        index = min(max(index + len(self), 0) if index < 0 else index, len(self))
+        code, x, y, t = self.encode(action)
+        self.codes.insert(index, code)
+        self.xs.insert(index, x)
+        self.ys.insert(index, y)
+        self.times.insert(index, t)
+        if self.timeline is not None:
+            self.timeline.on_insert(index)
+        if self.journal is not None:
+            self.journal.record('insert', index, list(action))
+
+    def insert_many(self, index, actions):
+        """Insert a block of actions before index with one shift of the columns"""
+        if self.journal is not None:
+            with self.journal.track_lock:
+                self._insert_many(index, actions)
+        else:
+            self._insert_many(index, actions)
+
+    def _insert_many(self, index, actions):
+        index = min(max(index + len(self), 0) if index < 0 else index, len(self))
+        actions = [list(action) for action in actions]
+        if not actions:
+            return
+        columns = [self.encode(action) for action in actions]
+        for column, values in zip((self.codes, self.xs, self.ys, self.times), zip(*columns)):
+            column[index:index] = array(column.typecode, values)
+        if self.timeline is not None:
+            self.timeline.on_insert(index, len(actions))
+        if self.journal is not None:
+            for k, action in enumerate(actions):
+                self.journal.record('insert', index + k, action)
+
+    def clear(self):
+        del self[:]
+
+    def copy(self):
+        track = MacroTrack()
+        track.codes = array('B', self.codes)
+        track.xs = array('i', self.xs)
+        track.ys = array('i', self.ys)
+        track.times = array('d', self.times)
+        track.strings = list(self.strings)
+        track.string_ids = dict(self.string_ids)
+        return track
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return MacroTrack(self.decode(i) for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("MacroTrack index out of range")
+        return self.decode(index)
+
+    def __setitem__(self, index, action):
+        if self.journal is not None:
+            with self.journal.track_lock:
+                self._set(index, action)
+        else:
+            self._set(index, action)
+
+    def _set(self, index, action):
+        if index < 0:
+            index += len(self)
+        code, x, y, t = self.encode(action)
+        if self.timeline is not None:
+            old = (self.codes[index], self.xs[index], self.ys[index], self.times[index])
+        self.codes[index] = code
+        self.xs[index] = x
+        self.ys[index] = y
+        self.times[index] = t
+        if self.timeline is not None:
+            self.timeline.on_set(index, *old)
+        if self.journal is not None:
+            self.journal.record('set', index, list(action))
+
+    def __delitem__(self, index):
+        if self.journal is not None:
+            with self.journal.track_lock:
+                self._delete(index)
+        else:
+            self._delete(index)
+
+    def _delete(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                # Delete back to front so the remaining indices stay valid
+                for i in sorted(range(start, stop, step), reverse=True):
+                    del self[i]
+                return
+        else:
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("MacroTrack index out of range")
+            start, stop = index, index + 1
+        if stop <= start:
+            return
+        if self.timeline is not None:
+            self.timeline.on_delete(start, stop)
+        del self.codes[start:stop]
+        del self.xs[start:stop]
+        del self.ys[start:stop]
+        del self.times[start:stop]
+        if self.journal is not None:
+            self.journal.record('delete', start, stop)
+
+    def __iter__(self):
+        # Bind everything locally, this is the hot path for rendering and playback
+        types, strings, string_actions = ACTION_TYPES, self.strings, STRING_ACTIONS
+        for code, x, y, t in zip(self.codes, self.xs, self.ys, self.times):
+            action_type = types[code]
+            if action_type in string_actions:
+                yield (action_type, strings[x] if x >= 0 else None, strings[y] if y >= 0 else None, t)
+            else:
+                yield (action_type, x, y, t)
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(tuple(a) == tuple(b) for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return f"MacroTrack({len(self)} actions, {len(self.strings)} strings)"
+
+    def to_list(self):
+        """Plain lists of actions, as stored in JSON files"""
+        return [list(action) for action in self]
+
+    def as_numpy(self):
+        """NumPy copies of the columns (codes, xs, ys, times).
+
+        These are copies on purpose: a live view would pin the array buffers and
+        make the next append raise BufferError."""
+        import numpy as np
+        return tuple(np.frombuffer(column, dtype=dtype).copy() if column else np.empty(0, dtype)
+                     for column, dtype in ((self.codes, np.uint8), (self.xs, np.int32),
+                                           (self.ys, np.int32), (self.times, np.float64)))
+
+    def nbytes(self):
+        """Approximate memory held by the columns and string table"""
+        columns = sum(column.buffer_info()[1] * column.itemsize for column in (self.codes, self.xs, self.ys, self.times))
+        return columns + sum(len(s) for s in self.strings)
@@ -0,0 +1,213 @@
+import numpy as np
+
+from Scripts.Macro.MacroTrack import MacroTrack, ACTION_CODES
+
+MOUSE = ACTION_CODES['mouse']
+KEY = ACTION_CODES['key']
+WINDOW = ACTION_CODES['window_focus']
+
+
+def synced_distance(px, py, pt, ax, ay, at, bx, by, bt):
+    """Distance from points p to where the segments a-b put the cursor at p's time, all arrays of one length.
+
+    Unlike the distance to the segment this sees timing: a sample where the
+    cursor rested on the path is far from where a straight a-b motion would be."""
+    span = bt - at
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f = np.clip((pt - at) / span, 0.0, 1.0)
+    f = np.where(span > 0, f, 0.0)  # A segment without duration is just its start point
+    return np.hypot(px - (ax + f * (bx - ax)), py - (ay + f * (by - ay)))
+
+
+def mouse_runs(codes):
+    """(starts, ends) of every run of consecutive mouse rows, both inclusive"""
+    mouse = np.concatenate(([False], codes == MOUSE, [False]))
+    edges = np.flatnonzero(mouse[1:] != mouse[:-1])
+    return edges[0::2], edges[1::2] - 1
+
+
+def rdp_keep(xs, ys, ts, starts, ends, tolerance):
+    """Douglas-Peucker over every run at once, in (x, y, t).
+
+    Each pass takes all intervals still open, measures every interior point
+    against its interval's chord at the point's time (synced_distance), and
+    splits the intervals whose farthest point is beyond tolerance. The number
+    of passes is the depth of the recursion, not the number of points."""
+    keep = np.zeros(len(xs), dtype=bool)
+    keep[starts] = True
+    keep[ends] = True
+    open_intervals = ends - starts > 1
+    lo, hi = starts[open_intervals], ends[open_intervals]
+    while len(lo):
+        lengths = hi - lo - 1
+        first = np.cumsum(lengths) - lengths
+        owner = np.repeat(np.arange(len(lo)), lengths)
+        points = np.repeat(lo + 1 - first, lengths) + np.arange(lengths.sum())
+        distance = synced_distance(xs[points], ys[points], ts[points], xs[lo][owner], ys[lo][owner],
+                                   ts[lo][owner], xs[hi][owner], ys[hi][owner], ts[hi][owner])
+        farthest = np.maximum.reduceat(distance, first)
+        # First point reaching the maximum in each interval
+        at_max = np.flatnonzero(distance == farthest[owner])
+        _, first_max = np.unique(owner[at_max], return_index=True)
+        pivots = points[at_max[first_max]]
+        split = farthest > tolerance
+        pivots = pivots[split]
+        keep[pivots] = True
+        lo = np.concatenate((lo[split], pivots))
+        hi = np.concatenate((pivots, hi[split]))
+        open_intervals = hi - lo > 1
+        lo, hi = lo[open_intervals], hi[open_intervals]
+    return keep
+
+
+def visvalingam_keep(xs, ys, ts, starts, ends, tolerance):
+    """Visvalingam-Whyatt over every run at once, removing points of area < tolerance**2.
+
+    Each pass recomputes the triangle area of every remaining interior point
+    against its current neighbours and removes every other point of each
+    stretch of small ones, so no two neighbours go in the same pass. Area alone
+    lets the error creep up over many passes on smooth curves and ignores time,
+    so segments that end up further than tolerance from a removed point, at its
+    time, are refined with rdp_keep."""
+    area_limit = tolerance * tolerance
+    in_run = np.zeros(len(xs) + 1, dtype=np.int64)
+    np.add.at(in_run, starts, 1)
+    np.add.at(in_run, ends + 1, -1)
+    points = np.flatnonzero(np.cumsum(in_run[:-1]) > 0)
+    interior = np.ones(len(points), dtype=bool)
+    interior[np.searchsorted(points, starts)] = False
+    interior[np.searchsorted(points, ends)] = False
+    while True:
+        middle = np.flatnonzero(interior)
+        if not len(middle):
+            break
+        p, a, b = points[middle], points[middle - 1], points[middle + 1]
+        area = 0.5 * np.abs((xs[a] - xs[p]) * (ys[b] - ys[p]) - (xs[b] - xs[p]) * (ys[a] - ys[p]))
+        small = np.zeros(len(points), dtype=bool)
+        small[middle[area < area_limit]] = True
+        if not small.any():
+            break
+        # Position of each small point within its stretch of consecutive small points
+        stretch_start = small & ~np.concatenate(([False], small[:-1]))
+        index = np.arange(len(points))
+        last_start = np.maximum.accumulate(np.where(stretch_start, index, 0))
+        remove = small & ((index - last_start) % 2 == 0)
+        points, interior = points[~remove], interior[~remove]
+    keep = np.zeros(len(xs), dtype=bool)
+    keep[points] = True
+    segments = ~np.isin(points[:-1], ends)  # Pairs of kept points inside one run
+    return keep | rdp_keep(xs, ys, ts, points[:-1][segments], points[1:][segments], tolerance)
+
+
+def held_keys_after(codes, xs, ys, strings):
+    """For each row, whether any key is held down once that row has run"""
+    held = np.zeros(len(codes), dtype=bool)
+    key_rows = np.flatnonzero(codes == KEY)
+    if not len(key_rows):
+        return held
+    down_id = strings.index('down') if 'down' in strings else -2
+    pressed = set()
+    state = np.zeros(len(key_rows), dtype=bool)
+    # Key rows are few next to mouse samples, a plain loop is fine here
+    for i, (key, event) in enumerate(zip(xs[key_rows].tolist(), ys[key_rows].tolist())):
+        if event == down_id:
+            pressed.add(key)
+        else:
+            pressed.discard(key)
+        state[i] = bool(pressed)
+    # Carry each key row's state forward to the rows after it
+    last_key = np.maximum.accumulate(np.where(codes == KEY, np.arange(len(codes)), -1))
+    has_key = last_key >= 0
+    held[has_key] = state[np.searchsorted(key_rows, last_key[has_key])]
+    return held
+
+
+class MacroOptimizer:
+    """Shrinks a recording without moving clicks, keys or window switches.
+
+    Stages, all on NumPy columns:
+      1. dedupe: mouse samples at the position of the sample before, and
+         repeated focus of the same window
+      2. simplify: each run of mouse samples between other actions is reduced
+         with Douglas-Peucker ('rdp') or Visvalingam-Whyatt ('visvalingam') so
+         that at every dropped sample's time the cursor is within tolerance
+         pixels of it; the first and last sample of a run are kept, and so is
+         a sample the cursor rested on (off when tolerance is None)
+      3. idle compression: gaps longer than max_idle seconds with no key held
+         are cut down to max_idle (off when max_idle is None)
+    Kept rows keep their timestamps, shifted only by the idle time removed
+    before them, so every interval that wasn't an idle gap is exact. Without
+    simplify and idle compression the result plays exactly like the input."""
+
+    METHODS = {'rdp': rdp_keep, 'visvalingam': visvalingam_keep}
+
+    def __init__(self, tolerance=2.0, method='rdp', max_idle=None, dedupe=True):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown simplification method: {method}")
+        self.tolerance = tolerance
+        self.method = method
+        self.max_idle = max_idle
+        self.dedupe = dedupe
+        self.stats = {}
+
+    def optimize(self, macro, relative=False):
+        """Optimized copy of macro as a MacroTrack; relative=True makes times start at 0"""
+        track = MacroTrack.from_actions(macro)
+        codes, xs, ys, times = track.as_numpy()
+        count = len(codes)
+        keep = np.ones(count, dtype=bool)
+        mouse = codes == MOUSE
+
+        if self.dedupe and count:
+            keep[1:] &= ~(mouse[1:] & mouse[:-1] & (xs[1:] == xs[:-1]) & (ys[1:] == ys[:-1]))
+            windows = np.flatnonzero(codes == WINDOW)
+            keep[windows[1:][xs[windows[1:]] == xs[windows[:-1]]]] = False
+
+        # Simplify on the deduped rows so runs don't contain zero-length steps
+        rows = np.flatnonzero(keep)
+        path_error = 0.0
+        if self.tolerance is not None:
+            starts, ends = mouse_runs(codes[rows])
+            fx, fy, ft = xs[rows].astype(np.float64), ys[rows].astype(np.float64), times[rows]
+            simplified = self.METHODS[self.method](fx, fy, ft, starts, ends, self.tolerance)
+            simplified |= codes[rows] != MOUSE
+            path_error = self.path_error(fx, fy, ft, simplified, codes[rows] == MOUSE)
+            rows = rows[simplified]
+
+        out_times = times[rows]
+        temporal_error, idle_removed = 0.0, 0.0
+        if self.max_idle is not None and len(rows) > 1:
+            gaps = np.diff(out_times)
+            held = held_keys_after(codes, xs, ys, track.strings)[rows[:-1]]
+            idle = (gaps > self.max_idle) & ~held
+            shift = np.concatenate(([0.0], np.cumsum(np.where(idle, gaps - self.max_idle, 0.0))))
+            out_times = out_times - shift
+            idle_removed = float(shift[-1])
+            if (~idle).any():
+                temporal_error = float(np.abs(np.diff(out_times) - gaps)[~idle].max())
+        if relative and len(out_times):
+            out_times = out_times - out_times[0]
+
+        result = MacroTrack.from_numpy(codes[rows], xs[rows], ys[rows], out_times, track.strings)
+        self.stats = {
+            'rows_in': count,
+            'rows_out': len(rows),
+            'moves_in': int(mouse.sum()),
+            'moves_out': int((codes[rows] == MOUSE).sum()),
+            'ratio': count / len(rows) if len(rows) else 1.0,
+            'max_path_error': path_error,
+            'max_temporal_error': temporal_error,
+            'idle_removed': idle_removed,
+        }
+        return result
+
+    def path_error(self, xs, ys, ts, keep, mouse):
+        """Largest distance from a dropped mouse sample to where the replacing segment puts the cursor at its time"""
+        dropped = np.flatnonzero(mouse & ~keep)
+        if not len(dropped):
+            return 0.0
+        kept = np.where(keep & mouse, np.arange(len(xs)), -1)
+        before = np.maximum.accumulate(kept)[dropped]
+        after = np.minimum.accumulate(np.where(kept >= 0, kept, len(xs))[::-1])[::-1][dropped]
+        return float(synced_distance(xs[dropped], ys[dropped], ts[dropped], xs[before], ys[before], ts[before],
+                                     xs[after], ys[after], ts[after]).max())
@@ -0,0 +1,160 @@
+import sys
+
+
+class OutputBackend:
+    """Everything playback does to the OS goes through one of these"""
+
+    fatal_errors = ()  # Exceptions that must stop playback instead of being retried
+
+    def move(self, x, y):
+        raise NotImplementedError
+
+    def click(self, button):
+        raise NotImplementedError
+
+    def key_down(self, key):
+        raise NotImplementedError
+
+    def key_up(self, key):
+        raise NotImplementedError
+
+    def focus_window(self, title):
+        """Bring the window with this title to the front; returns False if it wasn't found"""
+        raise NotImplementedError
+
+    def position(self):
+        raise NotImplementedError
+
+
+class PyAutoGuiBackend(OutputBackend):
+    """pyautogui for the mouse, keyboard for keys and win32gui for window focus (Windows)"""
+
+    def __init__(self):
+        import pyautogui
+        import keyboard
+        from Scripts.Macro.WindowCache import WindowCache, Win32WindowSystem
+        self.pyautogui = pyautogui
+        self.keyboard = keyboard
+        self.windows = WindowCache(Win32WindowSystem())
+        pyautogui.FAILSAFE = True  # Mouse to a corner still aborts playback
+        self.fatal_errors = (pyautogui.FailSafeException,)
+        pyautogui.MINIMUM_DURATION = 0  # Remove minimum sleep time
+        pyautogui.PAUSE = 0  # Remove delays between actions
+
+    def move(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def click(self, button):
+        self.pyautogui.click(button=button)
+
+    def key_down(self, key):
+        self.keyboard.press(key)
+
+    def key_up(self, key):
+        self.keyboard.release(key)
+
+    def focus_window(self, title):
+        try:
+            return self.windows.focus(title)
+        except Exception:
+            return False
+
+    def position(self):
+        return tuple(self.pyautogui.position())
+
+
+class XdotoolBackend(OutputBackend):
+    """X11 output through the xdotool command line tool, for Linux machines"""
+
+    BUTTONS = {'left': '1', 'middle': '2', 'right': '3'}
+    # keyboard library names that differ from X keysyms
+    KEYS = {'enter': 'Return', 'space': 'space', 'esc': 'Escape', 'shift': 'shift', 'ctrl': 'ctrl',
+            'alt': 'alt', 'tab': 'Tab', 'backspace': 'BackSpace', 'delete': 'Delete', 'up': 'Up',
+            'down': 'Down', 'left': 'Left', 'right': 'Right', 'caps lock': 'Caps_Lock',
+            'windows': 'super', 'page up': 'Prior', 'page down': 'Next', 'home': 'Home', 'end': 'End'}
+
+    def __init__(self, executable="xdotool"):
+        import subprocess
+        self.subprocess = subprocess
+        self.executable = executable
+
+    def run(self, *args):
+        return self.subprocess.run([self.executable, *args], capture_output=True, text=True)
+
+    def move(self, x, y):
+        self.run("mousemove", str(x), str(y))
+
+    def click(self, button):
+        self.run("click", self.BUTTONS.get(button, '1'))
+
+    def key_down(self, key):
+        self.run("keydown", self.KEYS.get(key, key))
+
+    def key_up(self, key):
+        self.run("keyup", self.KEYS.get(key, key))
+
+    def focus_window(self, title):
+        import re
+        result = self.run("search", "--limit", "1", "--name", f"^{re.escape(title)}$", "windowactivate")
+        return result.returncode == 0
+
+    def position(self):
+        fields = dict(line.split("=", 1) for line in self.run("getmouselocation", "--shell").stdout.split())
+        return int(fields['X']), int(fields['Y'])
+
+
+class NullBackend(OutputBackend):
+    """Does nothing at all; measures the playback engine on its own"""
+
+    def __init__(self):
+        self.x, self.y = 0, 0
+
+    def move(self, x, y):
+        self.x, self.y = x, y
+
+    def click(self, button):
+        pass
+
+    def key_down(self, key):
+        pass
+
+    def key_up(self, key):
+        pass
+
+    def focus_window(self, title):
+        return True
+
+    def position(self):
+        return self.x, self.y
+
+
+class RecordingBackend(NullBackend):
+    """Keeps every call in memory as (method, args...) for inspection"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def move(self, x, y):
+        self.x, self.y = x, y
+        self.calls.append(('move', x, y))
+
+    def click(self, button):
+        self.calls.append(('click', button))
+
+    def key_down(self, key):
+        self.calls.append(('key_down', key))
+
+    def key_up(self, key):
+        self.calls.append(('key_up', key))
+
+    def focus_window(self, title):
+        self.calls.append(('focus_window', title))
+        return True
+
+
+def default_backend():
+    """The real backend for this platform"""
+    if sys.platform.startswith("linux"):
+        return XdotoolBackend()
+    return PyAutoGuiBackend()
@@ -0,0 +1,275 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+from Scripts.Macro.Compiler import compile_macro
+from Scripts.Macro.OutputBackend import OutputBackend
+from Scripts.Macro.Scheduler import PlaybackScheduler
+
+
+class OutputArbiter:
+    """Shares one backend between several macros, one owner per device at a time.
+
+    Devices are the mouse, the keyboard and window focus. A macro owns a device
+    from its first call on it until it has left it alone for lease_ns, or until
+    it pauses, stops or finishes; a higher priority macro takes a device over.
+    Calls from other macros meanwhile are dropped and counted in conflicts.
+    Keys a macro still holds when it lets go are released for it, so a stopped
+    macro never leaves a key down. All calls come from the manager's one thread,
+    so output is serialized without locking."""
+
+    def __init__(self, backend, lease_ns=250_000_000, clock=time.perf_counter_ns):
+        self.backend = backend
+        self.lease_ns = lease_ns
+        self.clock = clock
+        self.owners = {}  # device -> (handle, last use)
+        self.held = {}  # handle -> keys it holds down
+        self.conflicts = 0
+
+    def claim(self, handle, device):
+        now = self.clock()
+        owner = self.owners.get(device)
+        if owner is not None and owner[0] is not handle:
+            holder = owner[0]
+            expired = now - owner[1] >= self.lease_ns and not (device == 'keyboard' and self.held.get(holder))
+            if not expired and holder.priority >= handle.priority:
+                self.conflicts += 1
+                return False
+            if device == 'keyboard':
+                self.release_keys(holder)
+        self.owners[device] = (handle, now)
+        return True
+
+    def release(self, handle):
+        """Give up every device handle owns and lift its held keys"""
+        self.release_keys(handle)
+        self.owners = {device: owner for device, owner in self.owners.items() if owner[0] is not handle}
+
+    def release_keys(self, handle):
+        for key in self.held.pop(handle, ()):
+            self.backend.key_up(key)
+
+    def backend_for(self, handle):
+        return ArbitratedBackend(self, handle)
+
+
+class ArbitratedBackend(OutputBackend):
+    """What one macro's compiled program calls; every call goes past the arbiter"""
+
+    def __init__(self, arbiter, handle):
+        self.arbiter = arbiter
+        self.handle = handle
+        self.backend = arbiter.backend
+
+    def move(self, x, y):
+        if self.arbiter.claim(self.handle, 'mouse'):
+            self.backend.move(x, y)
+
+    def click(self, button):
+        if self.arbiter.claim(self.handle, 'mouse'):
+            self.backend.click(button)
+
+    def key_down(self, key):
+        if self.arbiter.claim(self.handle, 'keyboard'):
+            self.backend.key_down(key)
+            self.arbiter.held.setdefault(self.handle, set()).add(key)
+
+    def key_up(self, key):
+        held = self.arbiter.held.get(self.handle, ())
+        # Letting go of our own key is always allowed
+        if key in held or self.arbiter.claim(self.handle, 'keyboard'):
+            self.backend.key_up(key)
+            if key in held:
+                held.discard(key)
+
+    def focus_window(self, title):
+        if self.arbiter.claim(self.handle, 'window'):
+            return self.backend.focus_window(title)
+        return False
+
+    def position(self):
+        return self.backend.position()
+
+
+class MacroHandle:
+    """One macro running in a PlaybackManager. The controls are safe from any thread.
+
+    state is 'waiting' until the manager picks it up, then 'playing', 'paused',
+    'stopped' or 'finished'. loops=None repeats until stopped."""
+
+    def __init__(self, manager, name, loops, speed, priority):
+        self.manager = manager
+        self.name = name
+        self.loops = loops
+        self.speed = speed
+        self.priority = priority
+        self.state = 'waiting'
+        self.program = None
+        self.offsets = []
+        self.duration = 0
+        self.origin = 0
+        self.paused_at = 0
+        self.index = 0
+        self.loop = 0
+        self.generation = 0  # Bumped on pause/stop so heap entries already queued are ignored
+        self.played = 0
+        self.done = threading.Event()
+
+    def pause(self):
+        self.manager.command(self._pause)
+
+    def resume(self):
+        self.manager.command(self._resume)
+
+    def stop(self):
+        self.manager.command(self._stop)
+
+    def set_loops(self, loops):
+        self.manager.command(lambda: setattr(self, 'loops', loops))
+
+    def wait(self, timeout=None):
+        """Block until the macro finished or was stopped; returns False on timeout"""
+        return self.done.wait(timeout)
+
+    def deadline(self):
+        return self.origin + self.loop * self.duration + self.offsets[self.index]
+
+    # Everything below runs on the manager thread
+
+    def _start(self):
+        if self.state != 'waiting':
+            return
+        if not self.offsets or self.loops == 0:
+            self._end('finished')
+            return
+        self.state = 'playing'
+        self.origin = self.manager.scheduler.clock()
+        self.manager.push(self)
+
+    def _pause(self):
+        if self.state == 'playing':
+            self.state = 'paused'
+            self.paused_at = self.manager.scheduler.clock()
+            self.generation += 1
+            self.manager.arbiter.release(self)
+
+    def _resume(self):
+        if self.state == 'paused':
+            self.state = 'playing'
+            self.origin += self.manager.scheduler.clock() - self.paused_at  # The timeline waits for us
+            self.manager.push(self)
+
+    def _stop(self):
+        if self.state in ('waiting', 'playing', 'paused'):
+            self._end('stopped')
+
+    def _end(self, state):
+        self.state = state
+        self.generation += 1
+        self.manager.arbiter.release(self)
+        self.done.set()
+
+    def _step(self):
+        """Run the due action and queue the next one"""
+        self.program.calls[self.index](*self.program.args[self.index])
+        self.played += 1
+        self.index += 1
+        if self.index == len(self.offsets):
+            self.index = 0
+            self.loop += 1
+            if self.loops is not None and self.loop >= self.loops:
+                self._end('finished')
+                return
+        self.manager.push(self)
+
+
+class PlaybackManager:
+    """Plays any number of macros at once on a single scheduler thread.
+
+    Every playing macro has exactly one entry in a heap keyed on the absolute
+    deadline of its next action, so the thread always waits for whichever macro
+    is due first and their timelines interleave without a thread per macro.
+    Output goes through an OutputArbiter. Controls (add, pause, resume, stop)
+    are queued as commands and applied by the thread between actions."""
+
+    def __init__(self, backend, scheduler=None, exit_when_idle=True):
+        self.arbiter = OutputArbiter(backend)
+        self.scheduler = scheduler or PlaybackScheduler()
+        self.exit_when_idle = exit_when_idle  # Once no macro is waiting, playing or paused; else wait for stop()
+        self.handles = []
+        self.heap = []
+        self.order = itertools.count()  # Tie-breaker for equal deadlines
+        self.commands = deque()
+        self.changed = False
+        self.running = False
+        self.thread = None
+        self.wake = threading.Event()
+
+    def add(self, actions, loops=1, name=None, speed=1.0, timeline=None, priority=0):
+        """Compile actions for this manager and start playing them; returns their MacroHandle"""
+        handle = MacroHandle(self, name or f"macro {len(self.handles) + 1}", loops, speed, priority)
+        handle.program = compile_macro(actions, self.arbiter.backend_for(handle), timeline)
+        scale = speed * self.scheduler.speed
+        handle.offsets = [int(offset / scale) for offset in handle.program.offsets]
+        handle.duration = int(handle.program.duration_ns / scale)
+        if loops is None and not handle.duration:
+            handle.loops = 1  # Repeating a zero-length macro forever would never yield
+        self.handles.append(handle)
+        self.command(handle._start)
+        return handle
+
+    def command(self, function):
+        self.commands.append(function)
+        self.changed = True
+        self.wake.set()
+
+    def push(self, handle):
+        heapq.heappush(self.heap, (handle.deadline(), next(self.order), handle.generation, handle))
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop every macro and the thread"""
+        for handle in self.handles:
+            handle.stop()
+        self.command(lambda: setattr(self, 'running', False))
+        self.wait()
+
+    def wait(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def run(self):
+        self.running = True
+        heap, scheduler = self.heap, self.scheduler
+        keep_waiting = lambda: self.running and not self.changed
+        while self.running:
+            if self.changed:
+                self.changed = False
+                while self.commands:
+                    self.commands.popleft()()
+                continue
+            if not heap:
+                if self.exit_when_idle and not any(handle.state in ('waiting', 'paused') for handle in self.handles):
+                    break  # A paused macro has no heap entry but still needs the thread to resume it
+                self.wake.wait(scheduler.max_sleep)
+                self.wake.clear()
+                continue
+            deadline, _, generation, handle = heap[0]
+            if generation != handle.generation:
+                heapq.heappop(heap)  # Paused or stopped since it was queued
+                continue
+            if not scheduler.wait_until(deadline, keep_waiting):
+                continue  # A command arrived, apply it before playing on
+            heapq.heappop(heap)
+            handle._step()
+        self.running = False
+
+    def stats(self):
+        return {'macros': len(self.handles), 'played': sum(handle.played for handle in self.handles),
+                'conflicts': self.arbiter.conflicts, 'lateness': self.scheduler.stats()}
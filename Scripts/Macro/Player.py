@@ -0,0 +1,249 @@
+import bisect
+import time
+
+from Scripts.Macro.Scheduler import PlaybackScheduler
+from Scripts.Macro.Compiler import compile_macro
+from Scripts.Macro.ScreenMatch import ConditionTimeout
+
+
+class ActionRetry:
+    """A MacroPlayer retry: up to attempts calls per action, catching and counting what the backend raises.
+
+    It never touches the UI, so it is safe on the player thread; read retried,
+    failed and last_error (or summary()) once playback is over. fatal errors
+    are not retried but raised, so they still stop playback."""
+
+    def __init__(self, attempts=3, delay=0.1, fatal=(), sleep=time.sleep):
+        self.attempts = attempts
+        self.delay = delay  # Seconds between attempts
+        self.fatal = fatal
+        self.sleep = sleep
+        self.retried = 0  # Actions that succeeded after failing at least once
+        self.failed = 0  # Actions that failed every attempt
+        self.last_error = None
+
+    def __call__(self, call, args):
+        for attempt in range(1, self.attempts + 1):
+            try:
+                call(*args)
+            except self.fatal:
+                raise
+            except Exception as e:
+                self.last_error = e
+                if attempt < self.attempts:
+                    self.sleep(self.delay)
+                continue
+            if attempt > 1:
+                self.retried += 1
+            return attempt
+        self.failed += 1
+        return 0
+
+    def summary(self):
+        """One line about the actions that needed retries, None if all went through first time"""
+        if not self.retried and not self.failed:
+            return None
+        text = f"{self.retried} actions needed retries, {self.failed} failed after {self.attempts} attempts"
+        return text if self.last_error is None else f"{text} (last error: {self.last_error})"
+
+
+class MacroPlayer:
+    """Plays a sequence of actions through an OutputBackend on a PlaybackScheduler"""
+
+    def __init__(self, backend, scheduler=None, trace=None, retry=None, watcher=None):
+        self.backend = backend
+        self.scheduler = scheduler or PlaybackScheduler()
+        self.trace = trace  # PlaybackTrace to record per-action timings into, None for none
+        self.retry = retry  # retry(call, args) -> attempt it succeeded on, 0 if none; None calls once
+        self.watcher = watcher  # ScreenMatch.ScreenWatcher for screen conditions, None skips them
+
+    def play(self, actions, loops=1, keep_playing=None, timeline=None, start_time=None):
+        """Compile and play actions; returns False if keep_playing() stopped it early.
+
+        A screen wait that times out raises ScreenMatch.ConditionTimeout instead.
+
+        timeline is the (first, last) timestamp pair to loop over. It defaults to
+        the actions themselves but can be passed when actions were derived from a
+        longer macro (e.g. coalesced) and loops must keep the original length.
+        start_time starts the first loop from that timestamp instead of the top."""
+        program = compile_macro(actions, self.backend, timeline, self.watcher)
+        start_ns = 0
+        if start_time is not None and len(actions):
+            first_action_time = timeline[0] if timeline else actions[0][3]
+            start_ns = max(0, int(round((start_time - first_action_time) * 1e9)))
+        return self.play_compiled(program, loops, keep_playing, start_ns)
+
+    def play_compiled(self, program, loops=1, keep_playing=None, start_ns=0):
+        """Play a CompiledMacro; every loop reuses the same program.
+
+        start_ns skips into the first loop: its actions before that offset are not
+        played and the rest keep their timing relative to it."""
+        if not len(program):
+            return True
+        scheduler = self.scheduler
+        wait_until = scheduler.wait_until
+        speed = scheduler.speed
+        # Scale once per playback instead of once per action
+        offsets = program.offsets if speed == 1 else [int(offset / speed) for offset in program.offsets]
+        duration = int(program.duration_ns / speed)
+        steps = list(zip(offsets, program.calls, program.args))
+        # The offsets are in timestamp order, so the first action to play is a bisect away
+        first = bisect.bisect_left(program.offsets, start_ns) if start_ns else 0
+        scheduler.start()
+        origin = scheduler.origin - int(start_ns / speed)
+        if program.conditions:
+            return self.play_conditional(program, steps, loops, duration, keep_playing, origin, first)
+        if self.trace is not None or self.retry is not None:
+            return self.play_instrumented(program, steps, loops, duration, keep_playing, origin, first)
+        for loop in range(loops):
+            # Every deadline is measured from the same origin, so overshoot never adds up
+            loop_start = origin + loop * duration
+            for offset, call, args in (steps[first:] if loop == 0 and first else steps):
+                if keep_playing is not None and not keep_playing():
+                    return False
+                if not wait_until(loop_start + offset, keep_playing):
+                    return False
+                call(*args)
+        return True
+
+    def play_instrumented(self, program, steps, loops, duration, keep_playing, origin, first=0):
+        """The playback loop with retries and timing; kept apart so plain playback pays nothing for it"""
+        scheduler = self.scheduler
+        wait_until, clock = scheduler.wait_until, scheduler.clock
+        retry, trace = self.retry, self.trace
+        record = None
+        if trace is not None:
+            trace.begin(program, origin)
+            record = trace.record
+        for loop in range(loops):
+            loop_start = origin + loop * duration
+            skip = first if loop == 0 else 0
+            for index, (offset, call, args) in enumerate(steps[skip:] if skip else steps, skip):
+                if keep_playing is not None and not keep_playing():
+                    return False
+                deadline = loop_start + offset
+                if not wait_until(deadline, keep_playing):
+                    return False
+                started = clock()
+                if retry is None:
+                    call(*args)
+                    attempts = 1
+                else:
+                    attempts = retry(call, args)
+                if record is not None:
+                    record(index, loop, deadline, started, clock(), attempts)
+        return True
+
+    def play_conditional(self, program, steps, loops, duration, keep_playing, origin, first=0):
+        """The playback loop for macros with screen conditions.
+
+        A condition step is called with keep_playing as well. A wait that times
+        out ends playback with ConditionTimeout, so it is not mistaken for a
+        stop (which returns False); a branch whose pixel does not match skips the actions
+        of its next skip_ns. Afterwards the rest of the timeline moves by the time
+        the condition took, less any time skipped, so what follows a wait keeps
+        its spacing from the moment the screen matched. Retries and the trace
+        work as in play_instrumented."""
+        scheduler = self.scheduler
+        wait_until, clock, speed = scheduler.wait_until, scheduler.clock, scheduler.speed
+        retry, trace = self.retry, self.trace
+        record = None
+        if trace is not None:
+            trace.begin(program, origin)
+            record = trace.record
+        conditions, offsets = program.conditions, program.offsets
+        count = len(steps)
+        shift = 0  # ns the conditions have moved the timeline by so far
+        for loop in range(loops):
+            loop_start = origin + loop * duration
+            index = first if loop == 0 else 0
+            while index < count:
+                offset, call, args = steps[index]
+                if keep_playing is not None and not keep_playing():
+                    return False
+                deadline = loop_start + shift + offset
+                if not wait_until(deadline, keep_playing):
+                    return False
+                started = clock()
+                if index in conditions:
+                    matched = call(*args, keep_playing)
+                    if record is not None:
+                        record(index, loop, deadline, started, clock(), 1)
+                    if keep_playing is not None and not keep_playing():
+                        return False
+                    shift += clock() - deadline
+                    if not matched:
+                        skip_ns = conditions[index]
+                        if skip_ns is None:
+                            raise ConditionTimeout(args[0])
+                        shift -= min(int(skip_ns / speed), duration - offset)  # Not into the next loop
+                        index = bisect.bisect_left(offsets, offsets[index] + skip_ns, index + 1)
+                        continue
+                else:
+                    if retry is None:
+                        call(*args)
+                        attempts = 1
+                    else:
+                        attempts = retry(call, args)
+                    if record is not None:
+                        record(index, loop, deadline, started, clock(), attempts)
+                index += 1
+        return True
+
+    def play_stream(self, reader, loops=1, keep_playing=None, prefetch=2):
+        """Play a MacroStream.StreamReader without loading it; returns False if stopped early.
+
+        A background thread reads and compiles the next prefetch chunks while the
+        current one plays, so memory stays flat however long the recording is.
+        Deadlines come from one origin exactly like play_compiled. Retries apply,
+        a trace is not recorded."""
+        timeline = reader.timeline()
+        if timeline is None:
+            return True
+        scheduler = self.scheduler
+        wait_until, speed, retry = scheduler.wait_until, scheduler.speed, self.retry
+        backend = self.backend
+        duration = int(round((timeline[1] - timeline[0]) * 1e9) / speed)
+
+        def compile_chunk(chunk):
+            program = compile_macro(chunk, backend, timeline)
+            offsets = program.offsets if speed == 1 else [int(offset / speed) for offset in program.offsets]
+            return list(zip(offsets, program.calls, program.args))
+
+        scheduler.start()
+        origin = scheduler.origin
+        for loop in range(loops):
+            loop_start = origin + loop * duration
+            chunks = reader.prefetched(compile_chunk, prefetch)
+            try:
+                for steps in chunks:
+                    for offset, call, args in steps:
+                        if keep_playing is not None and not keep_playing():
+                            return False
+                        if not wait_until(loop_start + offset, keep_playing):
+                            return False
+                        if retry is None:
+                            call(*args)
+                        else:
+                            retry(call, args)
+            finally:
+                chunks.close()
+        return True
+
+    def perform(self, action):
+        """Run a single action straight away, without compiling"""
+        backend = self.backend
+        action_type = action[0]
+        if action_type == 'window_focus':
+            backend.focus_window(action[1])
+
+        elif action_type in ('mouse', 'left_click', 'right_click', 'middle_click'):
+            backend.move(action[1], action[2])
+            if action_type != 'mouse':
+                backend.click(action_type.split('_')[0])
+
+        elif action_type == 'key':
+            if action[2] == 'down':
+                backend.key_down(action[1])
+            else:
+                backend.key_up(action[1])
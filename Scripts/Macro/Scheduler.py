@@ -0,0 +1,49 @@
+import time
+from array import array
+
+from Scripts.Macro.Trace import summary
+
+
+class PlaybackScheduler:
+    """Waits for absolute deadlines so sleep overshoot never accumulates.
+
+    Every action gets a deadline measured from one origin taken at start(), so a
+    late action does not push the next one back. Waiting is a coarse sleep up to
+    spin_ns before the deadline, then a short spin on the clock. The lateness of
+    every wait is kept for stats()."""
+
+    def __init__(self, speed=1.0, spin_ns=1_500_000, max_sleep=0.05,
+                 clock=time.perf_counter_ns, sleep=time.sleep):
+        self.speed = speed
+        self.spin_ns = spin_ns
+        self.max_sleep = max_sleep  # Longest single sleep, so stop requests are noticed quickly
+        self.clock = clock
+        self.sleep = sleep
+        self.origin = 0
+        self.lateness = array('q')  # ns per wait, 8 bytes each however long the playback runs
+
+    def start(self):
+        self.origin = self.clock()
+        self.lateness = array('q')
+
+    def deadline(self, offset):
+        """Absolute deadline in ns for an action offset (seconds) into the playback"""
+        return self.origin + int(offset * 1e9 / self.speed)
+
+    def wait_until(self, deadline, keep_waiting=None):
+        """Sleep/spin until deadline; returns False if keep_waiting() turned False first"""
+        clock, sleep = self.clock, self.sleep
+        remaining = deadline - clock()
+        while remaining > self.spin_ns:
+            if keep_waiting is not None and not keep_waiting():
+                return False
+            sleep(min((remaining - self.spin_ns) / 1e9, self.max_sleep))
+            remaining = deadline - clock()
+        while remaining > 0:
+            remaining = deadline - clock()
+        self.lateness.append(-remaining)
+        return True
+
+    def stats(self):
+        """Lateness of the waits so far, in milliseconds"""
+        return summary(self.lateness)
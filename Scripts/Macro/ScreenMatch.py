@@ -0,0 +1,252 @@
+"""Screen conditions for macros: wait until a region matches, branch on a pixel.
+
+Two action types carry a condition spec in their first field:
+
+    ('wait_region', spec, None, t)   hold playback until the region shows the
+                                     stored image, then go on from that moment
+    ('if_pixel', spec, None, t)      if the pixel does not show the stored
+                                     colour, skip the actions of the next few seconds
+
+A spec is one line of key=value fields:
+
+    region=100,200,64,32 tolerance=8 timeout=10 image=<base64 of zlib'd RGB rows>
+    pixel=640,400 color=ff8800 tolerance=8 skip=1.5
+
+Only the region of interest is ever grabbed. A frame is compared with the
+image in two NumPy steps: a thumbnail of every stride-th pixel first, which
+turns down almost every non-matching frame for a small fraction of the work,
+then every pixel. Both steps use the same per-channel tolerance, so the
+thumbnail only ever rejects frames the full compare would reject as well.
+"""
+import base64
+import threading
+import time
+import zlib
+
+CONDITION_ACTIONS = ('wait_region', 'if_pixel')
+
+
+class ConditionTimeout(Exception):
+    """A wait_region whose region did not show its image before the timeout; playback ends with it"""
+
+    def __init__(self, match):
+        super().__init__(f"region {match.x},{match.y} {match.width}x{match.height} "
+                         f"did not match within {match.timeout:g} s")
+        self.match = match
+
+
+def has_conditions(actions):
+    """Whether actions hold a screen condition; a byte search of the code column for a MacroTrack"""
+    from Scripts.Macro.MacroTrack import MacroTrack, ACTION_CODES
+    if isinstance(actions, MacroTrack):
+        codes = actions.codes.tobytes()
+        return any(bytes([ACTION_CODES[name]]) in codes for name in CONDITION_ACTIONS)
+    return any(action[0] in CONDITION_ACTIONS for action in actions)
+
+
+def within(a, b, tolerance):
+    """Whether every channel of two uint8 arrays differs by at most tolerance"""
+    import numpy as np
+    # max - min never wraps, so the difference stays uint8 without an upcast to int16
+    return int((np.maximum(a, b) - np.minimum(a, b)).max()) <= tolerance
+
+
+class ScreenSource:
+    """Where screen pixels come from; swap for a SyntheticScreen in tests and benchmarks"""
+
+    def grab(self, x, y, width, height):
+        """RGB pixels of the rectangle as a (height, width, 3) uint8 NumPy array"""
+        raise NotImplementedError
+
+
+class MssScreen(ScreenSource):
+    """mss (Windows, macOS and X11), which copies only the requested rectangle"""
+
+    def __init__(self):
+        import mss
+        self.mss = mss
+        self.local = threading.local()  # An mss handle belongs to the thread that opened it
+
+    def grab(self, x, y, width, height):
+        import numpy as np
+        grabber = getattr(self.local, 'grabber', None)
+        if grabber is None:
+            grabber = self.local.grabber = self.mss.mss()
+        shot = grabber.grab({'left': x, 'top': y, 'width': width, 'height': height})
+        return np.frombuffer(shot.bgra, dtype=np.uint8).reshape(height, width, 4)[:, :, 2::-1]
+
+
+class PyAutoGuiScreen(ScreenSource):
+    """pyautogui.screenshot with a region; slower than mss but needs nothing extra"""
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def grab(self, x, y, width, height):
+        import numpy as np
+        return np.asarray(self.pyautogui.screenshot(region=(x, y, width, height)).convert('RGB'))
+
+
+class SyntheticScreen(ScreenSource):
+    """An in-memory framebuffer for headless runs.
+
+    Drawing is thread safe and stamps changed_at with the clock, so the time
+    from a screen change to the action it releases can be measured."""
+
+    def __init__(self, width=1920, height=1080, clock=time.perf_counter_ns):
+        import numpy as np
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        self.clock = clock
+        self.changed_at = None
+        self.grabs = 0
+        self.lock = threading.Lock()
+
+    def fill(self, x, y, width, height, color):
+        with self.lock:
+            self.pixels[y:y + height, x:x + width] = color
+            self.changed_at = self.clock()
+
+    def paste(self, x, y, image):
+        with self.lock:
+            self.pixels[y:y + image.shape[0], x:x + image.shape[1]] = image
+            self.changed_at = self.clock()
+
+    def grab(self, x, y, width, height):
+        with self.lock:
+            self.grabs += 1
+            return self.pixels[y:y + height, x:x + width].copy()
+
+
+def default_screen():
+    """mss when it is installed, pyautogui otherwise"""
+    try:
+        return MssScreen()
+    except ImportError:
+        return PyAutoGuiScreen()
+
+
+class RegionMatch:
+    """A rectangle that must show image, every channel within tolerance. Waited for up to timeout seconds."""
+
+    def __init__(self, x, y, image, tolerance=8, timeout=10.0, stride=8):
+        import numpy as np
+        self.x, self.y = x, y
+        self.image = np.ascontiguousarray(image, dtype=np.uint8)
+        self.height, self.width = self.image.shape[:2]
+        self.tolerance = tolerance
+        self.timeout = timeout
+        self.stride = stride
+        self.thumbnail = self.image[::stride, ::stride]
+        self.rejected = 0  # Frames the thumbnail turned down
+
+    def region(self):
+        return self.x, self.y, self.width, self.height
+
+    def matches(self, frame):
+        if frame.shape != self.image.shape:
+            return False  # Partly off screen
+        stride = self.stride
+        if not within(frame[::stride, ::stride], self.thumbnail, self.tolerance):
+            self.rejected += 1
+            return False
+        return within(frame, self.image, self.tolerance)
+
+    def spec(self):
+        image = base64.b64encode(zlib.compress(self.image.tobytes())).decode('ascii')
+        return (f"region={self.x},{self.y},{self.width},{self.height} tolerance={self.tolerance} "
+                f"timeout={self.timeout:g} image={image}")
+
+    def action(self, t):
+        return ('wait_region', self.spec(), None, t)
+
+
+class PixelMatch:
+    """One pixel that must show color, every channel within tolerance; skip seconds are skipped if not"""
+
+    def __init__(self, x, y, color, tolerance=8, skip=0.0):
+        import numpy as np
+        self.x, self.y = x, y
+        self.color = np.array(color, dtype=np.uint8).reshape(1, 1, 3)
+        self.tolerance = tolerance
+        self.skip = skip
+
+    def region(self):
+        return self.x, self.y, 1, 1
+
+    def matches(self, frame):
+        return frame.shape == self.color.shape and within(frame, self.color, self.tolerance)
+
+    def spec(self):
+        return (f"pixel={self.x},{self.y} color={self.color.tobytes().hex()} "
+                f"tolerance={self.tolerance} skip={self.skip:g}")
+
+    def action(self, t):
+        return ('if_pixel', self.spec(), None, t)
+
+
+def parse_condition(spec):
+    """The RegionMatch or PixelMatch a spec describes"""
+    import numpy as np
+    fields = dict(field.split('=', 1) for field in spec.split())
+    tolerance = int(fields.get('tolerance', 8))
+    if 'region' in fields:
+        x, y, width, height = map(int, fields['region'].split(','))
+        image = np.frombuffer(zlib.decompress(base64.b64decode(fields['image'])), dtype=np.uint8)
+        return RegionMatch(x, y, image.reshape(height, width, 3), tolerance, float(fields.get('timeout', 10)))
+    if 'pixel' in fields:
+        x, y = map(int, fields['pixel'].split(','))
+        return PixelMatch(x, y, list(bytes.fromhex(fields['color'])), tolerance, float(fields.get('skip', 0)))
+    raise ValueError(f"Not a screen condition: {spec[:60]}")
+
+
+def capture_region(source, x, y, width, height, **options):
+    """A RegionMatch for what the rectangle shows right now"""
+    return RegionMatch(x, y, source.grab(x, y, width, height), **options)
+
+
+def capture_pixel(source, x, y, **options):
+    """A PixelMatch for the colour the pixel has right now"""
+    return PixelMatch(x, y, source.grab(x, y, 1, 1).reshape(3), **options)
+
+
+class ScreenWatcher:
+    """Checks screen conditions against a ScreenSource during playback.
+
+    A waiting condition grabs its region at most poll_hz times a second (0 for
+    back to back); when a grab takes longer than the poll period the next one
+    starts straight away. The source defaults to default_screen() on first use."""
+
+    def __init__(self, source=None, poll_hz=60, clock=time.perf_counter_ns, sleep=time.sleep):
+        self.source = source
+        self.poll_hz = poll_hz
+        self.clock = clock
+        self.sleep = sleep
+        self.polls = 0
+
+    def test(self, match):
+        if self.source is None:
+            self.source = default_screen()
+        self.polls += 1
+        return match.matches(self.source.grab(*match.region()))
+
+    def check(self, match, keep_waiting=None):
+        """One grab; True if match shows"""
+        return self.test(match)
+
+    def wait(self, match, keep_waiting=None):
+        """Poll until match shows; returns False on its timeout or once keep_waiting() turns False"""
+        clock = self.clock
+        period = int(1e9 / self.poll_hz) if self.poll_hz else 0
+        next_poll = clock()
+        end = next_poll + int(match.timeout * 1e9)
+        while not self.test(match):
+            now = clock()
+            if now >= end or (keep_waiting is not None and not keep_waiting()):
+                return False
+            next_poll += period
+            if next_poll > now:
+                self.sleep((min(next_poll, end) - now) / 1e9)
+            else:
+                next_poll = now
+        return True
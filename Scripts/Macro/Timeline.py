@@ -0,0 +1,304 @@
+import bisect
+import math
+import operator
+from array import array
+
+from Scripts.Macro.MacroTrack import ACTION_CODES
+
+POSITION_CODES = frozenset(ACTION_CODES[name] for name in ('mouse', 'left_click', 'right_click', 'middle_click'))
+LABEL_GAP = 1 << 32  # Label spacing of a fresh index: 32 halvings before an insert has to relabel
+MIN_GAP = LABEL_GAP >> 8  # Spacing a relabelled window must get back to
+CELL_SIZE = 16  # Spatial grid cell, in pixels
+
+
+class MacroTimeline:
+    """Index over a MacroTrack: stable action ids, timestamp seek and a spatial grid.
+
+    Every action gets an id that survives inserts and deletes around it. Next to
+    the ids the index keeps an order label per row, strictly increasing down the
+    track, so the row of an id is a bisect over the labels instead of a scan.
+    Seeking to a timestamp bisects the track's own times column while it is in
+    order (the index counts rows that are earlier than the row above). Mouse and
+    click positions are bucketed in a grid of CELL_SIZE cells for hit-testing.
+
+    A fresh index costs next to nothing: until the first insert or delete inside
+    the track, the id of row r is (r + 1) * LABEL_GAP and is its own label, so the
+    id and label arrays are only made once the rows start moving. The grid and
+    the count of out-of-order rows are likewise built by the first hit test and
+    the first seek.
+
+    The track calls back into its timeline on every mutation, the way it does
+    for its journal, so edits made directly on the track keep the index right.
+    Python-level work per edit is O(log n + k); shifting the rows after an insert
+    or delete is a memmove inside the arrays."""
+
+    def __init__(self, track, cell_size=CELL_SIZE):
+        self.track = track
+        self.cell_size = cell_size
+        self.ids = None  # row -> id, None while every id is still (row + 1) * LABEL_GAP
+        self.labels = None  # row -> order label, strictly increasing down the rows
+        self.label_of = {}  # id -> label, only for ids that are not their own label
+        self.pristine = len(track)  # Rows covered by the formula while ids is None
+        self.next_id = 0
+        self.relabels = 0
+        self.grid = None  # (cell x, cell y) -> {id: (x, y)} of the positional actions, built by the first hit()
+        self.inversions = None  # Rows earlier than the row above, counted by the first seek
+        self.time_order = None  # (times, rows) sorted by time, only built while inversions > 0
+        track.timeline = self
+
+    @classmethod
+    def of(cls, track):
+        """The timeline attached to track, built on first use"""
+        return track.timeline if track.timeline is not None else cls(track)
+
+    def materialize(self):
+        """Turn the formula ids into real id and label arrays, before rows move"""
+        if self.ids is None:
+            self.ids = array('q', range(LABEL_GAP, (self.pristine + 1) * LABEL_GAP, LABEL_GAP))
+            self.labels = array('q', self.ids)  # Every id starts out as its own label
+            self.next_id = (self.pristine + 1) * LABEL_GAP
+
+    def build_grid(self):
+        track, cell_size = self.track, self.cell_size
+        ids = self.ids if self.ids is not None else range(LABEL_GAP, (len(track) + 1) * LABEL_GAP, LABEL_GAP)
+        grid = {}
+        for action_id, code, x, y in zip(ids, track.codes, track.xs, track.ys):
+            if code in POSITION_CODES:
+                cell = grid.get((x // cell_size, y // cell_size))
+                if cell is None:
+                    cell = grid[(x // cell_size, y // cell_size)] = {}
+                cell[action_id] = (x, y)
+        self.grid = grid
+
+    def relabel(self, start, stop):
+        """Spread out the labels of rows start..stop-1 and enough rows around them.
+
+        The window doubles until the labels around it leave at least MIN_GAP
+        per row inside, so repeated inserts at one spot relabel a few neighbours
+        instead of the whole track; ids do not change."""
+        labels, count = self.labels, len(self.labels)
+        size = max(stop - start, 1)
+        while True:
+            low_row, high_row = max(0, start - size), min(count, stop + size)
+            low = labels[low_row - 1] if low_row else 0
+            if high_row == count:
+                high = max(labels[count - 1], low) + (high_row - low_row + 1) * LABEL_GAP
+            else:
+                high = labels[high_row]
+            step = (high - low) // (high_row - low_row + 1)
+            if step >= MIN_GAP or (low_row == 0 and high_row == count):
+                break
+            size *= 2
+        labels[low_row:high_row] = array('q', (low + step * (k + 1) for k in range(high_row - low_row)))
+        label_of = self.label_of
+        for action_id, label in zip(self.ids[low_row:high_row], labels[low_row:high_row]):
+            if action_id == label:
+                label_of.pop(action_id, None)
+            else:
+                label_of[action_id] = label
+        self.relabels += 1
+
+    def inverted(self, row):
+        times = self.track.times
+        return 1 if 0 < row < len(times) and times[row] < times[row - 1] else 0
+
+    def grid_add(self, action_id, x, y):
+        self.grid.setdefault((x // self.cell_size, y // self.cell_size), {})[action_id] = (x, y)
+
+    def grid_remove(self, action_id, x, y):
+        key = (x // self.cell_size, y // self.cell_size)
+        cell = self.grid.get(key)
+        if cell is not None:
+            cell.pop(action_id, None)
+            if not cell:
+                del self.grid[key]
+
+    # Called by MacroTrack
+
+    def on_insert(self, index, count=1):
+        """Rows index..index+count-1 were just inserted"""
+        track = self.track
+        if self.ids is None and index == self.pristine:
+            self.pristine += count  # Appending keeps the formula ids
+        else:
+            self.materialize()
+            ids = array('q', range(self.next_id, self.next_id + count))
+            self.next_id += count
+            low = self.labels[index - 1] if index else 0
+            high = self.labels[index] if index < len(self.labels) else low + (count + 1) * LABEL_GAP
+            step = (high - low) // (count + 1)
+            self.ids[index:index] = ids
+            self.labels[index:index] = array('q', (low + step * (k + 1) for k in range(count)))
+            if step < 1:
+                self.relabel(index, index + count)
+            else:
+                self.label_of.update(zip(ids, self.labels[index:index + count]))
+        if self.grid is not None:
+            codes, xs, ys = track.codes, track.xs, track.ys
+            for row in range(index, index + count):
+                if codes[row] in POSITION_CODES:
+                    self.grid_add(self.id_at(row), xs[row], ys[row])
+        if self.inversions is not None:
+            # The pair the block was inserted into is no longer adjacent
+            times = track.times
+            after = index + count
+            before = 1 if index and after < len(times) and times[after] < times[index - 1] else 0
+            self.inversions += sum(self.inverted(row) for row in range(index, after + 1)) - before
+        self.time_order = None
+
+    def on_delete(self, start, stop):
+        """Rows start..stop-1 are about to be deleted"""
+        self.materialize()
+        track = self.track
+        codes, xs, ys, times = track.codes, track.xs, track.ys, track.times
+        label_of, grid = self.label_of, self.grid
+        if label_of or grid is not None:
+            for row in range(start, stop):
+                action_id = self.ids[row]
+                label_of.pop(action_id, None)
+                if grid is not None and codes[row] in POSITION_CODES:
+                    self.grid_remove(action_id, xs[row], ys[row])
+        if self.inversions is not None:
+            after = 1 if start and stop < len(times) and times[stop] < times[start - 1] else 0
+            self.inversions += after - sum(self.inverted(row) for row in range(start, stop + 1))
+        del self.ids[start:stop]
+        del self.labels[start:stop]
+        self.time_order = None
+
+    def on_set(self, index, old_code, old_x, old_y, old_time):
+        """Row index was just overwritten; old_* are its previous columns"""
+        track = self.track
+        if self.grid is not None:
+            action_id = self.id_at(index)
+            if old_code in POSITION_CODES:
+                self.grid_remove(action_id, old_x, old_y)
+            if track.codes[index] in POSITION_CODES:
+                self.grid_add(action_id, track.xs[index], track.ys[index])
+        times = track.times
+        new_time = times[index]
+        if new_time != old_time and self.inversions is not None:
+            times[index] = old_time
+            before = self.inverted(index) + self.inverted(index + 1)
+            times[index] = new_time
+            self.inversions += self.inverted(index) + self.inverted(index + 1) - before
+        if new_time != old_time:
+            self.time_order = None
+
+    # Lookups
+
+    def id_at(self, row):
+        return self.ids[row] if self.ids is not None else (row + 1) * LABEL_GAP
+
+    def row_of(self, action_id):
+        """Current row of an action id, None once it was deleted"""
+        if self.ids is None:
+            row, remainder = divmod(action_id, LABEL_GAP)
+            return row - 1 if not remainder and 0 < row <= len(self.track) else None
+        row = bisect.bisect_left(self.labels, self.label_of.get(action_id, action_id))
+        # A deleted id's label may since have been given to another row
+        return row if row < len(self.ids) and self.ids[row] == action_id else None
+
+    def in_order(self):
+        """Whether the timestamps never go backwards down the track"""
+        if self.inversions is None:
+            times = self.track.times
+            self.inversions = sum(map(operator.lt, times[1:], times))
+        return self.inversions == 0
+
+    def seek(self, timestamp):
+        """Row of the first action at or after timestamp (len(track) if there is none).
+
+        With timestamps out of order (after edits) it is the row of the earliest
+        action at or after timestamp, found in a sorted copy built once per change."""
+        if self.in_order():
+            return bisect.bisect_left(self.track.times, timestamp)
+        times, rows = self.sorted_times()
+        position = bisect.bisect_left(times, timestamp)
+        return rows[position] if position < len(rows) else len(self.track)
+
+    def sorted_times(self):
+        if self.time_order is None:
+            rows = sorted(range(len(self.track)), key=self.track.times.__getitem__)
+            self.time_order = (array('d', (self.track.times[row] for row in rows)), rows)
+        return self.time_order
+
+    def rows_between(self, start_time, end_time):
+        """Rows with start_time <= timestamp < end_time, in row order"""
+        if self.in_order():
+            return range(self.seek(start_time), self.seek(end_time))
+        times, rows = self.sorted_times()
+        return sorted(rows[bisect.bisect_left(times, start_time):bisect.bisect_left(times, end_time)])
+
+    def hit(self, x, y, radius=10):
+        """Rows of mouse/click actions within radius pixels of (x, y), nearest first"""
+        if self.grid is None:
+            self.build_grid()
+        cell_size, grid = self.cell_size, self.grid
+        found = []
+        for cx in range((x - radius) // cell_size, (x + radius) // cell_size + 1):
+            for cy in range((y - radius) // cell_size, (y + radius) // cell_size + 1):
+                cell = grid.get((cx, cy))
+                if cell:
+                    for action_id, (px, py) in cell.items():
+                        distance = math.hypot(px - x, py - y)
+                        if distance <= radius:
+                            found.append((distance, action_id))
+        found.sort()
+        return [self.row_of(action_id) for _, action_id in found]
+
+    def nearest(self, x, y, radius=10):
+        rows = self.hit(x, y, radius)
+        return rows[0] if rows else None
+
+    # Range edits
+
+    def delete_rows(self, start, stop):
+        del self.track[start:stop]
+
+    def delete_ids(self, action_ids):
+        """Delete actions by id, one slice per run of adjacent rows; returns the first row removed"""
+        rows = sorted({row for row in map(self.row_of, action_ids) if row is not None})
+        if not rows:
+            return None
+        # Back to front, so the rows still to delete keep their place
+        run_end = rows[-1] + 1
+        run_start = rows[-1]
+        for row in reversed(rows[:-1]):
+            if row == run_start - 1:
+                run_start = row
+                continue
+            del self.track[run_start:run_end]
+            run_start, run_end = row, row + 1
+        del self.track[run_start:run_end]
+        return rows[0]
+
+    def delete_between(self, start_time, end_time):
+        rows = self.rows_between(start_time, end_time)
+        if isinstance(rows, range):
+            self.delete_rows(rows.start, rows.stop)
+        else:
+            self.delete_ids([self.id_at(row) for row in rows])
+        return len(rows)
+
+    def insert(self, row, actions):
+        """Insert a block of actions before row; returns their ids"""
+        self.track.insert_many(row, actions)
+        return [self.id_at(r) for r in range(row, row + len(actions))]
+
+    def insert_by_time(self, actions):
+        """Insert a block where its first timestamp belongs; returns their ids"""
+        if not len(actions):
+            return []
+        return self.insert(self.seek(actions[0][3]), actions)
+
+    def retime(self, start, stop, start_time, end_time):
+        """Stretch rows start..stop-1 linearly so they run from start_time to end_time"""
+        track = self.track
+        if stop - start < 1:
+            return
+        first, last = track.times[start], track.times[stop - 1]
+        span = last - first
+        scale = (end_time - start_time) / span if span else 0.0
+        for row in range(start, stop):
+            action = track[row]
+            track[row] = (action[0], action[1], action[2], start_time + (action[3] - first) * scale)
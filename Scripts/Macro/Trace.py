@@ -0,0 +1,159 @@
+import json
+import os
+
+
+def summary(values):
+    """count/p50/p99/max of nanosecond values, in milliseconds"""
+    if not values:
+        return {'count': 0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(values)
+    count = len(ordered)
+    return {
+        'count': count,
+        'p50': ordered[count // 2] / 1e6,
+        'p99': ordered[min(count - 1, int(count * 0.99))] / 1e6,
+        'max': ordered[-1] / 1e6,
+    }
+
+
+def histogram(values, first_bound=1_000, buckets=21):
+    """Counts of nanosecond values in power-of-two buckets from first_bound ns up.
+
+    Returns (upper bound in ns, count) pairs; the last bound is None and takes
+    everything above the one before it."""
+    counts = [0] * buckets
+    last = buckets - 1
+    for value in values:
+        bucket = 0 if value <= first_bound else min(((value - 1) // first_bound).bit_length(), last)
+        counts[bucket] += 1
+    return list(zip([first_bound << k for k in range(last)] + [None], counts))
+
+
+def plain_args(args):
+    """Call arguments as JSON-ready values; screen conditions become their spec string"""
+    return [arg.spec() if hasattr(arg, 'spec') else arg for arg in args]
+
+
+def format_duration(ns):
+    if ns < 1_000_000:
+        return f"{ns / 1e3:g} us"
+    if ns < 1_000_000_000:
+        return f"{ns / 1e6:g} ms"
+    return f"{ns / 1e9:g} s"
+
+
+class PlaybackTrace:
+    """Per-action timings of one playback, filled in by MacroPlayer.
+
+    For every action played it keeps the scheduled deadline, when the call
+    actually started and ended (all perf_counter ns) and how many retries it
+    took. metrics() summarizes them, chrome_trace() turns them into a timeline
+    for chrome://tracing or Perfetto, and format_histogram() prints a lateness
+    or call-duration histogram. A player without a trace skips all of this."""
+
+    def __init__(self):
+        self.program = None
+        self.origin = 0
+        self.indices = []
+        self.loops = []
+        self.scheduled = []
+        self.started = []
+        self.ended = []
+        self.retries = []
+        self.failed = 0
+
+    def begin(self, program, origin):
+        """Start a new playback of program; earlier records are dropped"""
+        self.__init__()
+        self.program = program
+        self.origin = origin
+
+    def record(self, index, loop, scheduled, started, ended, attempts):
+        """attempts is the attempt the call succeeded on, 0 if every attempt failed"""
+        self.indices.append(index)
+        self.loops.append(loop)
+        self.scheduled.append(scheduled)
+        self.started.append(started)
+        self.ended.append(ended)
+        if attempts:
+            self.retries.append(attempts - 1)
+        else:
+            self.retries.append(-1)
+            self.failed += 1
+
+    def __len__(self):
+        return len(self.indices)
+
+    def lateness(self):
+        return [started - scheduled for started, scheduled in zip(self.started, self.scheduled)]
+
+    def call_durations(self):
+        return [ended - started for started, ended in zip(self.started, self.ended)]
+
+    def call_name(self, index):
+        call = self.program.calls[index]
+        return getattr(call, '__name__', type(call).__name__)
+
+    def metrics(self):
+        """Lateness and call duration percentiles (ms), retries and failures, overall and per call"""
+        lateness, durations = self.lateness(), self.call_durations()
+        by_call = {}
+        for index, late, duration, retries in zip(self.indices, lateness, durations, self.retries):
+            entry = by_call.setdefault(self.call_name(index), ([], [], [0]))
+            entry[0].append(late)
+            entry[1].append(duration)
+            entry[2][0] += max(retries, 0)
+        return {
+            'actions': len(self),
+            'lateness': summary(lateness),
+            'call': summary(durations),
+            'retries': sum(retries for retries in self.retries if retries > 0),
+            'failed': self.failed,
+            'wall': (self.ended[-1] - self.origin) / 1e6 if self.ended else 0.0,
+            'by_call': {name: {'lateness': summary(late), 'call': summary(duration), 'retries': retries[0]}
+                        for name, (late, duration, retries) in by_call.items()},
+        }
+
+    def chrome_trace(self):
+        """The playback in Chrome trace event format: one slice per action plus a lateness counter"""
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': 'Macro playback'}}]
+        origin, args = self.origin, self.program.args
+        for index, loop, scheduled, started, ended, retries in zip(
+                self.indices, self.loops, self.scheduled, self.started, self.ended, self.retries):
+            ts = (started - origin) / 1e3
+            events.append({
+                'name': self.call_name(index), 'cat': 'action', 'ph': 'X', 'pid': 1, 'tid': 1,
+                'ts': ts, 'dur': (ended - started) / 1e3,
+                'args': {'index': index, 'loop': loop, 'args': plain_args(args[index]),
+                         'scheduled_us': (scheduled - origin) / 1e3, 'late_us': (started - scheduled) / 1e3,
+                         'retries': retries},
+            })
+            events.append({'name': 'lateness', 'ph': 'C', 'pid': 1, 'ts': ts,
+                           'args': {'ms': (started - scheduled) / 1e6}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'metadata': self.metrics()}
+
+    def save_chrome_trace(self, path):
+        """Write chrome_trace() to path; a failed write leaves any earlier file in place"""
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, 'w') as file:
+                json.dump(self.chrome_trace(), file, default=str)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def format_histogram(self, field='lateness', width=40):
+        """Text histogram of 'lateness' or 'call' durations"""
+        values = self.lateness() if field == 'lateness' else self.call_durations()
+        rows = histogram(values)
+        if not values:
+            return f"{field}: no actions"
+        peak = max(count for _, count in rows)
+        lines = [f"{field} ({len(values)} actions)"]
+        for k, (bound, count) in enumerate(rows):
+            if not count:
+                continue
+            label = f"<= {format_duration(bound)}" if bound is not None else f"> {format_duration(rows[k - 1][0])}"
+            lines.append(f"  {label:>11} {count:8} {'#' * max(1, count * width // peak)}")
+        return "\n".join(lines)
@@ -1,5 +1,75 @@
 import time
 
+import numpy as np
+
+EASINGS = {}  # name -> function mapping an array of progress values in [0, 1] to eased values
+
+
+def register_easing(name, function):
+    """Make an easing curve available by name to Tween and tween_points"""
+    EASINGS[name] = function
+    return function
+
+
+register_easing("linear", lambda t: t)
+register_easing("ease_in", lambda t: t * t)
+register_easing("ease_out", lambda t: 1 - (1 - t) * (1 - t))
+register_easing("ease_in_out", lambda t: np.where(t < 0.5, 2 * t * t, 1 - 2 * (1 - t) * (1 - t)))
+
+
+def cubic_bezier(x1, y1, x2, y2):
+    """Easing curve through (0, 0), (x1, y1), (x2, y2), (1, 1), like CSS cubic-bezier()"""
+    def axis(s, a, b):
+        return ((1 - 3 * b + 3 * a) * s + (3 * b - 6 * a)) * s * s + 3 * a * s
+
+    def slope(s, a, b):
+        return (3 - 9 * b + 9 * a) * s * s + (6 * b - 12 * a) * s + 3 * a
+
+    def ease(t):
+        t = np.asarray(t, dtype=np.float64)
+        # Find s with x(s) == t: a few Newton steps, then bisection wherever Newton stalled
+        s = t.copy()
+        for _ in range(8):
+            d = slope(s, x1, x2)
+            s = np.where(np.abs(d) > 1e-6, s - (axis(s, x1, x2) - t) / np.where(d == 0, 1, d), s)
+        s = np.clip(s, 0.0, 1.0)
+        bad = np.abs(axis(s, x1, x2) - t) > 1e-7
+        if bad.any():
+            lo, hi = np.zeros(int(bad.sum())), np.ones(int(bad.sum()))
+            target = t[bad]
+            for _ in range(40):
+                mid = (lo + hi) / 2
+                below = axis(mid, x1, x2) < target
+                lo, hi = np.where(below, mid, lo), np.where(below, hi, mid)
+            s[bad] = (lo + hi) / 2
+        return axis(s, y1, y2)
+
+    return ease
+
+
+def easing_function(easing):
+    """A registered curve by name, or any callable taking an array of progress values"""
+    if callable(easing):
+        return easing
+    try:
+        return EASINGS[easing]
+    except KeyError:
+        raise ValueError(f"Unknown easing curve: {easing}") from None
+
+
+def tween_points(starts, ends, progress, easing="linear"):
+    """Points between starts and ends at each progress value, for many pairs at once.
+
+    starts and ends are (2,) or (M, 2) and progress is a scalar or (N,) array of
+    values in [0, 1]; the result is (2,), (N, 2) or (M, N, 2) accordingly."""
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    eased = np.asarray(easing_function(easing)(np.clip(np.asarray(progress, dtype=np.float64), 0.0, 1.0)))
+    if eased.ndim == 0:
+        return starts + (ends - starts) * eased
+    return starts[..., None, :] + (ends - starts)[..., None, :] * eased[:, None]
+
+
 class Tween:
     def __init__(self):
         self.tween = "linear"
@@ -38,30 +108,8 @@ class Tween:
             progress = (t - self.start_time) / self.duration
             self.current_value = self.ease(progress)
     def ease(self, t):
-        if self.tween == "linear":
-            return self.ease_linear(t)
-        elif self.tween == "ease_in":
-            return self.ease_in(t)
-        elif self.tween == "ease_out":
-            return self.ease_out(t)
-        elif self.tween == "ease_in_out":
-            return self.ease_in_out(t)
-    def ease_linear(self, t):
-        return (self.start_value[0] + (self.end_value[0] - self.start_value[0]) * t,
-                self.start_value[1] + (self.end_value[1] - self.start_value[1]) * t)
-    def ease_in(self, t):
-        return (self.start_value[0] + (self.end_value[0] - self.start_value[0]) * t * t,
-                self.start_value[1] + (self.end_value[1] - self.start_value[1]) * t * t)
-    def ease_out(self, t):
-        return (self.start_value[0] + (self.end_value[0] - self.start_value[0]) * (1 - (1 - t) * (1 - t)),
-                self.start_value[1] + (self.end_value[1] - self.start_value[1]) * (1 - (1 - t) * (1 - t)))
-    def ease_in_out(self, t):
-        if t < 0.5:
-            return (self.start_value[0] + (self.end_value[0] - self.start_value[0]) * 2 * t * t,
-                    self.start_value[1] + (self.end_value[1] - self.start_value[1]) * 2 * t * t)
-        else:
-            return (self.start_value[0] + (self.end_value[0] - self.start_value[0]) * (1 - 2 * (1 - t) * (1 - t)),
-                    self.start_value[1] + (self.end_value[1] - self.start_value[1]) * (1 - 2 * (1 - t) * (1 - t)))
+        x, y = tween_points(self.start_value, self.end_value, t, self.tween)
+        return (float(x), float(y))
     def get_value(self):
         return self.current_value
     def is_running(self):
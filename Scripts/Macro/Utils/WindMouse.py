@@ -1,6 +1,80 @@
+import functools
+import math
 import numpy as np
 import time;
 
+
+def _generate_path(start_x, start_y, dest_x, dest_y, G_0, W_0, M_0, D_0, rng):
+    """The WindMouse walk from start to dest as an (N, 2) int32 array of cursor positions.
+
+    The walk itself is a recurrence, so it stays a loop, but it runs on plain
+    floats with math instead of scalar NumPy calls, and its random numbers are
+    drawn from rng in blocks of three per step (two for the wind, one for the
+    velocity clip). Consecutive duplicates are skipped and the last row is
+    always dest, rounded."""
+    sqrt3, sqrt5 = math.sqrt(3), math.sqrt(5)
+    hypot = math.hypot
+    target = (int(round(dest_x)), int(round(dest_y)))
+    current = (int(round(start_x)), int(round(start_y)))
+    points = []
+    v_x = v_y = W_x = W_y = 0.0
+    randoms, r = [], 0
+    block = 3 * max(64, int(hypot(dest_x - start_x, dest_y - start_y) / max(M_0 / 2, 1)) + 16)
+    while (dist := hypot(dest_x - start_x, dest_y - start_y)) >= 1:
+        if r == len(randoms):
+            randoms, r = rng.random(block).tolist(), 0
+        r0, r1, r2 = randoms[r], randoms[r + 1], randoms[r + 2]
+        r += 3
+        W_mag = min(W_0, dist)
+        if dist >= D_0:
+            W_x = W_x / sqrt3 + (2 * r0 - 1) * W_mag / sqrt5
+            W_y = W_y / sqrt3 + (2 * r1 - 1) * W_mag / sqrt5
+        else:
+            W_x /= sqrt3
+            W_y /= sqrt3
+            if M_0 < 3:
+                M_0 = r0 * 3 + 3
+            else:
+                M_0 /= sqrt5
+        v_x += W_x + G_0 * (dest_x - start_x) / dist
+        v_y += W_y + G_0 * (dest_y - start_y) / dist
+        v_mag = hypot(v_x, v_y)
+        if v_mag > M_0:
+            v_clip = M_0 / 2 + r2 * M_0 / 2
+            v_x = (v_x / v_mag) * v_clip
+            v_y = (v_y / v_mag) * v_clip
+        start_x += v_x
+        start_y += v_y
+        move = (int(round(start_x)), int(round(start_y)))
+        if move != current:
+            points.append(move)
+            current = move
+    if current != target:
+        points.append(target)
+    return np.array(points, dtype=np.int32).reshape(-1, 2)
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_path(start, dest, params, seed):
+    path = _generate_path(*start, *dest, *params, np.random.default_rng(seed))
+    path.flags.writeable = False  # Shared between callers
+    return path
+
+
+def wind_path(start, dest, G_0=9, W_0=3, M_0=15, D_0=12, seed=None, rng=None):
+    """A humanized mouse path from start to dest, (x, y) each, as an (N, 2) int32 array.
+
+    G_0 is the pull towards dest, W_0 the wind strength, M_0 the largest step
+    and D_0 the distance at which the wind dies down. Paths with a seed (and no
+    rng) are cached per (start, dest, params, seed) and come back read-only;
+    pass an np.random.Generator as rng for a stream of different paths."""
+    if rng is None and seed is not None:
+        return _cached_path((float(start[0]), float(start[1])), (float(dest[0]), float(dest[1])),
+                            (G_0, W_0, M_0, D_0), seed)
+    return _generate_path(float(start[0]), float(start[1]), float(dest[0]), float(dest[1]),
+                          G_0, W_0, M_0, D_0, rng if rng is not None else np.random.default_rng())
+
+
 class WindMouse:
     def __init__(self):
         self.tween = "Wind"
@@ -12,6 +86,7 @@ class WindMouse:
         self.running = False
         self.duration = 1.0
         self.on_complete = None
+        self.path = np.empty((0, 2), dtype=np.int32)
         
     def set_tween(self, tween):
         self.tween = tween
@@ -24,6 +99,7 @@ class WindMouse:
         self.end_value = end_value
         self.start_time = time.time()
         self.end_time = self.start_time + self.duration
+        self.path = wind_path(start_value, end_value)
         self.running = True
         
     def update(self):
@@ -39,35 +115,14 @@ class WindMouse:
             progress = (t - self.start_time) / self.duration
             self.current_value = self.ease(progress)
 
-    def wind_mouse(self, start_x, start_y, dest_x, dest_y, move_mouse, G_0=9, W_0=3, M_0=15, D_0=12):
+    def ease(self, t):
+        """Point of the wind path a fraction t of the way along it"""
+        if not len(self.path):
+            return self.end_value
+        x, y = self.path[min(int(t * len(self.path)), len(self.path) - 1)]
+        return (int(x), int(y))
 
-        sqrt3 = np.sqrt(3)
-        sqrt5 = np.sqrt(5)
-        current_x, current_y = start_x, start_y
-        v_x = v_y = W_x = W_y = 0
-        while (dist := np.hypot(dest_x - start_x, dest_y - start_y)) >= 1:
-            W_mag = min(W_0, dist)
-            if dist >= D_0:
-                W_x = W_x / sqrt3 + (2 * np.random.random() - 1) * W_mag / sqrt5
-                W_y = W_y / sqrt3 + (2 * np.random.random() - 1) * W_mag / sqrt5
-            else:
-                W_x /= sqrt3
-                W_y /= sqrt3
-                if M_0 < 3:
-                    M_0 = np.random.random() * 3 + 3
-                else:
-                    M_0 /= sqrt5
-            v_x += W_x + G_0 * (dest_x - start_x) / dist
-            v_y += W_y + G_0 * (dest_y - start_y) / dist
-            v_mag = np.hypot(v_x, v_y)
-            if v_mag > M_0:
-                v_clip = M_0 / 2 + np.random.random() * M_0 / 2
-                v_x = (v_x / v_mag) * v_clip
-                v_y = (v_y / v_mag) * v_clip
-            start_x += v_x
-            start_y += v_y
-            move_x = int(np.round(start_x))
-            move_y = int(np.round(start_y))
-            if current_x != move_x or current_y != move_y:
-                # This should wait for the mouse polling interval
-                move_mouse(current_x := move_x, current_y := move_y)
\ No newline at end of file
+    def wind_mouse(self, start_x, start_y, dest_x, dest_y, move_mouse, G_0=9, W_0=3, M_0=15, D_0=12, seed=None):
+        # The whole path is generated first, so timing the moves is up to the caller
+        for x, y in wind_path((start_x, start_y), (dest_x, dest_y), G_0, W_0, M_0, D_0, seed=seed).tolist():
+            move_mouse(x, y)
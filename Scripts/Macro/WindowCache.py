@@ -0,0 +1,237 @@
+import difflib
+import threading
+import time
+
+
+class WindowSystem:
+    """What the window cache needs from the OS; swap for FakeWindowSystem in tests"""
+
+    def find_exact(self, title):
+        """Handle of a top-level window with exactly this title, or None"""
+        raise NotImplementedError
+
+    def windows(self):
+        """Full enumeration of visible top-level windows as (handle, title) pairs"""
+        raise NotImplementedError
+
+    def is_window(self, handle):
+        raise NotImplementedError
+
+    def title_of(self, handle):
+        raise NotImplementedError
+
+    def focus(self, handle):
+        raise NotImplementedError
+
+    def subscribe(self, on_created, on_destroyed):
+        """Ask to be told when windows appear, vanish or get renamed. Optional."""
+        pass
+
+
+class Win32WindowSystem(WindowSystem):
+    EVENT_OBJECT_CREATE = 0x8000
+    EVENT_OBJECT_DESTROY = 0x8001
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    OBJID_WINDOW = 0
+
+    def __init__(self):
+        import win32gui
+        self.win32gui = win32gui
+        self.hooks = []
+
+    def find_exact(self, title):
+        return self.win32gui.FindWindow(None, title) or None
+
+    def windows(self):
+        found = []
+
+        def collect(handle, _):
+            if self.win32gui.IsWindowVisible(handle):
+                title = self.win32gui.GetWindowText(handle)
+                if title:
+                    found.append((handle, title))
+            return True
+
+        self.win32gui.EnumWindows(collect, None)
+        return found
+
+    def is_window(self, handle):
+        return bool(self.win32gui.IsWindow(handle))
+
+    def title_of(self, handle):
+        return self.win32gui.GetWindowText(handle)
+
+    def focus(self, handle):
+        try:
+            self.win32gui.SetForegroundWindow(handle)
+            return True
+        except Exception:
+            return False
+
+    def subscribe(self, on_created, on_destroyed):
+        from Scripts.Macro.EventCapture import WinEventHook
+
+        def on_event(event, hwnd, id_object):
+            if id_object != self.OBJID_WINDOW or not hwnd:
+                return
+            if event == self.EVENT_OBJECT_DESTROY:
+                on_destroyed(hwnd)
+            else:
+                on_created(hwnd)  # A renamed window can now match different titles
+
+        # Two hooks: the range between them includes very chatty events (location changes)
+        self.hooks = [WinEventHook(self.EVENT_OBJECT_CREATE, self.EVENT_OBJECT_DESTROY, on_event),
+                      WinEventHook(self.EVENT_OBJECT_NAMECHANGE, self.EVENT_OBJECT_NAMECHANGE, on_event)]
+        for hook in self.hooks:
+            hook.start()
+
+
+class FakeWindowSystem(WindowSystem):
+    """An in-memory window list for headless runs; counts every OS-style call"""
+
+    def __init__(self, titles=()):
+        self.titles = {}
+        self.next_handle = 1
+        self.focused = None
+        self.calls = {'find_exact': 0, 'windows': 0, 'is_window': 0}
+        self.on_created = self.on_destroyed = None
+        for title in titles:
+            self.create(title)
+
+    def create(self, title):
+        handle = self.next_handle
+        self.next_handle += 1
+        self.titles[handle] = title
+        if self.on_created:
+            self.on_created(handle)
+        return handle
+
+    def destroy(self, handle):
+        self.titles.pop(handle, None)
+        if self.on_destroyed:
+            self.on_destroyed(handle)
+
+    def rename(self, handle, title):
+        self.titles[handle] = title
+        if self.on_created:
+            self.on_created(handle)
+
+    def find_exact(self, title):
+        self.calls['find_exact'] += 1
+        for handle, window_title in self.titles.items():
+            if window_title == title:
+                return handle
+        return None
+
+    def windows(self):
+        self.calls['windows'] += 1
+        return list(self.titles.items())
+
+    def is_window(self, handle):
+        self.calls['is_window'] += 1
+        return handle in self.titles
+
+    def title_of(self, handle):
+        return self.titles.get(handle, "")
+
+    def focus(self, handle):
+        if handle not in self.titles:
+            return False
+        self.focused = handle
+        return True
+
+    def subscribe(self, on_created, on_destroyed):
+        self.on_created, self.on_destroyed = on_created, on_destroyed
+
+
+def title_score(wanted, title):
+    """How well a window title matches a recorded one, 0 (no match) to 1 (exact)"""
+    if wanted == title:
+        return 1.0
+    wanted_lower, title_lower = wanted.lower(), title.lower()
+    if wanted_lower == title_lower:
+        return 0.95
+    # "notes.txt - Notepad" and "Untitled - Notepad" belong to the same application
+    wanted_app, title_app = wanted_lower.rsplit(" - ", 1)[-1], title_lower.rsplit(" - ", 1)[-1]
+    if " - " in wanted_lower and " - " in title_lower and wanted_app == title_app:
+        return 0.8 + 0.1 * difflib.SequenceMatcher(None, wanted_lower, title_lower).ratio()
+    if title_lower.startswith(wanted_lower) or wanted_lower.startswith(title_lower):
+        return 0.75
+    ratio = difflib.SequenceMatcher(None, wanted_lower, title_lower).ratio()
+    return ratio if ratio >= 0.6 else 0.0
+
+
+class WindowCache:
+    """Resolves window titles to handles, remembering the answer per title.
+
+    An entry is dropped when its window is destroyed or renamed, when any window
+    is created (only for entries that were misses or fuzzy matches, since an
+    exact hit can't get any better), or when it is older than ttl seconds. Cached
+    handles are re-checked with a cheap is_window call before use, and cached
+    misses and near misses with find_exact, so a window with the exact title
+    wins as soon as it exists, even if no notification announced it."""
+
+    def __init__(self, system, ttl=30.0, fuzzy=True, clock=time.monotonic):
+        self.system = system
+        self.ttl = ttl
+        self.fuzzy = fuzzy
+        self.clock = clock
+        self.entries = {}  # title -> (handle or None, exact, resolved_at)
+        self.lock = threading.Lock()  # Notifications arrive on the hook thread
+        self.hits = 0
+        self.misses = 0
+        self.enumerations = 0
+        system.subscribe(self.on_window_created, self.on_window_destroyed)
+
+    def resolve(self, title):
+        now = self.clock()
+        entry = self.entries.get(title)
+        handle = None
+        if entry is not None and now - entry[2] < self.ttl:
+            if entry[0] is None or not entry[1]:
+                handle = self.system.find_exact(title)  # Cheaper than the enumeration a miss cost
+            if handle is None and (entry[0] is None or self.system.is_window(entry[0])):
+                self.hits += 1
+                return entry[0]
+        self.misses += 1
+
+        handle, exact = handle or self.system.find_exact(title), True
+        if handle is None and self.fuzzy:
+            handle, exact = self.best_match(title), False
+        with self.lock:
+            self.entries[title] = (handle, exact, now)
+        return handle
+
+    def best_match(self, title):
+        self.enumerations += 1
+        best, best_score = None, 0.0
+        for handle, window_title in self.system.windows():
+            score = title_score(title, window_title)
+            if score > best_score:
+                best, best_score = handle, score
+        return best
+
+    def focus(self, title):
+        handle = self.resolve(title)
+        return handle is not None and self.system.focus(handle)
+
+    def invalidate(self, title=None):
+        with self.lock:
+            if title is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(title, None)
+
+    def on_window_created(self, handle):
+        with self.lock:
+            # Exact hits on other windows stay valid; anything weaker might resolve better now
+            self.entries = {title: entry for title, entry in self.entries.items()
+                            if entry[0] is not None and entry[1] and entry[0] != handle}
+
+    def on_window_destroyed(self, handle):
+        with self.lock:
+            self.entries = {title: entry for title, entry in self.entries.items() if entry[0] != handle}
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'enumerations': self.enumerations,
+                'entries': len(self.entries)}
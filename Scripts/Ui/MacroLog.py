@@ -0,0 +1,81 @@
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+REFRESH_MS = 16  # Pick up appended actions about once per display frame
+
+
+def describe(action):
+    """One line of the action log"""
+    if action[0] == 'window_focus':
+        return f"Window Focus: {action[1]} at {action[3]:.2f}"
+    elif action[0] == 'mouse':
+        return f"Mouse: Move to ({action[1]}, {action[2]}) at {action[3]:.2f}"
+    elif action[0] == 'left_click':
+        return f"Mouse: Left Click at ({action[1]}, {action[2]}) at {action[3]:.2f}"
+    elif action[0] == 'right_click':
+        return f"Mouse: Right Click at ({action[1]}, {action[2]}) at {action[3]:.2f}"
+    elif action[0] == 'middle_click':
+        return f"Mouse: Middle Click at ({action[1]}, {action[2]}) at {action[3]:.2f}"
+    elif action[0] == 'key':
+        return f"Key: {action[1]} {action[2]} at {action[3]:.2f}"
+    elif action[0] == 'wait_region':
+        fields = ' '.join(field for field in action[1].split() if not field.startswith('image='))
+        return f"Wait For Screen: {fields} at {action[3]:.2f}"
+    elif action[0] == 'if_pixel':
+        return f"If Pixel: {action[1]} at {action[3]:.2f}"
+    return f"{action[0]}: {action[1]} {action[2]} at {action[3]:.2f}"
+
+
+class MacroLogModel(QAbstractListModel):
+    """List model over the macro itself; rows are formatted only when the view asks.
+
+    The recorder thread calls mark_dirty() after each append, which just sets a
+    flag. refresh() runs on the GUI thread from a timer and announces whatever
+    rows were appended since the last call, so a recording costs one small
+    insert per frame rather than a full redraw per sample."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.macro = ()
+        self.rows = 0  # Rows the view has been told about
+        self.dirty = False
+
+    def set_macro(self, macro):
+        """Show a different or edited macro from scratch"""
+        self.beginResetModel()
+        self.macro = macro
+        self.rows = len(macro)
+        self.dirty = False
+        self.endResetModel()
+
+    def mark_dirty(self):
+        self.dirty = True  # Safe from any thread, refresh() does the Qt work
+
+    def row_changed(self, row):
+        """One action was edited in place; GUI thread only"""
+        if row < self.rows:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def refresh(self):
+        """Announce appended rows; returns True if the row count changed"""
+        if not self.dirty:
+            return False
+        self.dirty = False
+        count = len(self.macro)
+        if count == self.rows:
+            return False
+        if count < self.rows:
+            self.set_macro(self.macro)  # Rows went away behind our back
+            return True
+        self.beginInsertRows(QModelIndex(), self.rows, count - 1)
+        self.rows = count
+        self.endInsertRows()
+        return True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid() or index.row() >= self.rows:
+            return None
+        return describe(self.macro[index.row()])
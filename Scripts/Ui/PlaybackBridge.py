@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from Scripts.Macro.AsyncPlayback import AsyncPlaybackEngine
+
+
+class PlaybackBridge(QObject):
+    """Connects an AsyncPlaybackEngine to Qt.
+
+    Given the asyncio loop that already runs on the Qt thread (a qasync
+    QEventLoop) everything happens on the GUI thread. Without one the bridge
+    runs its own loop on a daemon thread: controls are handed to it with
+    run_coroutine_threadsafe and never block the GUI, and engine events reach
+    Qt through the event signal, which Qt queues over to the GUI thread.
+    The controls are safe to call from any thread, e.g. a keyboard hook."""
+
+    event = pyqtSignal(object)  # PlaybackEvent
+
+    def __init__(self, backend, loop=None, parent=None, **engine_options):
+        super().__init__(parent)
+        self.thread = None
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=loop.run_forever, name="playback loop", daemon=True)
+            self.thread.start()
+        self.loop = loop
+        self.engine = AsyncPlaybackEngine(backend, **engine_options)
+        self.engine.add_listener(self.event.emit)
+
+    def on_loop_thread(self):
+        return self.thread is None or threading.current_thread() is self.thread
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the loop; returns a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def start(self, actions, **options):
+        """Start playing actions; returns the MacroTask (see AsyncPlaybackEngine.start)"""
+        if self.on_loop_thread():
+            return self.engine.start(actions, **options)
+
+        async def start():
+            return self.engine.start(actions, **options)
+        return self.submit(start()).result()  # Compiling is the only wait, the task plays on the loop
+
+    def pause(self, task):
+        return self.submit(task.pause())
+
+    def resume(self, task):
+        return self.submit(task.resume())
+
+    def cancel(self, task):
+        return self.submit(task.cancel())
+
+    def close(self):
+        """Cancel every task; stops the bridge's own loop thread if it has one"""
+        future = self.submit(self.engine.cancel_all())
+        if self.thread is not None:
+            future.result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.thread = None
@@ -1,46 +1,25 @@
-from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QTextEdit, QVBoxLayout, QWidget, QMenu, QAction, QGraphicsOpacityEffect, QFileDialog, QMessageBox, QGraphicsScene, QGraphicsView, QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsTextItem, QGraphicsItem, QSpinBox, QHBoxLayout  # Add this import
-from PyQt5.QtCore import QPropertyAnimation, QEasingCurve, Qt, QPointF, pyqtSlot
-from PyQt5.QtGui import QColor, QCursor, QPen, QBrush, QWheelEvent, QPainter  # Import QPainter
-import os
-import json
+from PyQt5.QtWidgets import QMainWindow, QPushButton, QTableView, QHeaderView, QAbstractItemView, QVBoxLayout, QWidget, QMenu, QAction, QFileDialog, QMessageBox, QGraphicsScene, QGraphicsView, QSpinBox, QHBoxLayout
+from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot, QTimer
+from PyQt5.QtGui import QCursor, QWheelEvent, QPainter
 import time
+from Scripts.FileHandler.Journal import MacroJournal
+from Scripts.Ui.VisualEditor import VisualEditor
+from Scripts.Ui.MacroLog import MacroLogModel, REFRESH_MS
 
-class DraggableEllipseItem(QGraphicsEllipseItem):
-    def __init__(self, ui, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.ui = ui
-        self.setFlags(QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable)
-        self.setBrush(QBrush(QColor("blue")))
-        self.setPen(QPen(QColor("white"), 2))
-        self.old_x, self.old_y = 0, 0
-
-    def mousePressEvent(self, event):
-        self.old_x, self.old_y = self.pos().x(), self.pos().y()
-        super().mousePressEvent(event)
-
-    def mouseReleaseEvent(self, event):
-        super().mouseReleaseEvent(event)
-        self.update_position()
-
-    def update_position(self):
-        x, y = self.pos().x(), self.pos().y()
-        for action in self.ui.macro_recorder.macro:
-            if action[0] == 'mouse' and (action[1], action[2]) == [self.old_x, self.old_y]:
-                action[1], action[2] = int(x), int(y)
-                break
-        self.old_x, self.old_y = int(x), int(y)
-        self.ui.render_macro()
 
 class Ui(QMainWindow):
+    message = pyqtSignal(str, str)  # (kind, text) from any thread; shown by show_message on the GUI thread
+
     def __init__(self, macro_recorder):
         super().__init__()
+        self.message.connect(self.show_message)
         self.macro_recorder = macro_recorder
         self.cache_file = "macro_cache.json"
+        self.journal = MacroJournal(self.cache_file)
         self.init_ui()
         self.setWindowTitle("Macro Recorder")
         self.load_cache()
-        self.drag_data = None  # Initialize drag_data
-        self.connecting_line = None  # Initialize connecting line
+        self.context_menu_pos = None  # Where the context menu was opened, in view coordinates
 
     def init_ui(self):
         self.setStyleSheet("""
@@ -62,7 +41,7 @@ class Ui(QMainWindow):
                 background-color: #2B2B2B;
                 border: 1px solid #2B2B2B;
             }
-            QTextEdit {
+            QTableView {
                 background-color: #2B2B2B;
                 color: white;
                 font-family: Courier;
@@ -95,6 +74,10 @@ class Ui(QMainWindow):
         self.layout.addLayout(play_layout)
         
         play_layout.addWidget(self.play_button)
+
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.clicked.connect(self.toggle_pause)
+        play_layout.addWidget(self.pause_button)
         
         self.loop_count = QSpinBox()
         self.loop_count.setMinimum(1)
@@ -119,9 +102,24 @@ class Ui(QMainWindow):
         self.load_button.clicked.connect(self.load_macro)
         self.layout.addWidget(self.load_button)
 
-        self.macro_display = QTextEdit()
-        self.macro_display.setReadOnly(True)
+        self.macro_log = MacroLogModel(self)
+        # A one-column table rather than QListView: with fixed row heights it lays out
+        # appended rows without revisiting the old ones, so a frame costs the same at 50k rows
+        self.macro_display = QTableView()
+        self.macro_display.setModel(self.macro_log)
+        self.macro_display.horizontalHeader().hide()
+        self.macro_display.horizontalHeader().setStretchLastSection(True)
+        self.macro_display.verticalHeader().hide()
+        self.macro_display.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.macro_display.verticalHeader().setDefaultSectionSize(18)
+        self.macro_display.setShowGrid(False)
+        self.macro_display.setWordWrap(False)
+        self.macro_display.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.macro_display.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.layout.addWidget(self.macro_display)
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.refresh_macro_log)
+        self.log_timer.start(REFRESH_MS)
 
         self.visual_editor_scene = QGraphicsScene()
         self.visual_editor_view = QGraphicsView(self.visual_editor_scene)
@@ -130,6 +128,7 @@ class Ui(QMainWindow):
         self.visual_editor_view.setDragMode(QGraphicsView.ScrollHandDrag)
         self.visual_editor_view.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
         self.layout.addWidget(self.visual_editor_view)
+        self.visual_editor = VisualEditor(self, self.visual_editor_scene, self.visual_editor_view)
 
         self.context_menu = QMenu(self)
         self.add_keystroke_action = QAction("Add Keystroke", self)
@@ -144,6 +143,10 @@ class Ui(QMainWindow):
         self.remove_node_action.triggered.connect(self.remove_node)
         self.context_menu.addAction(self.remove_node_action)
 
+        self.play_from_node_action = QAction("Play From Here", self)
+        self.play_from_node_action.triggered.connect(self.play_from_node)
+        self.context_menu.addAction(self.play_from_node_action)
+
         self.visual_editor_view.setContextMenuPolicy(Qt.CustomContextMenu)
         self.visual_editor_view.customContextMenuRequested.connect(self.show_context_menu)
 
@@ -156,16 +159,18 @@ class Ui(QMainWindow):
         if event.modifiers() == Qt.ControlModifier:
             factor = 1.2 if event.angleDelta().y() > 0 else 1 / 1.2
             self.visual_editor_view.scale(factor, factor)
+            self.visual_editor.update_viewport()
         else:
             super().wheelEvent(event)
 
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.visual_editor.update_viewport()
+
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Delete:
-            for item in self.visual_editor_scene.selectedItems():
-                if isinstance(item, DraggableEllipseItem):
-                    self.visual_editor_scene.removeItem(item)
-                    self.macro_recorder.macro = [action for action in self.macro_recorder.macro if not (action[1] == item.old_x and action[2] == item.old_y)]
-            self.render_macro()
+            self.remove_actions([item.action_id for item in self.visual_editor_scene.selectedItems()
+                                 if getattr(item, 'action_id', None) is not None])
 
     def toggle_record(self):
         if self.macro_recorder:
@@ -178,6 +183,11 @@ class Ui(QMainWindow):
             loops = self.loop_count.value()
             self.macro_recorder.play_macro(loops)
 
+    def toggle_pause(self):
+        if self.macro_recorder:
+            paused = self.macro_recorder.toggle_pause()
+            self.pause_button.setText("Resume" if paused else "Pause")
+
     def save_macro(self):
         if self.macro_recorder:
             self.macro_recorder.save_macro()
@@ -193,7 +203,7 @@ class Ui(QMainWindow):
         x, y = self.visual_editor_view.mapFromGlobal(QCursor.pos()).x(), self.visual_editor_view.mapFromGlobal(QCursor.pos()).y()
         action = ["key", "a", "down", time.time()]  # Example keystroke action
         self.macro_recorder.macro.append(action)
-        self.render_macro()
+        self.visual_editor.rows_changed(len(self.macro_recorder.macro) - 1)
         self.update_macro_display(self.macro_recorder.macro)
         self.save_cache()
 
@@ -202,140 +212,75 @@ class Ui(QMainWindow):
         x, y = self.visual_editor_view.mapFromGlobal(QCursor.pos()).x(), self.visual_editor_view.mapFromGlobal(QCursor.pos()).y()
         action = ["mouse", int(x), int(y), time.time()]  # Ensure coordinates are integers
         self.macro_recorder.macro.append(action)
-        self.render_macro()
+        self.visual_editor.rows_changed(len(self.macro_recorder.macro) - 1)
         self.update_macro_display(self.macro_recorder.macro)
         self.save_cache()
 
+    def node_under_menu(self):
+        """The node the context menu was opened on, or None"""
+        if self.context_menu_pos is None:
+            return None
+        item = self.visual_editor_view.itemAt(self.context_menu_pos)
+        return item if getattr(item, 'action_id', None) is not None else None
+
     def remove_node(self):
-        if self.drag_data:
-            item = self.drag_data["item"]
-            x, y = item.pos().x(), item.pos().y()
-            self.macro_recorder.macro = [action for action in self.macro_recorder.macro if not (action[1] == int(x) and action[2] == int(y))]
-            self.render_macro()
-            self.update_macro_display(self.macro_recorder.macro)
-            self.save_cache()
-            self.drag_data = None
+        item = self.node_under_menu()
+        if item is not None:
+            self.remove_actions([item.action_id])
+        self.context_menu_pos = None
+
+    def remove_actions(self, action_ids):
+        if not action_ids:
+            return
+        # Runs of adjacent rows go in one slice each, and each removal is journaled
+        first = self.visual_editor.timeline().delete_ids(action_ids)
+        if first is None:
+            return
+        self.visual_editor.rows_changed(first)
+        self.update_macro_display(self.macro_recorder.macro)
+        self.save_cache()
+
+    def play_from_node(self):
+        item = self.node_under_menu()
+        self.context_menu_pos = None
+        row = self.visual_editor.row_of(item) if item is not None else None
+        if row is not None:
+            self.macro_recorder.play_macro(self.loop_count.value(), start_time=self.macro_recorder.macro[row][3])
 
     def show_context_menu(self, pos):
+        self.context_menu_pos = pos  # Remove Node acts on whatever is under the cursor
         self.context_menu.exec_(self.visual_editor_view.mapToGlobal(pos))
 
     def render_macro(self):
         if not self.macro_recorder:
             return
-        self.visual_editor_scene.clear()
-        last_pos = None
-        vertical_spacing = 50  # Space between nodes
-        current_y = 0
-        
-        for i, action in enumerate(self.macro_recorder.macro):
-            if action[0] == 'window_focus':
-                # Create window focus node
-                rect = QGraphicsEllipseItem(50, current_y - 15, 30, 30)
-                rect.setBrush(QBrush(QColor("#FF8C00")))  # Orange for window focus
-                rect.setPen(QPen(QColor("white"), 2))
-                self.visual_editor_scene.addItem(rect)
-                
-                # Add window title label
-                text = QGraphicsTextItem(f"{i+1}: Focus: {action[1][:30]}...")
-                text.setDefaultTextColor(QColor("white"))
-                text.setPos(90, current_y - 10)
-                self.visual_editor_scene.addItem(text)
-                
-                current_y += vertical_spacing
-            elif action[0] in ('mouse', 'left_click', 'right_click', 'middle_click'):
-                # Create connecting line from previous action
-                if last_pos:
-                    line = QGraphicsLineItem(last_pos[0], last_pos[1], action[1], current_y)
-                    line.setPen(QPen(QColor("#4A90E2"), 2, Qt.SolidLine))
-                    self.visual_editor_scene.addItem(line)
-                
-                # Set colors for different action types
-                color_map = {
-                    'mouse': QColor("#4A90E2"),      # Blue
-                    'left_click': QColor("#2ECC71"), # Green
-                    'right_click': QColor("#E74C3C"),# Red
-                    'middle_click': QColor("#F39C12")# Orange
-                }
-                
-                color = color_map.get(action[0], QColor("#4A90E2"))
-                
-                # Create node
-                oval = DraggableEllipseItem(self, action[1] - 10, current_y - 10, 20, 20)
-                oval.setBrush(QBrush(color))
-                oval.setPen(QPen(QColor("white"), 2))
-                oval.old_x, oval.old_y = action[1], current_y
-                self.visual_editor_scene.addItem(oval)
-                
-                # Add action label
-                label = QGraphicsTextItem(f"{i+1}: {action[0]}")
-                label.setDefaultTextColor(QColor("white"))
-                label.setPos(action[1] + 15, current_y - 10)
-                self.visual_editor_scene.addItem(label)
-                
-                # Add timing info
-                if i > 0:
-                    delay = action[3] - self.macro_recorder.macro[i-1][3]
-                    timing = QGraphicsTextItem(f"{delay:.2f}s")
-                    timing.setDefaultTextColor(QColor("#95A5A6"))
-                    timing.setPos(action[1] - 50, current_y - 25)
-                    self.visual_editor_scene.addItem(timing)
-                
-                last_pos = (action[1], current_y)
-                current_y += vertical_spacing
-            
-            elif action[0] == 'key':
-                # Create key node
-                rect = QGraphicsEllipseItem(50, current_y - 15, 30, 30)
-                rect.setBrush(QBrush(QColor("#9B59B6")))  # Purple for keyboard actions
-                rect.setPen(QPen(QColor("white"), 2))
-                self.visual_editor_scene.addItem(rect)
-                
-                # Add key label
-                text = QGraphicsTextItem(f"{i+1}: Key {action[1]} {action[2]}")
-                text.setDefaultTextColor(QColor("white"))
-                text.setPos(90, current_y - 10)
-                self.visual_editor_scene.addItem(text)
-                
-                current_y += vertical_spacing
-
+        # Only the rows in the viewport get items; the editor adds more as it scrolls
+        self.visual_editor.reset()
         self.update_macro_display(self.macro_recorder.macro)
         self.save_cache()
 
-    @pyqtSlot(list)
     def update_macro_display(self, macro):
         if not self.macro_recorder:
             return
-        self.macro_display.setPlainText("")
-        for action in macro:
-            if action[0] == 'window_focus':
-                self.macro_display.append(f"Window Focus: {action[1]} at {action[3]:.2f}")
-            elif action[0] == 'mouse':
-                self.macro_display.append(f"Mouse: Move to ({action[1]}, {action[2]}) at {action[3]:.2f}")
-            elif action[0] in ('left_click', 'right_click', 'middle_click'):
-                self.macro_display.append(f"Mouse: {action[0]} at ({action[1]}, {action[2]}) at {action[3]:.2f}")
-            elif action[0] == 'key':
-                self.macro_display.append(f"Key: {action[1]} {action[2]} at {action[3]:.2f}")
+        self.macro_log.set_macro(macro)
 
-    def load_cache(self):
-        if os.path.exists(self.cache_file) and self.macro_recorder:
-            with open(self.cache_file, "r") as f:
-                self.macro_recorder.macro = json.load(f)
+    @pyqtSlot()
+    def reload_macro_display(self):
+        if self.macro_recorder:
             self.update_macro_display(self.macro_recorder.macro)
 
-    @pyqtSlot(list)
-    def update_macro_display(self, macro):
-        if not self.macro_recorder:
-            return
-        self.macro_display.setPlainText("")
-        for action in macro:
-            if action[0] == 'mouse':
-                self.macro_display.append(f"Mouse: Move to ({action[1]}, {action[2]}) at {action[3]:.2f}")
-            elif action[0] == 'left_click':
-                self.macro_display.append(f"Mouse: Left Click at ({action[1]}, {action[2]}) at {action[3]:.2f}")
-            elif action[0] == 'right_click':
-                self.macro_display.append(f"Mouse: Right Click at ({action[1]}, {action[2]}) at {action[3]:.2f}")
-            elif action[0] == 'key':
-                self.macro_display.append(f"Key: {action[1]} {action[2]} at {action[3]:.2f}")
+    def refresh_macro_log(self):
+        scrollbar = self.macro_display.verticalScrollBar()
+        following = scrollbar.value() == scrollbar.maximum()
+        if self.macro_log.refresh() and following:
+            self.macro_display.scrollToBottom()  # Keep following a recording unless scrolled up
+
+    def load_cache(self):
+        if self.macro_recorder:
+            # Snapshot plus any journaled edits made after it
+            self.macro_recorder.macro = self.journal.recover()
+            self.journal.attach(self.macro_recorder.macro)
+            self.update_macro_display(self.macro_recorder.macro)
 
     def ask_open_file(self):
         return QFileDialog.getOpenFileName(self, "Open Macro Script", ".", "Macro Script (*.MacroScript)")[0]
@@ -343,6 +288,9 @@ class Ui(QMainWindow):
     def ask_save_file(self):
         return QFileDialog.getSaveFileName(self, "Save Macro Script", ".", "Macro Script (*.MacroScript)")[0]
 
+    def show_message(self, kind, text):
+        {'info': self.show_info, 'warning': self.show_warning, 'error': self.show_error}[kind](text)
+
     def show_info(self, message):
         QMessageBox.information(self, "Info", message)
 
@@ -353,5 +301,9 @@ class Ui(QMainWindow):
         QMessageBox.critical(self, "Error", message)
 
     def save_cache(self):
-        with open(self.cache_file, "w") as f:
-            json.dump(self.macro_recorder.macro, f)
+        if not self.macro_recorder:
+            return
+        if self.macro_recorder.macro.journal is not self.journal:
+            # A new macro was recorded or loaded, start a fresh snapshot for it
+            self.journal.attach(self.macro_recorder.macro)
+        self.journal.sync()
@@ -0,0 +1,269 @@
+from PyQt5.QtWidgets import (QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsTextItem, QGraphicsItem,
+                             QGraphicsPathItem, QGraphicsPolygonItem)
+from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtGui import QColor, QPen, QBrush, QPainterPath, QPolygonF
+from Scripts.Macro.Timeline import MacroTimeline
+
+ROW_HEIGHT = 50  # Space between nodes
+LOD_SCALE = 0.35  # Below this zoom, mouse runs are drawn as one polyline without labels
+MOUSE_ACTIONS = ('mouse', 'left_click', 'right_click', 'middle_click')
+COLOR_MAP = {
+    'mouse': "#4A90E2",        # Blue
+    'left_click': "#2ECC71",   # Green
+    'right_click': "#E74C3C",  # Red
+    'middle_click': "#F39C12"  # Orange
+}
+CONDITION_ACTIONS = ('wait_region', 'if_pixel')
+
+
+class DraggableEllipseItem(QGraphicsEllipseItem):
+    def __init__(self, ui, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ui = ui
+        self.setFlags(QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable)
+        self.setBrush(QBrush(QColor("blue")))
+        self.setPen(QPen(QColor("white"), 2))
+        self.old_x, self.old_y = 0, 0
+        self.action_id = None  # Timeline id of the action this node was rendered from
+
+    def mousePressEvent(self, event):
+        self.old_x, self.old_y = self.pos().x(), self.pos().y()
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        self.update_position()
+
+    def update_position(self):
+        x, y = self.pos().x(), self.pos().y()
+        macro = self.ui.macro_recorder.macro
+        row = self.ui.visual_editor.row_of(self)
+        if row is not None:
+            action = macro[row]
+            # pos() is the drag offset from where the node was drawn
+            macro[row] = (action[0], int(action[1] + x), int(action[2] + y), action[3])
+            self.ui.visual_editor.action_changed(row)
+            self.ui.save_cache()
+        self.old_x, self.old_y = int(x), int(y)
+
+
+class VisualEditor:
+    """Keeps the visual editor scene in sync with the macro, building only what is on screen.
+
+    Action i always sits on row i (y = i * ROW_HEIGHT), so the rows inside the
+    viewport are found with a division instead of a scan. Items are created for
+    those rows only and dropped once they scroll away. Zoomed out past LOD_SCALE,
+    runs of mouse rows become a single polyline and labels are skipped."""
+
+    def __init__(self, ui, scene, view):
+        self.ui = ui
+        self.scene = scene
+        self.view = view
+        self.rows = {}  # row -> items drawn for it
+        self.paths = []  # Level-of-detail items, rebuilt on every viewport change
+        self.lod = False
+        view.verticalScrollBar().valueChanged.connect(self.update_viewport)
+        view.horizontalScrollBar().valueChanged.connect(self.update_viewport)
+
+    def macro(self):
+        return self.ui.macro_recorder.macro if self.ui.macro_recorder else ()
+
+    def timeline(self):
+        return MacroTimeline.of(self.ui.macro_recorder.macro)
+
+    def row_of(self, item):
+        """Current row of the action a node was drawn for, None if it is gone"""
+        action_id = getattr(item, 'action_id', None)
+        if action_id is None or not self.ui.macro_recorder:
+            return None
+        return self.timeline().row_of(action_id)
+
+    def reset(self):
+        """Forget every item, e.g. after recording or loading a new macro"""
+        self.scene.clear()
+        self.rows = {}
+        self.paths = []
+        self.update_scene_rect()
+        self.update_viewport()
+
+    def update_scene_rect(self):
+        # The full macro extent, so scrollbars work without items for every row
+        self.scene.setSceneRect(QRectF(-100, -ROW_HEIGHT, 2200, (len(self.macro()) + 1) * ROW_HEIGHT))
+
+    def visible_rows(self):
+        rect = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        first = max(0, int(rect.top() // ROW_HEIGHT) - 1)
+        last = min(len(self.macro()), int(rect.bottom() // ROW_HEIGHT) + 2)
+        return first, max(first, last)
+
+    def update_viewport(self, *args):
+        lod = self.view.transform().m11() < LOD_SCALE
+        if lod != self.lod:
+            self.drop_rows(list(self.rows))
+            self.drop_paths()
+            self.lod = lod
+        first, last = self.visible_rows()
+        if lod:
+            self.build_paths(first, last)
+            return
+        self.drop_rows([row for row in self.rows if not first <= row < last])
+        macro = self.macro()
+        for row in range(first, last):
+            if row not in self.rows:
+                self.rows[row] = self.build_row(macro, row)
+
+    def action_changed(self, row):
+        """One action was edited in place: redraw it and the rows that depend on it"""
+        macro = self.macro()
+        # The next row shows the delay from this one, the next mouse row draws a line from it
+        end = row + 1
+        while end < len(macro) and macro[end][0] not in MOUSE_ACTIONS:
+            end += 1
+        self.drop_rows([r for r in range(row, end + 1) if r in self.rows])
+        self.drop_paths()
+        self.update_viewport()
+        self.ui.macro_log.row_changed(row)
+
+    def rows_changed(self, start):
+        """Rows from start onwards were inserted, deleted or reordered"""
+        self.drop_rows([row for row in self.rows if row >= start])
+        self.drop_paths()
+        self.update_scene_rect()
+        self.update_viewport()
+
+    def drop_rows(self, rows):
+        for row in rows:
+            for item in self.rows.pop(row, ()):
+                self.scene.removeItem(item)
+
+    def drop_paths(self):
+        for item in self.paths:
+            self.scene.removeItem(item)
+        self.paths = []
+
+    def add(self, items, item):
+        self.scene.addItem(item)
+        items.append(item)
+
+    def previous_mouse_row(self, macro, row):
+        row -= 1
+        while row >= 0 and macro[row][0] not in MOUSE_ACTIONS:
+            row -= 1
+        return row
+
+    def build_row(self, macro, i):
+        action = macro[i]
+        action_id = self.timeline().id_at(i)
+        current_y = i * ROW_HEIGHT
+        items = []
+        if action[0] == 'window_focus':
+            # Create window focus node
+            rect = QGraphicsEllipseItem(50, current_y - 15, 30, 30)
+            rect.setBrush(QBrush(QColor("#FF8C00")))  # Orange for window focus
+            rect.setPen(QPen(QColor("white"), 2))
+            rect.action_id = action_id
+            self.add(items, rect)
+
+            # Add window title label
+            text = QGraphicsTextItem(f"{i+1}: Focus: {(action[1] or '')[:30]}...")
+            text.setDefaultTextColor(QColor("white"))
+            text.setPos(90, current_y - 10)
+            self.add(items, text)
+
+        elif action[0] in MOUSE_ACTIONS:
+            # Create connecting line from previous mouse action
+            previous = self.previous_mouse_row(macro, i)
+            if previous >= 0:
+                line = QGraphicsLineItem(macro[previous][1], previous * ROW_HEIGHT, action[1], current_y)
+                line.setPen(QPen(QColor("#4A90E2"), 2, Qt.SolidLine))
+                self.add(items, line)
+
+            # Create node
+            oval = DraggableEllipseItem(self.ui, action[1] - 10, current_y - 10, 20, 20)
+            oval.setBrush(QBrush(QColor(COLOR_MAP.get(action[0], "#4A90E2"))))
+            oval.setPen(QPen(QColor("white"), 2))
+            oval.old_x, oval.old_y = action[1], current_y
+            oval.action_id = action_id
+            self.add(items, oval)
+
+            # Add action label
+            label = QGraphicsTextItem(f"{i+1}: {action[0]}")
+            label.setDefaultTextColor(QColor("white"))
+            label.setPos(action[1] + 15, current_y - 10)
+            self.add(items, label)
+
+            # Add timing info
+            if i > 0:
+                delay = action[3] - macro[i-1][3]
+                timing = QGraphicsTextItem(f"{delay:.2f}s")
+                timing.setDefaultTextColor(QColor("#95A5A6"))
+                timing.setPos(action[1] - 50, current_y - 25)
+                self.add(items, timing)
+
+        elif action[0] == 'key':
+            # Create key node
+            rect = QGraphicsEllipseItem(50, current_y - 15, 30, 30)
+            rect.setBrush(QBrush(QColor("#9B59B6")))  # Purple for keyboard actions
+            rect.setPen(QPen(QColor("white"), 2))
+            rect.action_id = action_id
+            self.add(items, rect)
+
+            # Add key label
+            text = QGraphicsTextItem(f"{i+1}: Key {action[1]} {action[2]}")
+            text.setDefaultTextColor(QColor("white"))
+            text.setPos(90, current_y - 10)
+            self.add(items, text)
+
+        elif action[0] in CONDITION_ACTIONS:
+            # Create a diamond for screen conditions, selectable so it can be deleted
+            diamond = QGraphicsPolygonItem(QPolygonF([QPointF(65, current_y - 17), QPointF(82, current_y),
+                                                      QPointF(65, current_y + 17), QPointF(48, current_y)]))
+            diamond.setBrush(QBrush(QColor("#1ABC9C")))  # Teal for screen conditions
+            diamond.setPen(QPen(QColor("white"), 2))
+            diamond.setFlag(QGraphicsItem.ItemIsSelectable)
+            diamond.action_id = action_id
+            self.add(items, diamond)
+
+            # Add condition label, without the image data
+            fields = ' '.join(field for field in action[1].split() if not field.startswith('image='))
+            kind = "Wait For Screen" if action[0] == 'wait_region' else "If Pixel"
+            text = QGraphicsTextItem(f"{i+1}: {kind}: {fields[:60]}")
+            text.setDefaultTextColor(QColor("white"))
+            text.setPos(90, current_y - 10)
+            self.add(items, text)
+        return items
+
+    def build_paths(self, first, last):
+        """Zoomed out: one polyline per run of mouse rows, plain dots for everything else"""
+        self.drop_paths()
+        macro = self.macro()
+        path = None
+        markers = QPainterPath()
+        for i in range(first, last):
+            action = macro[i]
+            if action[0] in MOUSE_ACTIONS:
+                if path is None:
+                    path = QPainterPath()
+                    previous = self.previous_mouse_row(macro, i) if i == first else -1
+                    if previous >= 0:
+                        path.moveTo(macro[previous][1], previous * ROW_HEIGHT)
+                        path.lineTo(action[1], i * ROW_HEIGHT)
+                    else:
+                        path.moveTo(action[1], i * ROW_HEIGHT)
+                else:
+                    path.lineTo(action[1], i * ROW_HEIGHT)
+                if action[0] != 'mouse':
+                    markers.addEllipse(action[1] - 10, i * ROW_HEIGHT - 10, 20, 20)
+            else:
+                markers.addEllipse(50, i * ROW_HEIGHT - 15, 30, 30)
+        if path is not None:
+            item = QGraphicsPathItem(path)
+            item.setPen(QPen(QColor("#4A90E2"), 2, Qt.SolidLine))
+            self.scene.addItem(item)
+            self.paths.append(item)
+        if not markers.isEmpty():
+            item = QGraphicsPathItem(markers)
+            item.setPen(QPen(QColor("white"), 2))
+            item.setBrush(QBrush(QColor("#9B59B6")))
+            self.scene.addItem(item)
+            self.paths.append(item)
@@ -0,0 +1,40 @@
+"""Stand-ins shared by the tests: a simulated clock and a backend that stamps its calls with it"""
+import random
+
+
+class FakeClock:
+    """Nanosecond clock whose sleeps overshoot by 0.5-2 ms, like a desktop OS timer"""
+
+    def __init__(self, seed=0):
+        self.now = 0
+        self.rng = random.Random(seed)
+
+    def clock(self):
+        self.now += 50  # Reading the clock is not free
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += int(max(seconds, 0) * 1e9 + self.rng.uniform(0.5e6, 2e6))
+
+
+class FakeBackend:
+    """Keeps (clock time, action) for every action and charges each one 20 us"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    def perform(self, action):
+        self.clock.now += 20_000
+        self.calls.append((self.clock.now, action))
+
+
+def mouse_path(count, seed=0, interval=0.01):
+    """count mouse samples about interval seconds apart"""
+    rng = random.Random(seed)
+    t = 0.0
+    actions = []
+    for k in range(count):
+        t += interval * rng.uniform(0.5, 1.5)
+        actions.append(('mouse', k % 1920, k % 1080, t))
+    return actions
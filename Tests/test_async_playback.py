@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from Scripts.Macro.AsyncPlayback import AsyncPlaybackEngine
+from Scripts.Macro.OutputBackend import RecordingBackend
+
+
+class BrokenMouse(RecordingBackend):
+    def move(self, x, y):
+        raise OSError("no mouse")
+
+
+def test_backend_error_fails_the_task_and_lifts_held_keys():
+    backend = BrokenMouse()
+    actions = [('key', 'a', 'down', 0.0), ('mouse', 10, 10, 0.01), ('key', 'a', 'up', 0.02)]
+
+    async def run():
+        engine = AsyncPlaybackEngine(backend, speed=float('inf'))
+        events = []
+        engine.add_listener(events.append)
+        task = engine.start(actions)
+        with pytest.raises(OSError):
+            await task
+        assert await task.cancel() is False
+        return engine, task, events
+
+    engine, task, events = asyncio.run(run())
+    assert task.state == 'failed' and isinstance(task.error, OSError)
+    assert [event.kind for event in events] == ['started', 'error']
+    assert events[-1].error is task.error
+    assert backend.calls == [('key_down', 'a'), ('key_up', 'a')]
+    assert not engine.tasks and not engine.arbiter.held and not engine.arbiter.owners
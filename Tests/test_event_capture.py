@@ -0,0 +1,64 @@
+from Scripts.Macro.EventCapture import BufferedEventRecorder, EventRecorder, SyntheticInputSource
+from Scripts.Macro.MacroTrack import MacroTrack
+
+EVENTS = [
+    ('window', 1, "notes.txt - Notepad", 0.00),
+    ('move', 10, 20, 0.01),
+    ('move', 10, 20, 0.02),  # Same position: not recorded
+    ('button', 'left', 'down', 0.03),
+    ('button', 'left', 'up', 0.04),
+    ('key', 'a', 'down', 0.05),
+    ('key', 'a', 'up', 0.06),
+    ('window', 2, "Macro Recorder", 0.07),  # Our own window: everything until the next focus is dropped
+    ('move', 300, 200, 0.08),
+    ('button', 'left', 'down', 0.09),
+    ('key', 'b', 'down', 0.10),
+    ('window', 1, "notes.txt - Notepad", 0.11),
+    ('button', 'right', 'down', 0.12),  # At the cursor moved to while ignored
+    ('move', 5, 6, 0.13),
+]
+
+EXPECTED = [
+    ('window_focus', "notes.txt - Notepad", None, 0.00),
+    ('mouse', 10, 20, 0.01),
+    ('left_click', 10, 20, 0.03),
+    ('key', 'a', 'down', 0.05),
+    ('key', 'a', 'up', 0.06),
+    ('window_focus', "notes.txt - Notepad", None, 0.11),
+    ('right_click', 300, 200, 0.12),
+    ('mouse', 5, 6, 0.13),
+]
+
+
+def record(recorder_class):
+    source = SyntheticInputSource(EVENTS)
+    track = MacroTrack()
+    appended = []
+    recorder = recorder_class(source, track, on_append=appended.append)
+    recorder.start()
+    source.feed()
+    recorder.stop()
+    return track, appended
+
+
+def test_synthetic_feed_records_in_order_and_skips_our_window():
+    track, appended = record(EventRecorder)
+    assert list(track) == EXPECTED
+    assert appended == EXPECTED
+
+
+def test_buffered_recorder_records_the_same_track():
+    track, appended = record(BufferedEventRecorder)
+    assert list(track) == EXPECTED
+    assert appended[-1] == EXPECTED[-1]
+
+
+def test_ignore_title_none_records_every_window():
+    source = SyntheticInputSource(EVENTS)
+    track = MacroTrack()
+    recorder = EventRecorder(source, track, ignore_title=None)
+    recorder.start()
+    source.feed()
+    recorder.stop()
+    assert ('window_focus', "Macro Recorder", None, 0.07) in list(track)
+    assert ('key', 'b', 'down', 0.10) in list(track)
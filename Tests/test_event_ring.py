@@ -0,0 +1,58 @@
+import threading
+
+from Scripts.Macro.EventRing import EventRing
+
+PRODUCERS = 4
+EVENTS = 20_000
+
+
+def stress(capacity):
+    """PRODUCERS threads push numbered moves while one consumer drains; returns what each side saw"""
+    ring = EventRing(capacity)
+    published = [[] for _ in range(PRODUCERS)]
+    consumed = []
+    done = threading.Event()
+
+    def produce(producer):
+        for k in range(EVENTS):
+            kind, a, b = ('move', producer, k) if k % 10 else ('key', producer, k)
+            if ring.push(kind, a, b, float(k)):
+                published[producer].append(k)
+
+    def consume():
+        while not done.is_set():
+            consumed.extend(ring.drain())
+        consumed.extend(ring.drain())  # Whatever was published after the last pass
+
+    threads = [threading.Thread(target=produce, args=(producer,)) for producer in range(PRODUCERS)]
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    consumer.join()
+    return ring, published, consumed
+
+
+def check(ring, published, consumed):
+    for producer in range(PRODUCERS):
+        seen = [b for kind, a, b, t in consumed if a == producer]
+        assert seen == published[producer]  # Each published event once, in the order it was pushed
+    pushed = PRODUCERS * EVENTS
+    assert ring.consumed == len(consumed)
+    assert ring.dropped == pushed - sum(len(events) for events in published)
+    assert ring.consumed + ring.dropped == pushed and not ring.skipped
+
+
+def test_many_producers_lose_nothing_with_room():
+    ring, published, consumed = stress(capacity=1 << 17)
+    check(ring, published, consumed)
+    assert ring.dropped == 0 and ring.overflows == 0
+
+
+def test_overflow_drops_are_counted_exactly():
+    ring, published, consumed = stress(capacity=64)
+    check(ring, published, consumed)
+    assert ring.dropped > 0 and ring.overflows > 0
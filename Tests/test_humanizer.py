@@ -0,0 +1,11 @@
+from Scripts.Macro.Humanizer import MoveHumanizer
+
+
+def test_output_stays_sorted_with_a_key_between_sparse_moves():
+    macro = [('mouse', 0, 0, 0.0), ('key', 'a', 'down', 0.9), ('mouse', 400, 300, 1.0)]
+    for mode in MoveHumanizer.MODES:
+        out = MoveHumanizer(mode, seed=1).humanize(macro)
+        times = [action[3] for action in out]
+        assert times == sorted(times)
+        generated = [action for action in out if action not in macro]
+        assert generated and all(0.9 < action[3] < 1.0 for action in generated)
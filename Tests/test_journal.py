@@ -0,0 +1,38 @@
+import threading
+import time
+
+from Scripts.FileHandler.Journal import MacroJournal
+from Scripts.Macro.MacroTrack import MacroTrack
+
+
+class YieldingTimeline:
+    """Stands in for a MacroTimeline; gives up the GIL between a column write and its journal entry"""
+
+    def on_insert(self, index, count=1):
+        time.sleep(0.00005)
+
+
+def test_compaction_during_appends_recovers_every_action(tmp_path):
+    journal = MacroJournal(str(tmp_path / "macro_cache.json"), min_compact_bytes=0)
+    track = MacroTrack()
+    journal.attach(track)
+    track.timeline = YieldingTimeline()
+    done = threading.Event()
+
+    def record():
+        for k in range(2_000):
+            track.append(('mouse', k, k, k / 100))
+        done.set()
+
+    recorder = threading.Thread(target=record)
+    recorder.start()
+    while not done.is_set():
+        journal.sync()
+        journal.compact()
+        journal.wait()
+    recorder.join()
+    journal.sync()
+    journal.wait()
+
+    recovered = MacroJournal(journal.cache_file).recover()
+    assert recovered.to_list() == track.to_list()
@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+from Scripts.FileHandler import MacroScript
+
+COMPRESSIONS = ('zlib', 'lzma', 'none')
+
+
+def mixed_actions(count):
+    actions = [('window_focus', "notes.txt - Notepad", None, 0.0)]
+    for k in range(1, count):
+        t = k * 0.0123456789  # Not a whole number of microseconds
+        if k % 97 == 0:
+            actions.append(('key', 'shift' if k % 2 else 'a', 'down' if k % 3 else 'up', t))
+        elif k % 501 == 0:
+            actions.append(('left_click', -5 + k % 7, 2 ** 30 - k, t))
+        else:
+            actions.append(('mouse', (k * 37) % 3840 - 1920, (k * 11) % 2160 - 1080, t))
+    return actions
+
+
+def assert_same(loaded, actions, time_tolerance):
+    assert len(loaded) == len(actions)
+    for got, want in zip(loaded, actions):
+        assert got[:3] == want[:3]
+        assert abs(got[3] - want[3]) <= time_tolerance
+
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+def test_v3_round_trip_over_several_chunks(tmp_path, compression):
+    path = str(tmp_path / "macro.MacroScript")
+    actions = mixed_actions(70_000)  # More than one 65536-row chunk
+    MacroScript.save(path, actions, compression=compression)
+    track, file_format = MacroScript.load(path)
+    assert file_format == 'v3'
+    assert_same(track, actions, 0.5e-6 + 1e-9)  # Times are rounded to a microsecond
+    assert track[1][3] == 0.012346
+
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+def test_v3_corruption_is_reported(tmp_path, compression):
+    path = str(tmp_path / "macro.MacroScript")
+    MacroScript.save(path, mixed_actions(5_000), compression=compression)
+    with open(path, "rb") as f:
+        data = f.read()
+    damaged = str(tmp_path / "damaged.MacroScript")
+    for size in (len(data) - 3, len(data) // 2, MacroScript.HEADER.size + 10):
+        with open(damaged, "wb") as f:
+            f.write(data[:size])
+        with pytest.raises(ValueError):
+            MacroScript.load(damaged)
+    if compression != 'none':  # Only the compressors carry a checksum
+        flipped = bytearray(data)
+        flipped[MacroScript.HEADER.size + 100] ^= 0xFF
+        with open(damaged, "wb") as f:
+            f.write(flipped)
+        with pytest.raises(ValueError):
+            MacroScript.load(damaged)
+
+
+def test_legacy_and_json_convert_to_relative_v2(tmp_path):
+    actions = [('window_focus', "a, b - Editor", None, 1000.5), ('mouse', 10, 20, 1000.75),
+               ('left_click', 10, 20, 1001.0), ('key', 'a', 'down', 1001.25), ('key', 'a', 'up', 1001.5)]
+    relative = [action[:3] + (action[3] - 1000.5,) for action in actions]
+    legacy = tmp_path / "legacy.MacroScript"
+    legacy.write_text("".join(f"{a},{b},{'' if c is None else c},{t}\n" for a, b, c, t in actions))
+    v1 = tmp_path / "v1.MacroScript"
+    v1.write_text(json.dumps({'version': 1, 'timestamp': 0, 'actions': [list(action) for action in actions]}))
+    for source, source_format in ((legacy, 'legacy'), (v1, 'json')):
+        dest = str(tmp_path / f"{source_format}.v2.MacroScript")
+        assert MacroScript.convert(str(source), dest) == (source_format, len(actions))
+        assert MacroScript.detect_format(dest) == 'v2'
+        track, _ = MacroScript.load(dest)
+        assert list(track) == relative
+    assert os.path.getsize(dest) < os.path.getsize(legacy) * 2
+
+
+def test_cut_short_v2_file_is_reported(tmp_path):
+    path = str(tmp_path / "macro.MacroScript")
+    MacroScript.save(path, mixed_actions(500))
+    with open(path, "rb") as f:
+        data = f.read()
+    damaged = str(tmp_path / "damaged.MacroScript")
+    for size in (len(data) - 3, len(data) - 40, MacroScript.HEADER.size + 10):
+        with open(damaged, "wb") as f:
+            f.write(data[:size])
+        with pytest.raises(ValueError):
+            MacroScript.load(damaged)
@@ -0,0 +1,55 @@
+import os
+
+from Scripts.FileHandler import MacroScript
+from Scripts.FileHandler.MacroStream import StreamWriter, open_stream
+
+EPOCH = 1_760_000_000.0  # Stream records carry the recording clock's absolute times
+
+
+def actions(count):
+    return [('mouse', k, k * 2, EPOCH + k * 0.01) if k % 5 else ('key', f"k{k}", 'down', EPOCH + k * 0.01)
+            for k in range(count)]
+
+
+def write(path, recorded, chunk_records=64):
+    with StreamWriter(str(path), chunk_records=chunk_records) as writer:
+        writer.extend(recorded)
+
+
+def test_load_makes_stream_times_relative(tmp_path):
+    path = tmp_path / "take.MacroScript"
+    recorded = actions(200)
+    write(path, recorded)
+    track, file_format = MacroScript.load(str(path), base_time=100.0)
+    assert file_format == 'stream' and len(track) == 200
+    assert track[0][3] == 100.0
+    for loaded, action in zip(track, recorded):
+        assert loaded[:3] == action[:3]
+        assert abs(loaded[3] - 100.0 - (action[3] - EPOCH)) < 1e-6
+
+
+def test_truncated_last_chunk_is_dropped(tmp_path):
+    path = tmp_path / "crashed.MacroScript"
+    recorded = actions(200)
+    write(path, recorded)  # Chunks of 64, 64, 64 and 8 records
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 30)  # A crash in the middle of the last chunk
+    with open_stream(str(path)) as reader:
+        assert len(reader.index) == 3 and reader.truncated
+        track = reader.to_track()
+    assert [action[:3] for action in track] == [action[:3] for action in recorded[:192]]
+
+
+def test_last_chunk_with_a_bad_checksum_is_dropped(tmp_path):
+    path = tmp_path / "corrupt.MacroScript"
+    write(path, actions(200))
+    with open_stream(str(path)) as reader:
+        last = reader.index[-1][0]
+    with open(path, "r+b") as f:
+        f.seek(last + 5)
+        byte = f.read(1)
+        f.seek(last + 5)
+        f.write(bytes([byte[0] ^ 0xFF]))  # Full length, but not what was checksummed
+    with open_stream(str(path)) as reader:
+        assert len(reader.index) == 3 and reader.truncated
+        assert len(reader.to_track()) == 192
@@ -0,0 +1,52 @@
+import math
+
+import pytest
+
+from Scripts.Macro.Optimizer import MacroOptimizer
+
+DWELL = [('mouse', 0, 0, 0.0), ('mouse', 100, 0, 0.1), ('mouse', 100, 0, 0.11), ('mouse', 101, 0, 3.0),
+         ('mouse', 400, 0, 3.1), ('left_click', 400, 0, 3.2)]
+
+
+def position_at(macro, t):
+    """Where playback of macro leaves the cursor at time t"""
+    x = y = None
+    for action in macro:
+        if action[3] > t:
+            break
+        if action[0] == 'mouse':
+            x, y = action[1], action[2]
+    return x, y
+
+
+def test_dedupe_only_is_lossless():
+    optimized = list(MacroOptimizer(tolerance=None).optimize(DWELL))
+    assert optimized == [action for action in DWELL if action[3] != 0.11]
+    for t in (0.05, 0.105, 1.0, 2.99, 3.05, 3.2):
+        assert position_at(optimized, t) == position_at(DWELL, t)
+
+
+@pytest.mark.parametrize('method', sorted(MacroOptimizer.METHODS))
+def test_simplify_keeps_where_the_cursor_rested(method):
+    optimizer = MacroOptimizer(tolerance=1.0, method=method)
+    optimized = list(optimizer.optimize(DWELL))
+    assert ('mouse', 100, 0, 0.1) in optimized and ('mouse', 101, 0, 3.0) in optimized
+    assert optimizer.stats['max_path_error'] <= 1.0
+
+
+@pytest.mark.parametrize('method', sorted(MacroOptimizer.METHODS))
+def test_simplify_keeps_timestamps_and_drops_only_timed_collinear_samples(method):
+    # Constant speed along a line, then a slow stretch of the same line
+    macro = [('mouse', k * 10, 0, k * 0.01) for k in range(50)]
+    macro += [('mouse', 490 + k, 0, 0.49 + k * 0.1) for k in range(1, 20)]
+    optimizer = MacroOptimizer(tolerance=1.0, method=method)
+    optimized = list(optimizer.optimize(macro))
+    assert set(optimized) <= set(macro)  # Kept rows keep their exact timestamps
+    assert ('mouse', 490, 0, 0.49) in optimized  # Where the speed changes
+    assert len(optimized) < len(macro) // 4
+    for action in macro:
+        before = max((kept for kept in optimized if kept[3] <= action[3]), key=lambda kept: kept[3])
+        after = min((kept for kept in optimized if kept[3] >= action[3]), key=lambda kept: kept[3])
+        f = (action[3] - before[3]) / (after[3] - before[3]) if after[3] > before[3] else 0.0
+        x = before[1] + f * (after[1] - before[1])
+        assert math.isclose(x, action[1], abs_tol=1.0)
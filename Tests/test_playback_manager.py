@@ -0,0 +1,20 @@
+import time
+
+from Scripts.Macro.OutputBackend import RecordingBackend
+from Scripts.Macro.PlaybackManager import PlaybackManager
+
+
+def test_pause_resume_and_wait_on_the_only_macro():
+    backend = RecordingBackend()
+    manager = PlaybackManager(backend)
+    handle = manager.add([('mouse', k, k, k * 0.02) for k in range(10)])
+    manager.start()
+    handle.pause()
+    time.sleep(0.05)
+    assert handle.state == 'paused' and manager.thread.is_alive()
+    handle.resume()
+    assert handle.wait(2)
+    assert handle.state == 'finished' and handle.played == 10
+    assert backend.calls == [('move', k, k) for k in range(10)]
+    manager.wait(2)
+    assert not manager.thread.is_alive()  # Still exits once nothing is left to play
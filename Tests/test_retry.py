@@ -0,0 +1,44 @@
+import pytest
+
+from Scripts.Macro.OutputBackend import RecordingBackend
+from Scripts.Macro.Player import ActionRetry, MacroPlayer
+from Scripts.Macro.Scheduler import PlaybackScheduler
+
+
+class FlakyBackend(RecordingBackend):
+    """Every move fails the first `failures` times it is tried"""
+
+    def __init__(self, failures, error=OSError):
+        super().__init__()
+        self.failures = failures
+        self.error = error
+        self.tries = 0
+
+    def move(self, x, y):
+        self.tries += 1
+        if self.tries % (self.failures + 1):
+            raise self.error("move failed")
+        super().move(x, y)
+
+
+def play(backend, retry):
+    player = MacroPlayer(backend, PlaybackScheduler(speed=float('inf')), retry=retry)
+    return player.play([('mouse', k, k, k / 100) for k in range(5)])
+
+
+def test_retries_are_counted_without_raising():
+    retry = ActionRetry(3, delay=0)
+    assert play(FlakyBackend(1), retry)
+    assert (retry.retried, retry.failed) == (5, 0)
+    retry = ActionRetry(2, delay=0)
+    assert play(FlakyBackend(10), retry)  # Every try fails
+    assert retry.failed == 5 and isinstance(retry.last_error, OSError)
+    assert "5 failed after 2 attempts" in retry.summary()
+
+
+def test_fatal_errors_stop_playback():
+    class FailSafe(Exception):
+        pass
+
+    with pytest.raises(FailSafe):
+        play(FlakyBackend(1, FailSafe), ActionRetry(3, delay=0, fatal=(FailSafe,)))
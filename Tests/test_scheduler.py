@@ -0,0 +1,20 @@
+from Scripts.Macro.Scheduler import PlaybackScheduler
+from Tests.Fakes import FakeBackend, FakeClock, mouse_path
+
+MAX_DRIFT_MS = 2.0  # One worst-case oversleep; deadlines from one origin must not add up more
+
+
+def test_scheduler_drift_is_bounded_over_10000_actions():
+    macro = mouse_path(10_000)
+    for speed in (1.0, 2.0):
+        clock = FakeClock()
+        backend = FakeBackend(clock)
+        origin = clock.now
+        # A short spin keeps the fake clock's busy-wait quick; the sleeps still overshoot by up to 2 ms
+        scheduler = PlaybackScheduler(speed=speed, spin_ns=100_000, clock=clock.clock, sleep=clock.sleep)
+        scheduler.start()
+        for action in macro:
+            scheduler.wait_until(scheduler.deadline(action[3] - macro[0][3]))
+            backend.perform(action)
+        expected = (macro[-1][3] - macro[0][3]) / speed * 1e9
+        assert abs(backend.calls[-1][0] - origin - expected) / 1e6 <= MAX_DRIFT_MS
@@ -0,0 +1,43 @@
+import json
+
+import numpy as np
+import pytest
+
+from Scripts.Macro.OutputBackend import RecordingBackend
+from Scripts.Macro.Player import MacroPlayer
+from Scripts.Macro.ScreenMatch import ConditionTimeout, PixelMatch, RegionMatch, ScreenWatcher, SyntheticScreen
+from Scripts.Macro.Trace import PlaybackTrace
+
+
+def play(keep_playing=None):
+    backend = RecordingBackend()
+    match = RegionMatch(10, 10, np.full((8, 8, 3), 200, dtype=np.uint8), timeout=0.05)
+    player = MacroPlayer(backend, watcher=ScreenWatcher(SyntheticScreen(64, 64), poll_hz=0))
+    result = player.play([match.action(0.0), ('left_click', 1, 1, 0.0)], keep_playing=keep_playing)
+    return result, backend
+
+
+def test_wait_timeout_is_not_a_stop():
+    with pytest.raises(ConditionTimeout):
+        play()
+    stops = iter([True, True, True, False])
+    result, backend = play(keep_playing=lambda: next(stops, False))
+    assert result is False and not backend.calls
+
+
+def test_trace_of_conditions_saves_as_json(tmp_path):
+    image = np.full((8, 8, 3), 200, dtype=np.uint8)
+    screen = SyntheticScreen(64, 64)
+    screen.paste(10, 10, image)
+    region, pixel = RegionMatch(10, 10, image, timeout=0.5), PixelMatch(1, 1, (0, 0, 0))
+    trace, backend = PlaybackTrace(), RecordingBackend()
+    player = MacroPlayer(backend, trace=trace, watcher=ScreenWatcher(screen, poll_hz=0))
+    actions = [region.action(0.0), pixel.action(0.0), ('left_click', 1, 1, 0.0)]
+    assert player.play(actions) is not False
+    path = str(tmp_path / "trace.json")
+    trace.save_chrome_trace(path)
+    with open(path) as file:
+        slices = [event for event in json.load(file)['traceEvents'] if event['ph'] == 'X']
+    specs = [arg for event in slices for arg in event['args']['args'] if isinstance(arg, str)]
+    assert region.spec() in specs and pixel.spec() in specs
+    assert backend.calls and not (tmp_path / "trace.json.tmp").exists()
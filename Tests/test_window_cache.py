@@ -0,0 +1,45 @@
+from Scripts.Macro.WindowCache import FakeWindowSystem, WindowCache
+
+
+def test_exact_hits_come_from_the_cache():
+    system = FakeWindowSystem(["a.txt - Notepad", "Calculator"])
+    cache = WindowCache(system)
+    assert cache.focus("a.txt - Notepad") and system.focused == 1
+    assert cache.resolve("a.txt - Notepad") == 1
+    assert system.calls['find_exact'] == 1 and cache.stats()['hits'] == 1
+    assert cache.enumerations == 0
+
+
+def test_stale_handles_are_evicted():
+    system = FakeWindowSystem(["a.txt - Notepad"])
+    cache = WindowCache(system)
+    assert cache.resolve("a.txt - Notepad") == 1
+    system.destroy(1)
+    assert "a.txt - Notepad" not in cache.entries
+    reopened = system.create("a.txt - Notepad")
+    assert cache.resolve("a.txt - Notepad") == reopened
+
+    # Without notifications the is_window check still catches a dead handle
+    system.on_destroyed = None
+    system.destroy(reopened)
+    assert cache.resolve("a.txt - Notepad") is None
+
+
+def test_near_misses_give_way_to_the_exact_title():
+    system = FakeWindowSystem(["b.txt - Notepad"])
+    cache = WindowCache(system)
+    assert cache.resolve("a.txt - Notepad") == 1  # Same application, nothing better open
+    system.on_created = None  # The new window goes unannounced
+    exact = system.create("a.txt - Notepad")
+    assert cache.resolve("a.txt - Notepad") == exact
+    assert cache.resolve("a.txt - Notepad") == exact
+    assert cache.resolve("Calculator") is None
+    exact = system.create("Calculator")
+    assert cache.resolve("Calculator") == exact
+
+
+def test_unrelated_titles_do_not_match():
+    system = FakeWindowSystem(["Calculator", "Settings"])
+    cache = WindowCache(system)
+    assert cache.resolve("notes.txt - Notepad") is None
+    assert not cache.focus("notes.txt - Notepad") and system.focused is None
@@ -0,0 +1 @@
+# Puts the repository root on sys.path, so plain `pytest` imports Scripts the way `python -m pytest` does
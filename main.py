@@ -8,6 +8,7 @@ if __name__ == "__main__":
     ui = Ui(None)  # Initialize UI without MacroRecorder first
     macro_recorder = MacroRecorder(ui)
     ui.macro_recorder = macro_recorder  # Set the MacroRecorder instance in UI
+    ui.load_cache()  # Recover the last session now that there is a recorder to load into
     ui.render_macro()  # Ensure the UI updates after macro_recorder is set
     ui.show()
     sys.exit(app.exec_())